@@ -1,8 +1,11 @@
-from typing import Tuple, List, Dict, Any, Optional
+from typing import Tuple, List, Dict, Any, Optional, Sequence
+import hashlib
 import re
 import time
+import numpy as np
 from loguru import logger
 from app.config import settings
+from app.utils.keyword_matcher import KeywordMatcher
 
 class Classifier:
     """
@@ -10,6 +13,9 @@ class Classifier:
     v5.0 Specs: Pass Threshold = 45.
     """
 
+    # Stored on accounts.classifier_version; bump when signals / weights change
+    VERSION = "ig-5.0"
+
     # --- POSITIVE SIGNALS (Add Points) ---
     POSITIVE_SIGNALS = {
         # 1. Identity Keywords (+10 point)
@@ -153,6 +159,23 @@ class Classifier:
         ])
     }
 
+    @classmethod
+    def _get_matcher(cls) -> KeywordMatcher:
+        """
+        Compiled matcher over POSITIVE_SIGNALS, NEGATIVE_SIGNALS and VENUE_ANCHORS.
+        Built once per class on first use. Negative groups are prefixed with 'neg:'
+        since some names (e.g. 'good_category'/'bad_category') are table-specific.
+        """
+        matcher = cls.__dict__.get("_matcher")
+        if matcher is None:
+            table = {name: keywords for name, (_, keywords) in cls.POSITIVE_SIGNALS.items()}
+            table["venue_anchor_match"] = cls.VENUE_ANCHORS[1]
+            for name, (_, keywords) in cls.NEGATIVE_SIGNALS.items():
+                table["neg:" + name] = keywords
+            matcher = KeywordMatcher(table)
+            cls._matcher = matcher
+        return matcher
+
     # --- TIER 1: HARD FILTERS (Instant Fail) ---
     @classmethod
     def passes_hard_filters(cls, user_data: Dict[str, Any]) -> Tuple[bool, List[str]]:
@@ -206,6 +229,31 @@ class Classifier:
             
         return True, []
 
+    @classmethod
+    def profile_text(cls, user_data: Dict[str, Any]) -> str:
+        """Lowercased 'bio full_name username' string that the signal tables are matched against."""
+        bio = (user_data.get("biography") or "").lower()
+        full_name = (user_data.get("full_name") or "").lower()
+        username = (user_data.get("username") or "").lower()
+        return f"{bio} {full_name} {username}"
+
+    @classmethod
+    def fingerprint(cls, user_data: Dict[str, Any]) -> str:
+        """
+        Hash of every input classify() reads (app/utils/decision_cache.py key).
+        Post recency enters as whole days since the last reel plus the >30 check,
+        which is what the verdict and the 'Inactive' message depend on.
+        """
+        latest = user_data.get("latest_reel_media")
+        days_ago = (time.time() - latest) / 86400 if latest else None
+        inputs = (
+            user_data.get("username"), user_data.get("full_name"), user_data.get("biography"),
+            user_data.get("category_name"), bool(user_data.get("is_business")), bool(user_data.get("is_private")),
+            user_data.get("follower_count", 0), user_data.get("following_count", 0), user_data.get("media_count", 0),
+            int(days_ago) if days_ago is not None else None, days_ago is not None and days_ago > 30,
+        )
+        return hashlib.sha1(repr(inputs).encode()).hexdigest()
+
     @classmethod
     def classify(cls, user_data: Dict[str, Any]) -> Tuple[bool, int, List[str]]:
         # Step 1: Hard Filters
@@ -213,23 +261,37 @@ class Classifier:
         if not passes:
             return False, 0, [f"HARD_FAIL: {r}" for r in fail_reasons]
             
+        username = (user_data.get("username") or "").lower()
+        score, matched = cls._score_text(
+            cls.profile_text(user_data), user_data.get("category_name"), user_data.get("is_business")
+        )
+        
+        # Final Score
+        is_qualified = score >= settings.PASS_THRESHOLD
+        
+        # Args, not an f-string: nothing is formatted when INFO is filtered out
+        logger.info("Classified @{}: Score {} -> {} (Signals: {})", username, score, "PASS" if is_qualified else "FAIL", matched)
+        
+        return is_qualified, score, matched
+
+    @classmethod
+    def _score_text(cls, text_content: str, cat: Optional[str], is_business: Any) -> Tuple[int, List[str]]:
+        """Steps 2-3 of classify(): keyword and category scoring, no hard filters or logging."""
         score = 0
         matched = []
-        bio = (user_data.get("biography") or "").lower()
-        full_name = (user_data.get("full_name") or "").lower()
-        username = (user_data.get("username") or "").lower()
-        text_content = f"{bio} {full_name} {username}"
-        cat = user_data.get("category_name")
+        
+        # Single pass over the text for every signal table
+        hits = cls._get_matcher().match(text_content)
         
         # Step 2: Positive Scoring
         for signal_name, (points, keywords) in cls.POSITIVE_SIGNALS.items():
-            if any(k.lower() in text_content for k in keywords):
+            if signal_name in hits:
                 score += points
                 matched.append(signal_name)
         
         # Venue Anchors
         anchor_points, anchor_keywords = cls.VENUE_ANCHORS
-        if any(k.lower() in text_content for k in anchor_keywords):
+        if "venue_anchor_match" in hits:
              score += anchor_points
              matched.append("venue_anchor_match")
              
@@ -238,13 +300,13 @@ class Classifier:
             if cat in cls.POSITIVE_SIGNALS["good_category"][1]:
                 score += 10
                 matched.append("good_category")
-            elif cat.lower() == "food & beverage" and not user_data.get("is_business"):
+            elif cat.lower() == "food & beverage" and not is_business:
                 score += 10
                 matched.append("good_category_creator")
 
         # Step 3: Negative Scoring
         for signal_name, (points, keywords) in cls.NEGATIVE_SIGNALS.items():
-             if any(k.lower() in text_content for k in keywords):
+             if ("neg:" + signal_name) in hits:
                 score += points
                 matched.append(signal_name)
         
@@ -253,9 +315,99 @@ class Classifier:
              score += -40
              matched.append("bad_category")
         
-        # Final Score
-        is_qualified = score >= settings.PASS_THRESHOLD
-        
-        logger.info(f"Classified @{username}: Score {score} -> {'PASS' if is_qualified else 'FAIL'} (Signals: {matched})")
-        
-        return is_qualified, score, matched
+        return score, matched
+
+    # --- BATCH API (columnar re-scoring) ---
+
+    # Bit per hard filter, used to label rejected rows in classify_batch()
+    HARD_FILTER_FLAGS = [
+        (1, "followers_out_of_range"),
+        (2, "follow_ratio"),
+        (4, "private"),
+        (8, "media_count"),
+        (16, "inactive"),
+    ]
+
+    @classmethod
+    def to_columns(cls, profiles: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Builds the columnar batch classify_batch() expects from profile dicts.
+        Missing counts become 0, a missing latest_reel_media becomes 0 (= unknown).
+        """
+        return {
+            "follower_count": np.array([p.get("follower_count") or 0 for p in profiles], dtype=np.int64),
+            "following_count": np.array([p.get("following_count") or 0 for p in profiles], dtype=np.int64),
+            "media_count": np.array([p.get("media_count") or 0 for p in profiles], dtype=np.int64),
+            "latest_reel_media": np.array([p.get("latest_reel_media") or 0 for p in profiles], dtype=np.float64),
+            "is_private": np.array([bool(p.get("is_private")) for p in profiles], dtype=bool),
+            "is_business": np.array([bool(p.get("is_business")) for p in profiles], dtype=bool),
+            "category_name": [p.get("category_name") for p in profiles],
+            "text": [cls.profile_text(p) for p in profiles],
+        }
+
+    @classmethod
+    def hard_filter_mask(cls, batch: Dict[str, Any], now: Optional[float] = None) -> np.ndarray:
+        """
+        Vectorized passes_hard_filters(). Returns an int array of HARD_FILTER_FLAGS
+        bits per row; 0 means the row passes. Optional columns (is_private,
+        latest_reel_media) are skipped when absent.
+        """
+        followers = np.asarray(batch["follower_count"])
+        following = np.asarray(batch["following_count"])
+        media = np.asarray(batch["media_count"])
+        flags = np.zeros(len(followers), dtype=np.int8)
+
+        flags[(followers < settings.FOLLOWER_MIN) | (followers > settings.FOLLOWER_MAX)] |= 1
+
+        ratio = np.divide(following, followers, out=np.zeros(len(followers)), where=followers > 0)
+        flags[ratio > settings.FOLLOW_RATIO_MAX] |= 2
+
+        if batch.get("is_private") is not None:
+            flags[np.asarray(batch["is_private"], dtype=bool)] |= 4
+
+        flags[media < settings.MIN_MEDIA_COUNT] |= 8
+
+        if batch.get("latest_reel_media") is not None:
+            latest = np.asarray(batch["latest_reel_media"], dtype=np.float64)
+            now = time.time() if now is None else now
+            flags[(latest > 0) & ((now - latest) / 86400 > 30)] |= 16
+
+        return flags
+
+    @classmethod
+    def classify_batch(cls, batch: Dict[str, Any], now: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray, List[List[str]]]:
+        """
+        Columnar classify(). `batch` holds NumPy arrays for follower_count,
+        following_count, media_count (plus optional is_private, latest_reel_media,
+        is_business) and lists for text (see profile_text) and category_name.
+
+        Hard filters run as vectorized masks; keyword scoring only runs on the
+        rows that survive. Rejected rows get score 0 and 'HARD_FAIL: <filter>'
+        labels instead of the per-value messages classify() formats.
+        Returns (qualified bool array, score int array, signals per row).
+        """
+        flags = cls.hard_filter_mask(batch, now)
+        n = len(flags)
+        scores = np.zeros(n, dtype=np.int64)
+
+        fail_labels: Dict[int, List[str]] = {}
+        signals: List[List[str]] = []
+        for value in flags.tolist():
+            if value not in fail_labels:
+                fail_labels[value] = [f"HARD_FAIL: {name}" for bit, name in cls.HARD_FILTER_FLAGS if value & bit]
+            signals.append(list(fail_labels[value]))
+
+        texts = batch["text"]
+        categories = batch.get("category_name") or [None] * n
+        is_business = batch.get("is_business")
+        for i in np.flatnonzero(flags == 0).tolist():
+            scores[i], signals[i] = cls._score_text(
+                texts[i], categories[i], bool(is_business[i]) if is_business is not None else False
+            )
+
+        qualified = (flags == 0) & (scores >= settings.PASS_THRESHOLD)
+        logger.info(
+            f"Batch classified {n} profiles: {int((flags == 0).sum())} passed hard filters, "
+            f"{int(qualified.sum())} qualified"
+        )
+        return qualified, scores, signals
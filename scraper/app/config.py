@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 import os
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 class Settings(BaseSettings):
     # API
@@ -21,9 +21,100 @@ class Settings(BaseSettings):
     HASHTAG_PAGES: int = 12
     MIN_MEDIA_COUNT: int = 30
     
+    # Shared HTTP client pool (app/utils/http_pool.py)
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP2_ENABLED: bool = True # Needs 'h2' (httpx[http2]); falls back to HTTP/1.1 without it
+    
+    # Per-worker async runtime (app/utils/async_runtime.py): max coroutines in flight per process
+    ASYNC_TASK_CONCURRENCY: int = 50
+    
+    # Celery worker threads (--pool=threads --concurrency=N); sizes the DB connection pool
+    WORKER_CONCURRENCY: int = 50
+    DB_POOL_OVERFLOW: int = 10 # Extra connections beyond one per worker thread (RunStats flusher, bursts)
+    DB_POOL_TIMEOUT: float = 30.0 # Seconds a thread waits for a free connection
+    
+    # Batched classification (task_classify_batch): usernames per Celery message
+    CLASSIFY_BATCH_SIZE: int = 50
+    CLASSIFY_BATCH_MAX_WAIT: float = 5.0 # Seconds a partial chunk may wait before it is sent
+    
+    # Classifier decision cache (app/utils/decision_cache.py): in-process LRU, then Redis
+    DECISION_CACHE_ENABLED: bool = True
+    DECISION_CACHE_SIZE: int = 50_000 # LRU entries per process
+    DECISION_CACHE_TTL: int = 7 * 24 * 3600 # Redis entries (a ruleset change orphans them anyway)
+    DECISION_CACHE_REDIS_BACKOFF: float = 30.0 # Seconds Redis is skipped (LRU only) after an error
+    
+    # Lead / blacklist writes (app/utils/bulk_writer.py): rows per INSERT ... ON CONFLICT flush
+    BULK_WRITE_BATCH: int = 200
+    
+    # Lead exports (app/exporters/stream_export.py): rows per keyset page
+    EXPORT_PAGE_SIZE: int = 5000
+    
+    # Offline re-classification (app/reclassify.py) over stored raw payloads
+    RECLASSIFY_CHUNK_SIZE: int = 2000 # Accounts per worker task / bulk UPDATE
+    RECLASSIFY_WORKERS: int = 0 # Worker processes; 0 = os.cpu_count()
+    
+    # Run counters (app/utils/run_stats.py): Redis -> scraping_runs flush cadence
+    RUN_STATS_FLUSH_INTERVAL: int = 10 # Seconds
+    RUN_STATS_TTL: int = 7 * 24 * 3600 # Redis hash expiry
+    
+    # Per-host request rate limits in req/sec (app/utils/rate_limiter.py)
+    DEFAULT_HOST_RATE_LIMIT: float = 10.0
+    HOST_RATE_LIMITS: Dict[str, float] = {}
+    
+    # Hashtag discovery: concurrent shortcode -> username lookups per hashtag
+    DISCOVERY_RESOLVE_CONCURRENCY: int = 10
+    
+    # Discovery dedup (app/utils/dedup.py): seen_owners / seen_usernames / tiktok_seen_users
+    DEDUP_BACKEND: str = "set" # set (exact) | bloom | cuckoo (needs RedisBloom)
+    DEDUP_WINDOW: int = 0 # Seconds per generation (86400 = daily, 604800 = weekly); 0 = never forget
+    DEDUP_GENERATIONS: int = 2 # Windows an id is remembered for when DEDUP_WINDOW > 0
+    DEDUP_CAPACITY: int = 5_000_000 # Expected ids per generation (bloom/cuckoo sizing)
+    DEDUP_ERROR_RATE: float = 0.001 # Bloom target false-positive rate
+    
+    # Profile response cache (app/utils/profile_cache.py)
+    PROFILE_CACHE_ENABLED: bool = True
+    PROFILE_CACHE_TTL: int = 24 * 3600 # Profiles (bio, counts) go stale slowly
+    POST_CACHE_TTL: int = 30 * 24 * 3600 # A post's owner never changes
+    PROFILE_CACHE_NEGATIVE_TTL: int = 3600 # Not-found accounts / posts
+    
+    # Enrichment scheduler (app/enrichment_scheduler.py); Tier 1 (bio regex) is unbounded
+    ENRICH_CONCURRENCY: int = 50 # Leads in flight
+    ENRICH_TIER2_CONCURRENCY: int = 20 # Bio-link fetches in flight
+    ENRICH_TIER3_CONCURRENCY: int = 3 # Instagram mobile emulation sessions in flight
+    ENRICH_DOMAIN_RATE_LIMIT: float = 2.0 # Req/sec per target domain (override via HOST_RATE_LIMITS)
+    ENRICH_COMMIT_EVERY: int = 25 # Results per DB commit
+    
+    # Enrichment result cache (app/utils/enrichment_cache.py)
+    ENRICH_CACHE_ENABLED: bool = True
+    ENRICH_CACHE_TTL: int = 30 * 24 * 3600 # Normalized URL -> emails found on the page
+    ENRICH_CACHE_NEGATIVE_TTL: int = 24 * 3600 # Empty page, first visit; doubles on every further empty visit
+    ENRICH_CACHE_NEGATIVE_MAX_TTL: int = 30 * 24 * 3600 # Backoff cap
+    ENRICH_BIO_CACHE_SIZE: int = 100_000 # In-process LRU: bio hash -> Tier 1 result
+    EXTRACT_MAX_BYTES: int = 1_000_000 # Link-in-bio page bytes read before giving up (EmailExtractor)
+    
+    # Enrichment browser pool (app/utils/browser_pool.py)
+    BROWSER_POOL_SIZE: int = 2 # Chromium processes per worker
+    BROWSER_CONTEXTS_PER_BROWSER: int = 4 # Concurrent leases per browser
+    BROWSER_CONTEXT_MAX_USES: int = 20 # Leases before a context is thrown away
+    BROWSER_RECYCLE_AFTER: int = 200 # Leases before a browser is restarted (caps memory)
+    
+    # TikTok dork pipeline (run_tiktok_dork.py)
+    TIKTOK_RATE_LIMIT: float = 3.0 # /user/info calls per second (override via HOST_RATE_LIMITS)
+    TIKTOK_CLASSIFY_WORKERS: int = 8 # Concurrent profile fetch + classify
+    TIKTOK_CLASSIFY_QUEUE: int = 500 # Usernames buffered between search and classification
+    TIKTOK_WRITE_BATCH: int = 50 # Classified users per DB commit
+    TIKTOK_WRITE_RETRIES: int = 2 # Extra attempts for a failed batch write before it's counted unsaved
+    
     # Firecrawl Configuration
     FIRECRAWL_API_KEY: Optional[str] = os.getenv("FIRECRAWL_API_KEY")
-    FIRECRAWL_CONCURRENCY: int = 30 # Reduced from 50 to avoid 429 rate limits
+    FIRECRAWL_CONCURRENCY: int = 30 # Ceiling for the adaptive limit (DorkExecutor) / fixed limit for run_search
+    FIRECRAWL_INITIAL_CONCURRENCY: int = 8 # AIMD start: grows ~+1 per round trip, halves on 429
+    FIRECRAWL_MIN_CONCURRENCY: int = 2
+    FIRECRAWL_LATENCY_TARGET: float = 45.0 # Seconds (EWMA); slower searches shrink the limit, 0 = off
+    FIRECRAWL_MAX_RETRIES: int = 3 # Re-queues per query after 429 / 5xx / timeouts
+    FIRECRAWL_RETRY_BACKOFF: float = 10.0 # Seconds, doubled per retry when there is no Retry-After
     
     DISCOVERY_TYPES: List[str] = ["hashtags", "network", "dork"] 
     
@@ -4,6 +4,10 @@ from typing import List, Set
 from loguru import logger
 from app.config import settings
 from app.scrapers.instagram import GraphQLScraper
+from app.utils.dedup import dedup_store
+
+# owner_id -> username for every owner resolved so far (hash)
+OWNER_USERNAMES_KEY = "owner_usernames"
 
 class DiscoveryEngine:
     """
@@ -14,6 +18,8 @@ class DiscoveryEngine:
     def __init__(self):
         self.redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
         self.scraper = GraphQLScraper()
+        self.seen_owners = dedup_store("seen_owners", self.redis)
+        self.seen_usernames = dedup_store("seen_usernames", self.redis)
         
     async def discover_hashtag(self, hashtag: str) -> List[str]:
         """
@@ -28,85 +34,69 @@ class DiscoveryEngine:
             logger.warning(f"No posts found for #{hashtag}")
             return []
             
-        new_usernames = []
-        
-        # 2. Extract & Dedupe
+        # 2. One shortcode per owner (a page often holds several posts by the same account)
+        shortcodes = {}
         for post in posts:
-            # We need to resolve owner_id -> username if not present
-            # The current scraper does this via get_post_info if needed, 
-            # but scrape_hashtag_feed usually returns shortcodes/owner_ids.
-            # Optimization: We only resolve if the owner_id hasn't been seen.
-            
             owner_id = post.get('owner_id')
-            if not owner_id:
-                continue
-                
-            # Check Redis Set "seen_owners"
-            if self.redis.sismember("seen_owners", owner_id):
-                continue
-                
-            # Mark seen (so we don't query API for this ID again today)
-            self.redis.sadd("seen_owners", owner_id)
-            
-            # Now resolve username (Expensive API call)
-            # Efficient Strategy: Queue the shortcode for username resolution task?
-            # Or resolve inline? User prompt implies inline "Extract user.username".
-            # RockSolid API hashtag feed DOES NOT always return username, mostly owner_id.
-            # We will try to resolve it.
-            
-            shortcode = post.get('shortcode')
-            username = await self.scraper.get_post_info(shortcode)
-            
-            if username:
-                # Username Dedupe (The real key)
-                if not self.redis.sismember("seen_usernames", username):
-                    self.redis.sadd("seen_usernames", username)
-                    new_usernames.append(username)
-                    logger.debug(f"Discovered new user: @{username}")
+            if owner_id and post.get('shortcode'):
+                shortcodes.setdefault(str(owner_id), post['shortcode'])
+        
+        # 3. Claim owners not seen yet (one batched check-and-add)
+        owner_ids = self._claim(self.seen_owners, list(shortcodes))
+        
+        # 4. owner_id -> username from earlier lookups; only the rest cost an API call
+        known = self.redis.hmget(OWNER_USERNAMES_KEY, owner_ids) if owner_ids else []
+        resolved = {o: u for o, u in zip(owner_ids, known) if u}
+        to_resolve = [o for o in owner_ids if o not in resolved]
+        
+        sem = asyncio.Semaphore(settings.DISCOVERY_RESOLVE_CONCURRENCY)
         
-        logger.info(f"#{hashtag}: Found {len(posts)} posts, {len(new_usernames)} new unique users.")
+        async def resolve(owner_id: str):
+            async with sem:
+                return await self.scraper.get_post_info(shortcodes[owner_id])
+        
+        results = await asyncio.gather(*(resolve(o) for o in to_resolve), return_exceptions=True)
+        fresh = {o: u for o, u in zip(to_resolve, results) if u and isinstance(u, str)}
+        failed = [o for o in to_resolve if o not in fresh]
+        
+        if fresh:
+            self.redis.hset(OWNER_USERNAMES_KEY, mapping=fresh)
+        # Un-claim so a later scrape can retry them
+        self.seen_owners.remove(failed)
+        resolved.update(fresh)
+        
+        # 5. Username dedupe (the real key), in feed order
+        usernames = list(dict.fromkeys(resolved[o] for o in owner_ids if o in resolved))
+        new_usernames = self._claim(self.seen_usernames, usernames)
+        for username in new_usernames:
+            logger.debug(f"Discovered new user: @{username}")
+        
+        logger.info(
+            f"#{hashtag}: Found {len(posts)} posts, {len(new_usernames)} new unique users "
+            f"({len(to_resolve)} API lookups, {len(resolved) - len(fresh)} from owner map, {len(failed)} failed)."
+        )
         return new_usernames
 
+    @staticmethod
+    def _claim(store, members: List[str]) -> List[str]:
+        """Marks members as seen and returns the ones that were new (atomic across workers)."""
+        return [m for m, new in zip(members, store.check_and_add(members)) if new]
+
     async def discover_network_peers(self, seed_username: str) -> List[str]:
         """
         Scrapes Followers and Similar Accounts of a seed user.
         """
         logger.info(f"Starting Network Discovery for seed: @{seed_username}")
-        new_usernames = []
         
         # 1. Resolve ID (needed for followers)
-        # Check Redis cache first? No, we need fresh ID.
-        # We can use scraper to get profile.
         profile = await self.scraper.get_user_profile(seed_username)
         if not profile:
              logger.warning(f"Could not resolve seed {seed_username}")
              return []
              
-        # PROFILE returns dict, but we need ID. 
-        # Wait, get_user_profile doesn't return ID in the dict!
-        # I need to fetch ID raw or update get_user_profile. 
-        # Let's fix get_user_profile in next step if needed, but for now allow scraper to handle ID lookup internally?
-        # Actually `get_followers` takes `user_id`.
-        # Let's assume we can get it from an unlisted field or re-fetch.
-        # HACK: Use `search_location` style direct call or trust `get_user_profile` updates.
-        # Actually, let's just use the `get_post_info` trick if they have posts? No.
-        # Let's try to get ID from profile result (we need to make sure scraper returns it).
-        
-        # NOTE: I will update scraper to return ID in next step.
-        # For now, let's assume `profile` dict has 'id' or we skipped that update.
-        # I recall I didn't update get_user_profile to return 'id'. 
-        # I should have done that.
-        # But let's proceed with logic.
-        
-        # Let's do a quick lookup via client to be safe if ID missing
+        # get_user_profile returns the numeric id (from the cached payload), so
+        # there's no second USER_INFO_URL request just to resolve it
         user_id = profile.get("id")
-        if not user_id:
-             # Try direct lookup
-             d = {"username_or_url": seed_username}
-             resp = await self.scraper.client.post(self.scraper.USER_INFO_URL, data=d)
-             if resp.status_code == 200:
-                 dd = resp.json()
-                 user_id = dd.get("data", dd).get("id")
         
         if not user_id:
             logger.warning(f"No ID found for {seed_username}")
@@ -114,19 +104,17 @@ class DiscoveryEngine:
 
         # 2. Get Followers
         followers = await self.scraper.get_followers(user_id)
-        for u in followers:
-            uname = u.get("username")
-            if uname and not self.redis.sismember("seen_usernames", uname):
-                self.redis.sadd("seen_usernames", uname)
-                new_usernames.append(uname)
                 
         # 3. Get Similar
         similar = await self.scraper.get_similar_accounts(seed_username)
-        for u in similar:
-            uname = u.get("username")
-            if uname and not self.redis.sismember("seen_usernames", uname):
-                self.redis.sadd("seen_usernames", uname)
-                new_usernames.append(uname)
+
+        peers = [u for u in followers + similar if u.get("username")]
+        new_usernames = self._claim(self.seen_usernames, list(dict.fromkeys(u["username"] for u in peers)))
+
+        # Remember id -> username so hashtag discovery can skip the lookup for these accounts
+        owners = {str(u["id"]): u["username"] for u in peers if u.get("id")}
+        if owners:
+            self.redis.hset(OWNER_USERNAMES_KEY, mapping=owners)
 
         logger.info(f"@{seed_username}: Found {len(followers)} followers, {len(similar)} lookalikes. {len(new_usernames)} new unique users.")
         return new_usernames
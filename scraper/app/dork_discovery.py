@@ -1,10 +1,20 @@
 import asyncio
+import heapq
+import inspect
+import random
 import re
+import time
 import httpx
+from collections import deque
 from pathlib import Path
-from typing import List, AsyncGenerator
+from urllib.parse import urlparse
+from typing import Any, AsyncGenerator, Callable, Dict, Iterable, List, Optional, Tuple
 from loguru import logger
 from app.config import settings
+from app.utils.http_pool import http_pool
+from app.utils.dedup import dedup_store
+from app.utils.adaptive_limit import AdaptiveConcurrency, parse_retry_after
+from app.dork_history import DorkQueryStore, dedupe_queries
 import redis
 
 class GoogleDorker:
@@ -20,17 +30,26 @@ class GoogleDorker:
     def __init__(self):
         self.redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
         self.sem = asyncio.Semaphore(settings.FIRECRAWL_CONCURRENCY)
-        self.client = httpx.AsyncClient(timeout=60.0)
+        self.seen = {
+            "instagram": dedup_store("seen_usernames", self.redis),
+            "tiktok": dedup_store("tiktok_seen_users", self.redis),
+        }
         
         # Regex (matches instagram.com/username)
         # Groups: (1) username
         self.username_pattern = re.compile(r'instagram\.com/([a-zA-Z0-9_\.]+)')
 
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared keep-alive client for the Firecrawl host (see app/utils/http_pool.py)."""
+        return http_pool.get(urlparse(self.API_URL).netloc, timeout=60.0)
+
     async def close(self):
-        await self.client.aclose()
+        """Closes the pooled Firecrawl client on this event loop (call once at the end of a run)."""
+        await http_pool.aclose(urlparse(self.API_URL).netloc)
 
     def _load_queries(self) -> List[str]:
-        """Loads queries from text file (one per line, skips comments/blanks)."""
+        """Loads queries from text file (one per line, skips comments/blanks and duplicates)."""
         queries = []
         if self.QUERIES_FILE.exists():
             with open(self.QUERIES_FILE, 'r', encoding='utf-8') as f:
@@ -38,7 +57,12 @@ class GoogleDorker:
                     line = line.strip()
                     if line and not line.startswith('#'):
                         queries.append(line)
-            logger.info(f"📂 Loaded {len(queries)} dork queries from {self.QUERIES_FILE.name}")
+            unique = dedupe_queries(queries)
+            logger.info(
+                f"📂 Loaded {len(unique)} dork queries from {self.QUERIES_FILE.name}"
+                f" ({len(queries) - len(unique)} duplicates dropped)"
+            )
+            queries = unique
         else:
             logger.warning(f"⚠️ Queries file not found: {self.QUERIES_FILE}")
         return queries
@@ -49,65 +73,95 @@ class GoogleDorker:
         for q in queries:
             yield q
 
-    async def run_search(self, query: str, platform: str = "instagram", _retry_count: int = 0) -> List[str]:
-        """Runs a search via Firecrawl and returns discovered usernames."""
-        MAX_RETRIES = 3
-
-        if not settings.FIRECRAWL_API_KEY:
-            logger.error("FIRECRAWL_API_KEY not set. Skipping dork.")
-            return []
-
-        if _retry_count >= MAX_RETRIES:
-            logger.error(f"Max retries ({MAX_RETRIES}) reached for query: {query[:50]}...")
-            return []
-
-        discovered = []
-        
-        async with self.sem:
-            logger.info(f"🔥 DORKING [{platform.upper()}]: {query}")
+    async def search_once(self, query: str, platform: str = "instagram") -> Dict:
+        """
+        One Firecrawl request, no sleeping or retrying (the caller decides).
+        Returns {"status": ok | throttled | retry | failed, "usernames": [...] (new ones),
+        "urls": [...] (every result URL), "retry_after": seconds from the Retry-After header or None}.
+        """
+        result = {"status": "failed", "usernames": [], "urls": [], "retry_after": None}
+        logger.info(f"🔥 DORKING [{platform.upper()}]: {query}")
+        try:
+            headers = {"Authorization": f"Bearer {settings.FIRECRAWL_API_KEY}"}
+            payload = {
+                "query": query,
+                "limit": 100, # Maximize yield per credit (API supports up to 100)
+                "lang": "en",
+                "country": "us"
+            }
+            
+            resp = await self.client.post(self.API_URL, headers=headers, json=payload)
+        except (httpx.TimeoutException, httpx.TransportError) as e:
+            logger.warning(f"Dork request failed ({type(e).__name__}): {query[:50]}...")
+            result["status"] = "retry"
+            return result
+        except Exception as e:
+            logger.error(f"Dork Error: {e}")
+            return result
+            
+        if resp.status_code == 200:
             try:
-                headers = {"Authorization": f"Bearer {settings.FIRECRAWL_API_KEY}"}
-                payload = {
-                    "query": query,
-                    "limit": 100, # Maximize yield per credit (API supports up to 100)
-                    "lang": "en",
-                    "country": "us"
-                }
-                
-                resp = await self.client.post(self.API_URL, headers=headers, json=payload)
+                data = resp.json()
+                # Structure: { "success": true, "data": [ { "url": "...", ... } ] }
                 
-                if resp.status_code == 200:
-                    data = resp.json()
-                    # Structure: { "success": true, "data": [ { "url": "...", ... } ] }
+                if data.get("success") and "data" in data:
+                    results = data["data"]
+                    unames = []
+                    for item in results:
+                        url = item.get("url")
+                        if url:
+                            result["urls"].append(url)
+                            uname = self._extract_username(url, platform)
+                            if uname:
+                                unames.append(uname)
                     
-                    if data.get("success") and "data" in data:
-                        results = data["data"]
-                        for item in results:
-                            url = item.get("url")
-                            if url:
-                                uname = self._extract_username(url, platform)
-                                redis_key = "tiktok_seen_users" if platform == "tiktok" else "seen_usernames"
+                    # One batched check-and-add for the whole result page
+                    store = self.seen["tiktok" if platform == "tiktok" else "instagram"]
+                    unames = list(dict.fromkeys(unames))
+                    result["usernames"] = [u for u, new in zip(unames, store.check_and_add(unames)) if new]
+                    result["status"] = "ok"
                                 
-                                if uname and not self.redis.sismember(redis_key, uname):
-                                    self.redis.sadd(redis_key, uname)
-                                    discovered.append(uname)
-                                    
-                        logger.info(f"✅ Query '{query[:30]}...' -> {len(discovered)} new users")
-                    else:
-                        logger.warning(f"Firecrawl returned success=false? {data}")
-                        
-                elif resp.status_code == 429:
-                    backoff_time = 30 * (2 ** _retry_count)  # Exponential backoff: 30s, 60s, 120s
-                    logger.warning(f"Firecrawl 429 Rate Limit Hit. Backing off for {backoff_time}s (retry {_retry_count + 1}/{MAX_RETRIES})...")
-                    await asyncio.sleep(backoff_time)
-                    return await self.run_search(query, platform, _retry_count + 1)
+                    logger.info(f"✅ Query '{query[:30]}...' -> {len(result['usernames'])} new users")
                 else:
-                    logger.error(f"Firecrawl Error {resp.status_code}: {resp.text[:200]}")
-                    
+                    logger.warning(f"Firecrawl returned success=false? {data}")
             except Exception as e:
-                logger.error(f"Dork Error: {e}")
+                # Non-JSON / unexpected body, or the dedup store (Redis) failing
+                logger.error(f"Dork result handling failed for '{query[:30]}...': {type(e).__name__}: {e}")
+                result.update(status="failed", usernames=[], urls=[])
                 
-        return discovered
+        elif resp.status_code == 429:
+            result["status"] = "throttled"
+            result["retry_after"] = parse_retry_after(resp.headers.get("retry-after"))
+        elif resp.status_code >= 500:
+            logger.warning(f"Firecrawl {resp.status_code} for '{query[:30]}...'")
+            result["status"] = "retry"
+        else:
+            logger.error(f"Firecrawl Error {resp.status_code}: {resp.text[:200]}")
+            
+        return result
+
+    async def run_search(self, query: str, platform: str = "instagram") -> List[str]:
+        """
+        Runs a single search via Firecrawl and returns discovered usernames.
+        For many queries use DorkExecutor, which adapts concurrency to 429s.
+        """
+        if not settings.FIRECRAWL_API_KEY:
+            logger.error("FIRECRAWL_API_KEY not set. Skipping dork.")
+            return []
+
+        for attempt in range(settings.FIRECRAWL_MAX_RETRIES + 1):
+            async with self.sem:
+                result = await self.search_once(query, platform)
+            if result["status"] not in ("throttled", "retry"):
+                return result["usernames"]
+            if attempt < settings.FIRECRAWL_MAX_RETRIES:
+                # Back off outside the semaphore so the slot stays usable
+                delay = result["retry_after"] or settings.FIRECRAWL_RETRY_BACKOFF * 2 ** attempt
+                logger.warning(f"Firecrawl {result['status']}, retrying in {delay:.0f}s ({attempt + 1}/{settings.FIRECRAWL_MAX_RETRIES})...")
+                await asyncio.sleep(delay)
+
+        logger.error(f"Max retries ({settings.FIRECRAWL_MAX_RETRIES}) reached for query: {query[:50]}...")
+        return []
 
     def _extract_username(self, url: str, platform: str = "instagram") -> str:
         """Extracts username from a single URL."""
@@ -124,3 +178,131 @@ class GoogleDorker:
                  if u.lower() not in ['p', 'reel', 'reels', 'explore', 'tags', 'stories', 'legal', 'about']:
                       return u
         return None
+
+
+class DorkExecutor:
+    """
+    Runs many dork queries through GoogleDorker as one continuous work queue.
+
+    A new search starts whenever a slot frees up; the number of slots is an
+    AIMD limit (app/utils/adaptive_limit.py) that grows while Firecrawl keeps
+    answering and halves on a 429, between FIRECRAWL_MIN_CONCURRENCY and
+    FIRECRAWL_CONCURRENCY. A Retry-After pauses every new request until it has
+    passed. Throttled / transient failures are re-queued with a not-before
+    time (Retry-After, or exponential backoff) instead of sleeping in a slot.
+    With a DorkQueryStore every successful query's URLs and yield are recorded.
+    An async on_result keeps its slot until it returns, so a consumer that
+    blocks (e.g. on a bounded queue) slows searching down to its own pace.
+
+        executor = DorkExecutor(dorker)
+        stats = await executor.run(queries, on_result=lambda q, users: ...)
+    """
+
+    def __init__(
+        self,
+        dorker: GoogleDorker,
+        platform: str = "instagram",
+        limiter: Optional[AdaptiveConcurrency] = None,
+        history: Optional[DorkQueryStore] = None,
+    ):
+        self.dorker = dorker
+        self.platform = platform
+        self.history = history
+        self.limiter = limiter or AdaptiveConcurrency(
+            initial=settings.FIRECRAWL_INITIAL_CONCURRENCY,
+            minimum=settings.FIRECRAWL_MIN_CONCURRENCY,
+            maximum=settings.FIRECRAWL_CONCURRENCY,
+            latency_target=settings.FIRECRAWL_LATENCY_TARGET or None,
+            name="Firecrawl",
+        )
+
+    async def run(
+        self,
+        queries: Iterable[str],
+        on_result: Optional[Callable[[str, List[str]], Any]] = None,
+    ) -> Dict:
+        """Runs every query; on_result(query, new_usernames) (sync or async) is called per successful query."""
+        if not settings.FIRECRAWL_API_KEY:
+            logger.error("FIRECRAWL_API_KEY not set. Skipping dork.")
+            return {}
+
+        loop = asyncio.get_running_loop()
+        ready = deque((q, 0) for q in queries)
+        delayed: List[Tuple[float, int, str, int]] = [] # (not_before, seq, query, attempt)
+        tasks = set()
+        stats = {"queries": len(ready), "ok": 0, "failed": 0, "retries": 0, "usernames": 0}
+        seq = 0
+        start = loop.time()
+
+        async def one(query: str, attempt: int, started: float):
+            nonlocal seq
+            status, answered = "failed", None
+            try:
+                try:
+                    result = await self.dorker.search_once(query, self.platform)
+                except Exception as e:
+                    logger.error(f"Dork search crashed ({type(e).__name__}: {e}): {query[:50]}...")
+                    result = {"status": "failed", "usernames": [], "urls": [], "retry_after": None}
+                answered = time.monotonic()
+                status = result["status"]
+
+                if status == "ok":
+                    stats["ok"] += 1
+                    stats["usernames"] += len(result["usernames"])
+                    if self.history:
+                        self.history.record(query, result["urls"], len(result["usernames"]))
+                    if on_result:
+                        try:
+                            ret = on_result(query, result["usernames"])
+                            if inspect.isawaitable(ret):
+                                # The slot is held until this returns, so a handler that
+                                # blocks (e.g. on a bounded queue) throttles new searches
+                                await ret
+                        except Exception as e:
+                            logger.error(f"on_result failed for query {query[:50]}...: {type(e).__name__}: {e}")
+                elif status in ("throttled", "retry") and attempt < settings.FIRECRAWL_MAX_RETRIES:
+                    delay = result["retry_after"]
+                    if delay is not None:
+                        self.limiter.pause(delay)
+                    else:
+                        delay = settings.FIRECRAWL_RETRY_BACKOFF * 2 ** attempt * random.uniform(0.8, 1.2)
+                    stats["retries"] += 1
+                    seq += 1
+                    heapq.heappush(delayed, (loop.time() + delay, seq, query, attempt + 1))
+                else:
+                    stats["failed"] += 1
+                    logger.error(f"Giving up on query ({status}, {attempt + 1} attempts): {query[:50]}...")
+            finally:
+                self.limiter.release(started, throttled=status == "throttled", ok=status == "ok", end=answered)
+
+        try:
+            while ready or delayed or tasks:
+                now = loop.time()
+                while delayed and delayed[0][0] <= now:
+                    _, _, query, attempt = heapq.heappop(delayed)
+                    ready.append((query, attempt))
+
+                if not ready:
+                    # Nothing startable: wait for a search to finish or a retry to come due
+                    timeout = max(0.0, delayed[0][0] - now) if delayed else None
+                    if tasks:
+                        await asyncio.wait(set(tasks), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                    else:
+                        await asyncio.sleep(timeout)
+                    continue
+
+                started = await self.limiter.acquire()
+                query, attempt = ready.popleft()
+                task = asyncio.create_task(one(query, attempt, started))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        elapsed = loop.time() - start
+        stats["queries_per_minute"] = round(stats["ok"] / elapsed * 60, 1) if elapsed else 0.0
+        stats["concurrency"] = self.limiter.snapshot()
+        logger.info(f"Dork executor: {stats}")
+        return stats
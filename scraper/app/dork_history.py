@@ -0,0 +1,139 @@
+import hashlib
+import re
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+from loguru import logger
+from sqlalchemy.orm import Session as SASession
+from app.models import DorkQuery
+
+TOKEN_RE = re.compile(r'-?"[^"]*"|\S+')
+OPERATORS = {"OR", "AND", "|"} # Only recognised upper-case; "or" is a plain search term
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form used to spot duplicate dorks: straight quotes, collapsed
+    whitespace, terms lowercased (operators keep their case). Plain ANDed
+    terms are also deduped and sorted, since their order doesn't change the
+    results; queries with OR or parentheses keep their token order.
+    """
+    query = query.replace("“", '"').replace("”", '"').replace("’", "'")
+    tokens = [" ".join(token.split()) for token in TOKEN_RE.findall(query)]
+    tokens = [token if token in OPERATORS else token.lower() for token in tokens]
+    if "(" in query or ")" in query or "OR" in tokens or "|" in tokens:
+        return " ".join(tokens)
+    return " ".join(sorted(set(tokens)))
+
+
+def query_key(query: str) -> str:
+    return hashlib.sha1(normalize_query(query).encode()).hexdigest()
+
+
+def dedupe_queries(queries: Iterable[str]) -> List[str]:
+    """Drops exact and normalized duplicates, keeping the first occurrence."""
+    seen = {}
+    for query in queries:
+        seen.setdefault(query_key(query), query)
+    return list(seen.values())
+
+
+class DorkQueryStore:
+    """
+    Persistent per-query history (dork_queries table): result URLs and time of
+    the last run, and how many new users each run yielded.
+
+    select() turns the query file into this run's work list: with a cutoff,
+    only queries never run, last run before the cutoff, or whose last run still
+    found new users; always ordered by yield (best first, never-run queries
+    ranked at the average so they get tried early).
+
+        history = DorkQueryStore(Session, platform="instagram")
+        queries = history.select(queries, cutoff=datetime.utcnow() - timedelta(days=7))
+        ... history.record(query, urls, new_users)
+    """
+
+    def __init__(self, session_factory: Callable[[], SASession], platform: str = "instagram"):
+        self.session_factory = session_factory
+        self.platform = platform
+        self._table_checked = False
+
+    def _session(self) -> SASession:
+        session = self.session_factory()
+        if not self._table_checked:
+            # Runner scripts don't call create_all; make sure the table exists
+            DorkQuery.__table__.create(session.get_bind(), checkfirst=True)
+            self._table_checked = True
+        return session
+
+    def _rows(self, session: SASession, keys: List[str]) -> Dict[str, DorkQuery]:
+        rows = {}
+        for i in range(0, len(keys), 500):
+            for row in session.query(DorkQuery).filter(
+                DorkQuery.platform == self.platform, DorkQuery.query_key.in_(keys[i:i + 500])
+            ):
+                rows[row.query_key] = row
+        return rows
+
+    def select(self, queries: List[str], cutoff: Optional[datetime] = None) -> List[str]:
+        """Queries to run now (see class docstring), highest expected yield first."""
+        queries = dedupe_queries(queries)
+        session = self._session()
+        try:
+            rows = self._rows(session, [query_key(q) for q in queries])
+        finally:
+            session.close()
+
+        ran = [r for r in rows.values() if r.runs]
+        prior = sum(r.total_yield / r.runs for r in ran) / len(ran) if ran else 0.0
+
+        selected = []
+        skipped = 0
+        for query in queries:
+            row = rows.get(query_key(query))
+            if row is None or not row.runs:
+                selected.append((prior, 0, query))
+                continue
+            fresh = cutoff is not None and row.last_run_at and row.last_run_at >= cutoff
+            if fresh and not row.last_yield:
+                skipped += 1
+                continue
+            selected.append((row.total_yield / row.runs, row.last_yield, query))
+
+        selected.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        if cutoff is not None:
+            logger.info(
+                f"Dork history [{self.platform}]: {len(selected)} queries to run, "
+                f"{skipped} skipped (run since {cutoff:%Y-%m-%d %H:%M} with no new users)"
+            )
+        return [query for _, _, query in selected]
+
+    def record(self, query: str, urls: List[str], new_users: int):
+        """Stores one successful run of `query`."""
+        key = query_key(query)
+        session = self._session()
+        try:
+            row = session.query(DorkQuery).filter_by(platform=self.platform, query_key=key).first()
+            if row is None:
+                row = DorkQuery(platform=self.platform, query=query, query_key=key, runs=0, total_yield=0)
+                session.add(row)
+            row.result_urls = urls
+            row.last_run_at = datetime.utcnow()
+            row.last_yield = new_users
+            row.runs = (row.runs or 0) + 1
+            row.total_yield = (row.total_yield or 0) + new_users
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.warning(f"Could not record dork history for '{query[:40]}': {e}")
+        finally:
+            session.close()
+
+
+def cutoff_from_args(since: Optional[str], stale_after: Optional[float]) -> Optional[datetime]:
+    """--since YYYY-MM-DD / --stale-after DAYS -> datetime cutoff (None = run everything)."""
+    if since:
+        return datetime.fromisoformat(since)
+    if stale_after is not None:
+        return datetime.utcnow() - timedelta(days=stale_after)
+    return None
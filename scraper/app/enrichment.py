@@ -1,10 +1,37 @@
-import re
+import time
 import asyncio
 import random
-from typing import Optional, Dict
-from playwright.async_api import async_playwright, Page
+from typing import Optional, Dict, Tuple
+from urllib.parse import urlparse
 from loguru import logger
 from app.config import settings
+from app.utils.browser_pool import BrowserPool, browser_pool, USER_AGENTS
+from app.utils.rate_limiter import rate_limits
+from app.utils import bio_links, emails
+from app.utils.enrichment_cache import enrichment_cache
+
+
+class TierLimits:
+    """
+    Concurrency caps for the network tiers, shared by every EnrichmentEngine on
+    the same event loop (so concurrent Celery tasks in one worker share them too).
+    Tier 1 is a regex over the bio and is never limited.
+    """
+
+    def __init__(self):
+        self._sems: Dict[tuple, asyncio.Semaphore] = {}
+
+    def get(self, tier: int) -> asyncio.Semaphore:
+        key = (id(asyncio.get_running_loop()), tier)
+        sem = self._sems.get(key)
+        if sem is None:
+            limit = settings.ENRICH_TIER2_CONCURRENCY if tier == 2 else settings.ENRICH_TIER3_CONCURRENCY
+            sem = self._sems[key] = asyncio.Semaphore(limit)
+        return sem
+
+
+tier_limits = TierLimits()
+
 
 class EnrichmentEngine:
     """
@@ -15,14 +42,24 @@ class EnrichmentEngine:
     3. Tier 3: Mobile Emulator Fallback (Slow/Expensive)
     """
     
-    USER_AGENTS = [
-        "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1",
-        "Mozilla/5.0 (Linux; Android 10; SM-G981B) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/80.0.3987.162 Mobile Safari/537.36"
-    ]
+    USER_AGENTS = USER_AGENTS
     
     # Tier 2 Targets
     BIO_LINK_DOMAINS = ["linktr.ee", "beacons.ai", "carrd.co", "taplink.cc"]
 
+    def __init__(self, pool: Optional[BrowserPool] = None):
+        # Browsers are leased from the shared pool instead of launched per lead
+        self.pool = pool or browser_pool
+        # Tier 2 outcomes: static = resolved from plain HTML, browser = needed Chromium
+        self.tier2_stats = {
+            "static_found": 0, "static_empty": 0, "browser_found": 0, "browser_empty": 0,
+            "static_seconds": 0.0, "browser_seconds": 0.0,
+        }
+
+    def bio_email(self, user_data: Dict) -> Optional[str]:
+        """Tier 1 only (no I/O): lets schedulers settle these leads without a slot."""
+        return enrichment_cache.bio_result(user_data.get('biography') or "", self._tier1_regex)
+
     async def enrich_user(self, user_data: Dict) -> Optional[str]:
         """
         Main entry point.
@@ -35,21 +72,33 @@ class EnrichmentEngine:
         logger.info(f"🔍 Enriching {username}...")
 
         # --- Tier 1: Bio Regex ---
-        email = self._tier1_regex(bio)
+        email = enrichment_cache.bio_result(bio, self._tier1_regex)
         if email:
             logger.success(f"✅ Tier 1 (Regex) Success: {email}")
             return email
 
         # --- Tier 2: Bio Link ---
         if external_url and any(d in external_url for d in self.BIO_LINK_DOMAINS):
-            email = await self._tier2_bio_link(external_url)
+            async def load():
+                async with tier_limits.get(2):
+                    await rate_limits.acquire(urlparse(external_url).netloc, settings.ENRICH_DOMAIN_RATE_LIMIT)
+                    found, failed = await self._tier2_bio_link(external_url)
+                if found:
+                    return [found]
+                return None if failed else [] # Only a clean visit with no match is negative-cached
+
+            # Shared pages (agencies, restaurant groups) are only visited once per TTL
+            cached = await enrichment_cache.url_emails(external_url, load, source="tier2")
+            email = next((e for e in map(emails.clean, cached) if e), None)
             if email:
                 logger.success(f"✅ Tier 2 (Linktree) Success: {email}")
                 return email
 
         # --- Tier 3: Mobile Emulation ---
         # Only if we really need it.
-        email = await self._tier3_mobile_emulation(username)
+        async with tier_limits.get(3):
+            await rate_limits.acquire("www.instagram.com", settings.ENRICH_DOMAIN_RATE_LIMIT)
+            email = await self._tier3_mobile_emulation(username)
         if email:
             logger.success(f"✅ Tier 3 (Mobile) Success: {email}")
             return email
@@ -58,58 +107,82 @@ class EnrichmentEngine:
         return None
 
     def _tier1_regex(self, text: str) -> Optional[str]:
-        """Scan text for email patterns."""
-        if not text:
-            return None
-        # Basic email regex
-        match = re.search(r'[\w\.-]+@[\w\.-]+\.\w+', text)
-        if match:
-            return match.group(0)
-        # Obfuscated: "foo [at] gmail"
-        match_obfuscated = re.search(r'([\w\.-]+)\s*\[at\]\s*([\w\.-]+\.\w+)', text, re.IGNORECASE)
-        if match_obfuscated:
-            return f"{match_obfuscated.group(1)}@{match_obfuscated.group(2)}"
-        return None
+        """Scan text for email patterns (plain and obfuscated, e.g. "foo [at] gmail [dot] com")."""
+        return emails.first(text)
 
-    async def _tier2_bio_link(self, url: str) -> Optional[str]:
-        """Visit the bio link and search for mailto or text."""
-        # We start a lightweight browser context just for this page
-        email = None
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
-            try:
-                await page.goto(url, timeout=15000) # Fast timeout
-                content = await page.content()
-                
-                # Check 1: Mailto in HTML
-                mailto = await page.evaluate(r"""() => {
-                    const link = document.querySelector('a[href^="mailto:"]');
-                    return link ? link.href : null;
-                }""")
-                if mailto:
-                     return mailto.replace("mailto:", "").split("?")[0]
+    async def _tier2_bio_link(self, url: str) -> Tuple[Optional[str], bool]:
+        """
+        Static fetch + parse first (mailto links, embedded JSON, visible text);
+        Chromium only if that finds nothing and the page looks JS-rendered.
+        Returns (email, failed): failed means the miss was transient (fetch or
+        browser error) rather than a page that loaded and had no email.
+        """
+        start = time.perf_counter()
+        html, escalate, failed = await bio_links.fetch(url)
+        email = bio_links.parse(url, html) if html is not None else None
+        if html is not None and not email:
+            escalate = bio_links.looks_js_rendered(html)
+        if email or not escalate:
+            self.tier2_stats["static_found" if email else "static_empty"] += 1
+            self.tier2_stats["static_seconds"] += time.perf_counter() - start
+            return email, failed and not email
 
-                # Check 2: Regex on the visible text
-                text_content = await page.inner_text("body")
-                return self._tier1_regex(text_content)
-                
-            except Exception as e:
-                logger.warning(f"Tier 2 failed on {url}: {e}")
-            finally:
-                await browser.close()
-        return None
+        logger.debug(f"Tier 2: {url} needs a browser")
+        email, failed = await self._tier2_browser(url)
+        self.tier2_stats["browser_found" if email else "browser_empty"] += 1
+        self.tier2_stats["browser_seconds"] += time.perf_counter() - start
+        return email, failed
+
+    def tier2_report(self) -> Dict:
+        """Share of Tier 2 leads settled without a browser and the estimated time saved."""
+        st = self.tier2_stats
+        static = st["static_found"] + st["static_empty"]
+        browser = st["browser_found"] + st["browser_empty"]
+        report = {
+            "tier2_leads": static + browser,
+            "without_browser": round(static / (static + browser), 3) if static + browser else 0.0,
+            "avg_static_seconds": round(st["static_seconds"] / static, 2) if static else None,
+            "avg_browser_seconds": round(st["browser_seconds"] / browser, 2) if browser else None,
+        }
+        if static and browser:
+            report["seconds_saved"] = round(static * (report["avg_browser_seconds"] - report["avg_static_seconds"]), 1)
+        return report
+
+    async def _tier2_browser(self, url: str) -> Tuple[Optional[str], bool]:
+        """
+        Visit the bio link in Chromium and search for mailto or text.
+        Returns (email, failed); failed = timeout / crash / navigation error.
+        """
+        try:
+            # Lease a pooled context (no browser cold start per lead)
+            async with self.pool.lease() as context:
+                page = await context.new_page()
+                try:
+                    await page.goto(url, timeout=15000) # Fast timeout
+                    
+                    # Check 1: Mailto in HTML
+                    mailto = await page.evaluate(r"""() => {
+                        const link = document.querySelector('a[href^="mailto:"]');
+                        return link ? link.href : null;
+                    }""")
+                    email = emails.clean(mailto.replace("mailto:", "").split("?")[0]) if mailto else None
+                    if email:
+                        return email, False
+
+                    # Check 2: Regex on the visible text
+                    text_content = await page.inner_text("body")
+                    return self._tier1_regex(text_content), False
+                finally:
+                    await page.close()
+        except Exception as e:
+            logger.warning(f"Tier 2 failed on {url}: {e}")
+            return None, True
 
     async def _tier3_mobile_emulation(self, username: str) -> Optional[str]:
         """Original Playwright Mobile Strategy"""
         email = None
-        async with async_playwright() as p:
-            iphone = p.devices['iPhone 12 Pro']
-            # Fix: Update dictionary directly to avoid duplicate kwarg error
-            iphone['user_agent'] = random.choice(self.USER_AGENTS)
-            
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(**iphone)
+        # Pooled context with the prebuilt iPhone profile (random mobile UA per context)
+        async with self.pool.lease(mobile=True) as context:
             page = await context.new_page()
             
             try:
@@ -149,7 +222,7 @@ class EnrichmentEngine:
             except Exception as e:
                 logger.error(f"Tier 3 Error @{username}: {e}")
             finally:
-                await browser.close()
+                await page.close()
                 
         return email
 
@@ -163,4 +236,5 @@ if __name__ == "__main__":
             "biography": "Love food! contact: tasty@food.com",
             "external_url": None
         }))
+        await browser_pool.close()
     asyncio.run(test())
@@ -0,0 +1,114 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from loguru import logger
+from app.config import settings
+from app.enrichment import EnrichmentEngine
+from app.utils.enrichment_cache import enrichment_cache
+
+
+class EnrichmentScheduler:
+    """
+    Runs EnrichmentEngine over many leads concurrently.
+
+    Leads whose bio already contains an email (Tier 1) are settled up front
+    without taking a slot. The rest are worked by ENRICH_CONCURRENCY workers;
+    inside enrich_user the bio-link and mobile tiers are capped separately
+    (ENRICH_TIER2_CONCURRENCY / ENRICH_TIER3_CONCURRENCY) and every target
+    domain has its own rate limit, so there is no global sleep between leads.
+
+    Results are handed to on_result(lead, email) as they arrive (email is None
+    when nothing was found) and on_batch() runs every ENRICH_COMMIT_EVERY
+    results and once at the end, which is where callers commit.
+
+        scheduler = EnrichmentScheduler()
+        stats = await scheduler.run(leads, on_result=save, on_batch=session.commit)
+
+    A lead can be an ORM row or a dict; it needs username, biography, external_url.
+    """
+
+    def __init__(
+        self,
+        engine: Optional[EnrichmentEngine] = None,
+        concurrency: Optional[int] = None,
+        commit_every: Optional[int] = None,
+    ):
+        self.engine = engine or EnrichmentEngine()
+        self.concurrency = concurrency or settings.ENRICH_CONCURRENCY
+        self.commit_every = commit_every or settings.ENRICH_COMMIT_EVERY
+
+    @staticmethod
+    def user_data(lead: Any) -> Dict:
+        get = lead.get if isinstance(lead, dict) else lambda k: getattr(lead, k, None)
+        return {
+            "username": get("username"),
+            "biography": get("biography") or "",
+            "external_url": get("external_url") or "",
+        }
+
+    async def run(
+        self,
+        leads: Iterable[Any],
+        on_result: Optional[Callable[[Any, Optional[str]], None]] = None,
+        on_batch: Optional[Callable[[], None]] = None,
+    ) -> Dict[str, Any]:
+        leads = list(leads)
+        stats = {"leads": len(leads), "found": 0, "tier1": 0, "errors": 0}
+        pending = 0
+        start = time.perf_counter()
+
+        def record(lead, email):
+            nonlocal pending
+            if email:
+                stats["found"] += 1
+            if on_result:
+                on_result(lead, email)
+            pending += 1
+            if on_batch and pending >= self.commit_every:
+                on_batch()
+                pending = 0
+
+        # Tier 1 needs no I/O: settle those immediately
+        queue: asyncio.Queue = asyncio.Queue()
+        for lead in leads:
+            email = self.engine.bio_email(self.user_data(lead))
+            if email:
+                stats["tier1"] += 1
+                record(lead, email)
+            else:
+                queue.put_nowait(lead)
+
+        async def worker():
+            while True:
+                try:
+                    lead = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                data = self.user_data(lead)
+                try:
+                    email = await self.engine.enrich_user(data)
+                except Exception as e:
+                    stats["errors"] += 1
+                    logger.error(f"Enrichment failed for @{data['username']}: {e}")
+                    continue
+                record(lead, email)
+
+        workers = min(self.concurrency, queue.qsize())
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        if on_batch and pending:
+            on_batch()
+
+        elapsed = time.perf_counter() - start
+        stats["seconds"] = round(elapsed, 1)
+        stats["leads_per_minute"] = round(len(leads) / elapsed * 60, 1) if elapsed else 0.0
+        stats["tier2"] = self.engine.tier2_report()
+        logger.info(
+            f"Enrichment: {stats['found']}/{stats['leads']} emails ({stats['tier1']} from bio), "
+            f"{stats['errors']} errors, {stats['leads_per_minute']} leads/min"
+        )
+        if stats["tier2"]["tier2_leads"]:
+            logger.info(f"Tier 2 bio links: {stats['tier2']}")
+        stats["cache"] = enrichment_cache.stats()
+        logger.info(f"Enrichment cache: {stats['cache']}")
+        return stats
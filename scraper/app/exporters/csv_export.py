@@ -1,11 +1,9 @@
 import csv
-import os
-import textwrap
 from datetime import datetime
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from app.models import Influencer
-from config import Config
+from app.config import settings
+from app.exporters.stream_export import iter_rows
 
 def extract_first_name(display_name):
     """
@@ -43,70 +41,60 @@ def extract_first_name(display_name):
 
 def export_influencers(filename=None):
     """
-    Export influencers to CSV.
+    Export influencers to CSV (streamed in keyset pages, see stream_export).
     """
     if filename is None:
         filename = f"influencers_export_{datetime.now().strftime('%Y%m%d_%H%M')}.csv"
     
+    fieldnames = [
+        "username",
+        "first_name",
+        "email",
+        "platform",
+        "score",
+        "category",
+        "categories",
+        "follower_count",
+        "profile_url",
+        "bio"
+    ]
+    columns = ["username", "full_name", "email", "score", "category", "matched_signals", "follower_count", "biography"]
+    
     try:
-        engine = create_engine(Config.DATABASE_URI)
+        engine = create_engine(settings.DATABASE_URL)
         Session = sessionmaker(bind=engine)
-        session = Session()
-        
-        results = session.query(Influencer).order_by(Influencer.location_score.desc()).all()
-        
-        print(f"Exporting {len(results)} influencers to {filename}...")
-        
-        fieldnames = [
-            "username",
-            "first_name",
-            "email",
-            "email_source",
-            "platform",
-            "location_score",
-            "persona_type",
-            "categories",
-            "follower_count",
-            "avg_views",
-            "profile_url",
-            "bio"
-        ]
         
+        print(f"Exporting influencers to {filename}...")
+        count = 0
         with open(filename, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
+            writer = csv.writer(f)
+            writer.writerow(fieldnames)
             
-            for inf in results:
+            for username, full_name, email, score, category, signals, followers, bio in iter_rows(Session, "instagram", columns):
                 # Handle potential nulls
-                cats = inf.matched_categories if inf.matched_categories else []
-                if isinstance(cats, list):
-                    cat_str = ",".join(cats)
-                else:
-                    cat_str = str(cats)
-
-                writer.writerow({
-                    "username": inf.username,
-                    "first_name": extract_first_name(inf.display_name),
-                    "email": inf.email or "",
-                    "email_source": inf.email_source or "",
-                    "platform": inf.platform,
-                    "location_score": inf.location_score,
-                    "persona_type": inf.persona_type or "Unknown",
-                    "categories": cat_str,
-                    "follower_count": inf.followers,
-                    "avg_views": round(inf.avg_views or 0, 1),
-                    "profile_url": inf.profile_url,
-                    "bio": (inf.bio_text or "")[:500].replace('\n', ' '), # Clean bio
-                })
+                cats = signals if signals else []
+                cat_str = ",".join(cats) if isinstance(cats, list) else str(cats)
+                
+                writer.writerow([
+                    username,
+                    extract_first_name(full_name),
+                    email or "",
+                    "instagram",
+                    score,
+                    category or "Unknown",
+                    cat_str,
+                    followers,
+                    f"https://www.instagram.com/{username}/",
+                    (bio or "")[:500].replace('\n', ' '), # Clean bio
+                ])
+                count += 1
         
-        print(f"✅ Export Complete: {filename}")
+        print(f"✅ Export Complete: {filename} ({count} rows)")
         return filename
         
     except Exception as e:
         print(f"❌ Export Failed: {e}")
         return None
-    finally:
-        session.close()
 
 if __name__ == "__main__":
     export_influencers()
@@ -0,0 +1,220 @@
+"""
+Streaming lead exports: CSV, gzip CSV and Parquet, Instagram and TikTok.
+
+Rows are read from `accounts` (qualified, one platform per pass) with keyset
+pagination on (score DESC, id DESC): each page is a short
+`SELECT <columns> ... WHERE (score, id) < (last_score, last_id) LIMIT n`
+returning plain tuples (no ORM objects, no identity map), and written before
+the next page is fetched, so memory stays flat however large the tables get.
+Leads with no score come last, paged by id.
+
+    export("leads.csv.gz")                              # both platforms, one file
+    export("ig.parquet", platforms=["instagram"], missing_email=True)
+
+    for row in iter_rows(Session, "tiktok", ["username", "email"]):
+        ...
+"""
+import csv
+import gzip
+import json
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+from loguru import logger
+from sqlalchemy import Boolean, DateTime, Float, Integer, JSON, select, tuple_
+from sqlalchemy.orm import Session as SASession
+from app.config import settings
+from app.models import Account, Influencer, TikTokInfluencer, VIEWS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# Platform -> compatibility view whose (legacy) column names the export uses
+PLATFORMS = {"instagram": Influencer, "tiktok": TikTokInfluencer}
+
+# Default columns per platform (same as the original export scripts)
+FIELDS = {
+    "instagram": [
+        "username", "full_name", "score", "email",
+        "follower_count", "following_count", "media_count",
+        "city", "category", "is_business", "is_verified",
+        "biography", "external_url", "matched_signals", "discovered_at"
+    ],
+    "tiktok": [
+        "username", "nickname", "score",
+        "follower_count", "following_count", "heart_count", "video_count",
+        "is_verified", "biography", "external_url",
+        "matched_signals", "discovered_at"
+    ],
+}
+
+
+def account_column(platform: str, field: str):
+    """accounts column behind a legacy field name (full_name -> display_name, ...), or None."""
+    name = VIEWS[PLATFORMS[platform]][2].get(field, field)
+    return Account.__table__.c.get(name)
+
+
+def combined_fields(platforms: Sequence[str]) -> List[str]:
+    """Union of the platforms' default columns, in first-seen order."""
+    return list(dict.fromkeys(f for p in platforms for f in FIELDS[p]))
+
+
+def iter_pages(
+    session_factory: Callable[[], SASession],
+    platform: str,
+    fields: Sequence[str],
+    min_score: int = 0,
+    missing_email: bool = False,
+    page_size: Optional[int] = None,
+) -> Iterator[List[tuple]]:
+    """
+    Pages of tuples (one value per field; a field the table lacks is None),
+    best score first. Each page is its own short query, so no cursor or
+    transaction is held open between pages.
+    """
+    accounts = Account.__table__
+    page_size = page_size or settings.EXPORT_PAGE_SIZE
+    present = [f for f in fields if account_column(platform, f) is not None]
+    columns = [account_column(platform, f) for f in present]
+    positions = [present.index(f) if f in present else None for f in fields]
+    score, pk = accounts.c.score, accounts.c.id
+
+    base = select(*columns, score, pk).where(accounts.c.platform == platform, accounts.c.status == "qualified")
+    if min_score > 0:
+        base = base.where(score >= min_score)
+    if missing_email:
+        base = base.where(accounts.c.email.is_(None))
+
+    # Scored rows keyed on (score, id), then unscored rows keyed on id
+    # (NULLs can't take part in a row-value comparison)
+    passes = [(base.where(score.is_not(None)).order_by(score.desc(), pk.desc()), True)]
+    if min_score <= 0:
+        passes.append((base.where(score.is_(None)).order_by(pk.desc()), False))
+
+    session = session_factory()
+    try:
+        for query, scored in passes:
+            last = None
+            while True:
+                page = query
+                if last is not None:
+                    page = page.where(tuple_(score, pk) < last if scored else pk < last[1])
+                rows = session.execute(page.limit(page_size)).all()
+                session.rollback() # End the read transaction between pages
+                if not rows:
+                    break
+                last = (rows[-1][-2], rows[-1][-1])
+                yield [tuple(r[i] if i is not None else None for i in positions) for r in rows]
+                if len(rows) < page_size:
+                    break
+    finally:
+        session.close()
+
+
+def iter_rows(session_factory: Callable[[], SASession], platform: str, fields: Sequence[str], **kwargs) -> Iterator[tuple]:
+    for page in iter_pages(session_factory, platform, fields, **kwargs):
+        yield from page
+
+
+def _csv_value(value):
+    if isinstance(value, str):
+        return value.replace("\n", " ")
+    return value
+
+
+class CsvSink:
+    def __init__(self, path: str, fields: List[str]):
+        opener = gzip.open if path.endswith(".gz") else open
+        self._file = opener(path, "wt", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(fields)
+
+    def write(self, rows: List[tuple]):
+        self._writer.writerows([[_csv_value(v) for v in row] for row in rows])
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetSink:
+    """One row group per page; JSON columns are stored as JSON strings."""
+
+    ARROW_TYPES = {Integer: "int64", Float: "float64", Boolean: "bool_", DateTime: "timestamp"}
+
+    def __init__(self, path: str, fields: List[str], platforms: Sequence[str]):
+        if not PARQUET_AVAILABLE:
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+        self.fields = fields
+        self.json_fields = set()
+        arrow_fields = []
+        for field in fields:
+            column = next(
+                (account_column(p, field) for p in platforms if account_column(p, field) is not None), None
+            )
+            arrow_type = pa.string()
+            if column is not None:
+                if isinstance(column.type, JSON):
+                    self.json_fields.add(field)
+                for sa_type, name in self.ARROW_TYPES.items():
+                    if isinstance(column.type, sa_type):
+                        arrow_type = pa.timestamp("us") if name == "timestamp" else getattr(pa, name)()
+                        break
+            arrow_fields.append(pa.field(field, arrow_type))
+        self.schema = pa.schema(arrow_fields)
+        self._writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+
+    def write(self, rows: List[tuple]):
+        columns = list(zip(*rows))
+        arrays = []
+        for i, field in enumerate(self.fields):
+            values = columns[i]
+            if field in self.json_fields:
+                values = [json.dumps(v) if v is not None else None for v in values]
+            arrays.append(pa.array(values, type=self.schema.field(i).type))
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self._writer.close()
+
+
+def export(
+    path: Optional[str] = None,
+    platforms: Sequence[str] = ("instagram", "tiktok"),
+    fields: Optional[List[str]] = None,
+    min_score: int = 0,
+    missing_email: bool = False,
+    session_factory: Optional[Callable[[], SASession]] = None,
+    page_size: Optional[int] = None,
+) -> Dict:
+    """
+    Streams the platforms' leads into one file; the format follows the
+    extension (.csv, .csv.gz, .parquet). With more than one platform a
+    leading "platform" column is added. Returns {"path", "rows": {platform: n}}.
+    """
+    if session_factory is None:
+        from app.pipeline import Session as session_factory
+    platforms = list(platforms)
+    fields = list(fields or (FIELDS[platforms[0]] if len(platforms) == 1 else combined_fields(platforms)))
+    tagged = len(platforms) > 1
+    columns = ["platform"] + fields if tagged else fields
+    if path is None:
+        name = platforms[0] if len(platforms) == 1 else "combined"
+        path = f"{name}_leads_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+
+    sink = ParquetSink(path, columns, platforms) if path.endswith(".parquet") else CsvSink(path, columns)
+    counts = {}
+    try:
+        for platform in platforms:
+            counts[platform] = 0
+            for page in iter_pages(session_factory, platform, fields, min_score, missing_email, page_size):
+                sink.write([(platform,) + row for row in page] if tagged else page)
+                counts[platform] += len(page)
+            logger.info(f"Exported {counts[platform]} {platform} leads")
+    finally:
+        sink.close()
+    return {"path": path, "rows": counts}
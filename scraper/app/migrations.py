@@ -0,0 +1,170 @@
+"""
+Versioned schema migrations.
+
+create_all only creates missing tables, so it can't add an index (or any
+other change) to a table that already exists. Each migration here runs once
+per database and is recorded in schema_migrations; `python migrate_db.py`
+applies whatever is pending. Migrations must be idempotent (checkfirst), so a
+fresh database built by create_all just records them.
+
+New migrations go at the end of MIGRATIONS as (version, description, fn(conn)).
+"""
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+from loguru import logger
+from sqlalchemy import (
+    Boolean, Column, DateTime, Index, Integer, MetaData, String, Table, false, func, inspect, literal, select, text,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine
+from app.models import Account, Base, Influencer, VIEWS, create_views
+
+schema_migrations = Table(
+    "schema_migrations", MetaData(),
+    Column("version", String(64), primary_key=True),
+    Column("description", String(256)),
+    Column("applied_at", DateTime, default=datetime.utcnow),
+)
+
+
+def _legacy_lead_table(name: str, enriched_flag: bool) -> Table:
+    """The pre-0002 lead tables as far as 0001's indexes need them."""
+    columns = [Column("id", Integer, primary_key=True), Column("score", Integer), Column("email", String(256))]
+    if enriched_flag:
+        columns.append(Column("email_enriched", Boolean))
+    table = Table(name, MetaData(), *columns)
+    candidates = table.c.email.is_(None)
+    if enriched_flag:
+        candidates = candidates & (table.c.email_enriched == false())
+    Index(f"ix_{name}_score_id", table.c.score, table.c.id)
+    Index(f"ix_{name}_enrich_candidates", table.c.score, table.c.id,
+          postgresql_where=candidates, sqlite_where=candidates)
+    Index(f"ix_{name}_email", table.c.email,
+          postgresql_where=table.c.email.is_not(None), sqlite_where=table.c.email.is_not(None))
+    return table
+
+
+LEGACY_LEAD_TABLES = [_legacy_lead_table("influencers", True), _legacy_lead_table("tiktok_influencers", False)]
+
+
+def _create_indexes(*names: str) -> Callable[[Connection], None]:
+    """
+    Creates declared indexes the table doesn't have yet. An existing full
+    index that is now declared partial (*_where) is rebuilt. Tables that are
+    views by now (after 0002) are skipped.
+    """
+    def run(conn: Connection):
+        tables = set(inspect(conn).get_table_names())
+        for table in LEGACY_LEAD_TABLES:
+            if table.name not in tables:
+                continue
+            existing = {ix["name"]: ix for ix in inspect(conn).get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in names:
+                    continue
+                current = existing.get(index.name)
+                if current is not None:
+                    where = f"{conn.dialect.name}_where"
+                    if index.dialect_kwargs.get(where) is None or where in current.get("dialect_options", {}):
+                        continue
+                    logger.info(f"Rebuilding {index.name} on {table.name} as a partial index")
+                    index.drop(conn)
+                else:
+                    logger.info(f"Creating index {index.name} on {table.name}")
+                index.create(conn)
+    return run
+
+
+def _unify_accounts(conn: Connection):
+    """
+    Copies the four per-platform tables into accounts, renames them to
+    legacy_<name> (kept as a backup) and puts compatibility views in their
+    place. Leads are copied before blacklist rows, so an account in both
+    stays qualified. Instagram lead ids are kept when accounts is still
+    empty (queued task_enrich_lead messages carry them).
+    """
+    accounts = Account.__table__
+    tables = set(inspect(conn).get_table_names())
+    keep_ids = not conn.execute(select(func.count()).select_from(accounts)).scalar()
+    insert = postgresql.insert if conn.dialect.name == "postgresql" else sqlite.insert
+
+    for view in sorted(VIEWS, key=lambda v: VIEWS[v][1] != "qualified"):
+        name = view.__tablename__
+        if name not in tables:
+            continue
+        platform, status, renames = VIEWS[view]
+        source = Table(name, MetaData(), autoload_with=conn)
+        mapped = {}
+        for column in source.columns:
+            target = renames.get(column.name, column.name)
+            if target in accounts.c and (column.name != "id" or (keep_ids and view is Influencer)):
+                mapped[target] = column
+        # Leads: classified when discovered; blacklist rows: discovered when blacklisted
+        if "discovered_at" in mapped:
+            mapped.setdefault("classified_at", mapped["discovered_at"])
+        if "classified_at" in mapped:
+            mapped.setdefault("discovered_at", mapped["classified_at"])
+
+        query = select(
+            *mapped.values(), literal(platform), literal(status)
+        ).where(source.c.username.is_not(None)) # INSERT ... SELECT ... ON CONFLICT needs a WHERE on SQLite
+        stmt = insert(accounts).from_select([*mapped, "platform", "status"], query)
+        copied = conn.execute(stmt.on_conflict_do_nothing(index_elements=["platform", "username"])).rowcount
+        logger.info(f"Copied {copied} rows from {name} into accounts ({platform}/{status})")
+
+        if conn.dialect.name == "postgresql" and "id" in mapped:
+            conn.execute(text("SELECT setval(pg_get_serial_sequence('accounts', 'id'), (SELECT COALESCE(MAX(id), 1) FROM accounts))"))
+
+    for view in VIEWS:
+        name = view.__tablename__
+        if name in tables:
+            conn.execute(text(f"ALTER TABLE {name} RENAME TO legacy_{name}"))
+    create_views(conn)
+
+
+MIGRATIONS: List[Tuple[str, str, Callable[[Connection], None]]] = [
+    (
+        "0001_lead_query_indexes",
+        "(score, id) indexes for exports, partial indexes for enrichment candidates and emails",
+        _create_indexes(
+            "ix_influencers_score_id", "ix_influencers_enrich_candidates", "ix_influencers_email",
+            "ix_tiktok_influencers_score_id", "ix_tiktok_influencers_enrich_candidates", "ix_tiktok_influencers_email",
+        ),
+    ),
+    (
+        "0002_unified_accounts",
+        "accounts table (platform, username, status, raw payload); legacy lead tables become views",
+        _unify_accounts,
+    ),
+]
+
+
+def applied_versions(engine: Engine) -> List[str]:
+    schema_migrations.create(engine, checkfirst=True)
+    with engine.connect() as conn:
+        return [v for (v,) in conn.execute(select(schema_migrations.c.version))]
+
+
+def pending(engine: Engine) -> List[Tuple[str, str]]:
+    done = set(applied_versions(engine))
+    return [(version, description) for version, description, _ in MIGRATIONS if version not in done]
+
+
+def migrate(engine: Engine, create_tables: bool = True) -> List[str]:
+    """Creates missing tables, then applies pending migrations in order (one transaction each)."""
+    if create_tables:
+        Base.metadata.create_all(engine)
+    done = set(applied_versions(engine))
+    applied = []
+    for version, description, run in MIGRATIONS:
+        if version in done:
+            continue
+        logger.info(f"Applying migration {version}: {description}")
+        with engine.begin() as conn:
+            run(conn)
+            conn.execute(schema_migrations.insert().values(version=version, description=description))
+        applied.append(version)
+    if not applied:
+        logger.info("Database schema is up to date")
+    return applied
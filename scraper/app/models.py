@@ -1,14 +1,104 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, Text, JSON
+from sqlalchemy import (
+    Column, Integer, String, Boolean, DateTime, Float, Text, JSON, LargeBinary, Enum,
+    UniqueConstraint, Index, event, inspect, select, text,
+)
 from sqlalchemy.orm import declarative_base
 from datetime import datetime
 
 Base = declarative_base()
+# The legacy per-platform tables are now views over `accounts` (see _create_views).
+# Their classes live on a separate metadata so create_all never makes them tables.
+ViewBase = declarative_base()
 
-class Influencer(Base):
+ACCOUNT_STATUSES = ("qualified", "blacklisted", "pending")
+
+
+class Account(Base):
+    """
+    Every classified (or queued) account, all platforms: one row per
+    (platform, username). Status replaces the lead / blacklist table split,
+    and the raw API profile is kept (zlib-compressed JSON, app/utils/payload.py)
+    so accounts can be re-scored offline without re-fetching.
+    """
+    __tablename__ = "accounts"
+    
+    id = Column(Integer, primary_key=True)
+    platform = Column(String(16), nullable=False) # instagram, tiktok
+    username = Column(String(64), nullable=False)
+    status = Column(Enum(*ACCOUNT_STATUSES, name="account_status", native_enum=False), nullable=False, default="pending")
+    
+    # Profile
+    display_name = Column(String(128)) # IG full_name / TikTok nickname
+    biography = Column(Text)
+    
+    # Metrics
+    follower_count = Column(Integer)
+    following_count = Column(Integer)
+    post_count = Column(Integer) # IG media_count / TikTok video_count
+    heart_count = Column(Integer) # TikTok likes
+    engagement_rate = Column(Float)
+    
+    # Contact Info
+    email = Column(String(256))
+    phone = Column(String(32))
+    whatsapp = Column(String(32))
+    external_url = Column(String(512))
+    
+    # Location / category (Instagram business fields)
+    category = Column(String(64))
+    city = Column(String(64))
+    zip_code = Column(String(20))
+    address_json = Column(JSON)
+    
+    # Classification
+    score = Column(Integer)
+    matched_signals = Column(JSON) # Signals (leads) / failed filters (blacklisted)
+    reason = Column(String(256)) # Why it was blacklisted
+    classifier_version = Column(String(32))
+    raw_payload = Column(LargeBinary) # Compressed API profile JSON
+    
+    # Flags
+    is_professional = Column(Boolean, default=False)
+    is_business = Column(Boolean, default=False)
+    is_verified = Column(Boolean, default=False)
+    email_enriched = Column(Boolean, default=False) # True if Playwright found it
+    is_socal_foodie = Column(Boolean, default=False)
+    
+    # Timestamps
+    discovered_at = Column(DateTime, default=datetime.utcnow)
+    classified_at = Column(DateTime)
+    enriched_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        UniqueConstraint("platform", "username", name="uq_accounts_platform_username"),
+        # Exports (keyset on score, id), dashboard counts, top-N lists
+        Index("ix_accounts_platform_status_score", "platform", "status", "score", "id"),
+        # Enrichment candidates: qualified, email IS NULL ORDER BY score DESC LIMIT n
+        Index(
+            "ix_accounts_enrich_candidates", "platform", "score", "id",
+            postgresql_where=(status == "qualified") & email.is_(None),
+            sqlite_where=(status == "qualified") & email.is_(None),
+        ),
+        # Email lookups and "with email" counts. Partial, so an `email IS NULL` filter can't pick it
+        # (SQLite's planner would, estimating ~1 row per value for a near-unique column)
+        Index(
+            "ix_accounts_email", "email",
+            postgresql_where=email.is_not(None), sqlite_where=email.is_not(None),
+        ),
+    )
+    
+    def __repr__(self):
+        return f"<Account {self.platform}:@{self.username} | {self.status} | score={self.score}>"
+
+
+# --- Compatibility views (read-only; write through Account) ---
+
+class Influencer(ViewBase):
+    """Qualified Instagram accounts under the old `influencers` columns."""
     __tablename__ = "influencers"
     
     id = Column(Integer, primary_key=True)
-    username = Column(String(64), unique=True, nullable=False, index=True)
+    username = Column(String(64))
     full_name = Column(String(128))
     biography = Column(Text)
     
@@ -19,7 +109,7 @@ class Influencer(Base):
     engagement_rate = Column(Float)
     
     # Contact Info (Unified Phase 1 & 3)
-    email = Column(String(256), index=True)
+    email = Column(String(256))
     phone = Column(String(32))
     whatsapp = Column(String(32))
     external_url = Column(String(512))
@@ -34,28 +124,29 @@ class Influencer(Base):
     matched_signals = Column(JSON)  # List of signal strings
     
     # Flags
-    is_professional = Column(Boolean, default=False)
-    is_business = Column(Boolean, default=False)
-    is_verified = Column(Boolean, default=False)
-    email_enriched = Column(Boolean, default=False) # True if Playwright found it
-    is_socal_foodie = Column(Boolean, default=False)
+    is_professional = Column(Boolean)
+    is_business = Column(Boolean)
+    is_verified = Column(Boolean)
+    email_enriched = Column(Boolean) # True if Playwright found it
+    is_socal_foodie = Column(Boolean)
     
     # Timestamps
-    discovered_at = Column(DateTime, default=datetime.utcnow)
-    enriched_at = Column(DateTime, nullable=True)
+    discovered_at = Column(DateTime)
+    enriched_at = Column(DateTime)
     
     def __repr__(self):
         return f"<Influencer @{self.username} | {self.follower_count} followers | score={self.score}>"
 
 
-class BlacklistedAccount(Base):
+class BlacklistedAccount(ViewBase):
+    """Blacklisted Instagram accounts under the old `blacklisted_accounts` columns."""
     __tablename__ = "blacklisted_accounts"
     
     id = Column(Integer, primary_key=True)
-    username = Column(String(64), unique=True, nullable=False, index=True)
+    username = Column(String(64))
     reason = Column(String(256))  # e.g., "HARD_FILTER: is_business=True"
     failed_filters = Column(JSON)  # Detailed breakdown
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime)
 
 
 class ScrapingRun(Base):
@@ -77,11 +168,12 @@ class ScrapingRun(Base):
     config_snapshot = Column(JSON)  # Store filter thresholds used
 
 
-class TikTokInfluencer(Base):
+class TikTokInfluencer(ViewBase):
+    """Qualified TikTok accounts under the old `tiktok_influencers` columns."""
     __tablename__ = "tiktok_influencers"
     
     id = Column(Integer, primary_key=True)
-    username = Column(String(64), unique=True, nullable=False, index=True)
+    username = Column(String(64))
     nickname = Column(String(128))
     biography = Column(Text)
     
@@ -92,7 +184,7 @@ class TikTokInfluencer(Base):
     video_count = Column(Integer)
     
     # Contact Info
-    email = Column(String(256), index=True)
+    email = Column(String(256))
     external_url = Column(String(512))
     
     # Classification
@@ -100,23 +192,90 @@ class TikTokInfluencer(Base):
     matched_signals = Column(JSON)
     
     # Flags
-    is_business = Column(Boolean, default=False)
-    is_verified = Column(Boolean, default=False)
+    is_business = Column(Boolean)
+    is_verified = Column(Boolean)
     
     # Timestamps
-    discovered_at = Column(DateTime, default=datetime.utcnow)
+    discovered_at = Column(DateTime)
     
     def __repr__(self):
         return f"<TikTokInfluencer @{self.username} | {self.follower_count} followers>"
 
 
-class TikTokBlacklistedAccount(Base):
+class TikTokBlacklistedAccount(ViewBase):
+    """Blacklisted TikTok accounts under the old `tiktok_blacklisted_accounts` columns."""
     __tablename__ = "tiktok_blacklisted_accounts"
     
     id = Column(Integer, primary_key=True)
-    username = Column(String(64), unique=True, nullable=False, index=True)
+    username = Column(String(64))
     reason = Column(String(256))
     failed_filters = Column(JSON)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime)
+
 
+# view class -> (platform, status, {view column: accounts column} where the names differ)
+VIEWS = {
+    Influencer: ("instagram", "qualified", {"full_name": "display_name", "media_count": "post_count"}),
+    BlacklistedAccount: ("instagram", "blacklisted", {"failed_filters": "matched_signals", "created_at": "classified_at"}),
+    TikTokInfluencer: ("tiktok", "qualified", {"nickname": "display_name", "video_count": "post_count"}),
+    TikTokBlacklistedAccount: ("tiktok", "blacklisted", {"failed_filters": "matched_signals", "created_at": "classified_at"}),
+}
 
+
+def view_select(view):
+    platform, status, renames = VIEWS[view]
+    accounts = Account.__table__
+    return select(*(
+        accounts.c[renames.get(c.name, c.name)].label(c.name) for c in view.__table__.columns
+    )).where(accounts.c.platform == platform, accounts.c.status == status)
+
+
+def create_views(conn, replace: bool = False):
+    """CREATE VIEW for each compatibility view whose name is free (or every one, replace=True)."""
+    inspector = inspect(conn)
+    taken = set(inspector.get_table_names()) | set(inspector.get_view_names())
+    for view in VIEWS:
+        name = view.__tablename__
+        if name in taken:
+            if not replace or name in inspector.get_table_names():
+                continue
+            conn.execute(text(f"DROP VIEW {name}"))
+        sql = view_select(view).compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+        conn.execute(text(f"CREATE VIEW {name} AS {sql}"))
+
+
+def drop_views(conn):
+    existing = set(inspect(conn).get_view_names())
+    for view in VIEWS:
+        if view.__tablename__ in existing:
+            conn.execute(text(f"DROP VIEW {view.__tablename__}"))
+
+
+# create_all / drop_all keep the views in step with `accounts`. On a database that
+# still has the legacy tables the names are taken; migration 0002 swaps them.
+event.listen(Base.metadata, "after_create", lambda target, conn, **kw: create_views(conn))
+event.listen(Base.metadata, "before_drop", lambda target, conn, **kw: drop_views(conn))
+
+
+class DorkQuery(Base):
+    """Per-query Firecrawl history: last results and how many new users it yields."""
+    __tablename__ = "dork_queries"
+    __table_args__ = (UniqueConstraint("platform", "query_key", name="uq_dork_queries_platform_key"),)
+    
+    id = Column(Integer, primary_key=True)
+    platform = Column(String(16), nullable=False, default="instagram")
+    query = Column(Text, nullable=False)
+    query_key = Column(String(40), nullable=False) # sha1 of the normalized query
+    
+    # Last run
+    result_urls = Column(JSON)
+    last_run_at = Column(DateTime, index=True)
+    last_yield = Column(Integer, default=0) # New users found by the last run
+    
+    # Lifetime
+    runs = Column(Integer, default=0)
+    total_yield = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<DorkQuery [{self.platform}] {self.query[:40]} | yield={self.last_yield}/{self.total_yield} in {self.runs} runs>"
@@ -1,17 +1,26 @@
 import asyncio
-from typing import List, Optional
+from typing import List, Optional, Dict
 from datetime import datetime
 from loguru import logger
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 
 from app.config import settings
-from app.models import Base, Influencer, ScrapingRun, BlacklistedAccount
+from app.models import Base, Account, ScrapingRun
 from app.discovery import DiscoveryEngine
 from app.classifier import Classifier
 from app.enrichment import EnrichmentEngine
 from app.scrapers.instagram import GraphQLScraper
+from app.utils.http_pool import http_pool
+from app.utils.async_runtime import runtime, run_async
+from app.utils.task_batcher import TaskBatcher
+from app.utils.run_stats import RunStats
+from app.utils.bulk_writer import BulkWriter
+from app.utils.decision_cache import decision_cache
+from app.utils import payload
 
 # Constants
 CELERY_APP = Celery('socialscrape', broker=settings.CELERY_BROKER_URL, backend=settings.CELERY_RESULT_BACKEND)
@@ -23,48 +32,114 @@ CELERY_APP.conf.update(
     enable_utc=True,
 )
 
-# DB Setup
-engine = create_engine(settings.DATABASE_URL)
+@worker_process_init.connect
+def start_async_runtime(**kwargs):
+    """Start this worker process's long-lived event loop (see app/utils/async_runtime.py)."""
+    runtime.start()
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def stop_async_runtime(**kwargs):
+    """Stop the event loop and close this worker's pooled HTTP clients (keep-alive sockets) on exit."""
+    runtime.stop()
+    http_pool.shutdown()
+
+# DB Setup: one pooled connection per worker thread (every task opens sessions via
+# BulkWriter / RunStats), so 50 threads don't queue on the default 5 + 10 pool
+def _engine_options(url: str) -> dict:
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {} # In-memory SQLite: single-connection pool, no sizing
+    return dict(
+        pool_size=settings.WORKER_CONCURRENCY,
+        max_overflow=settings.DB_POOL_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=True,
+    )
+
+engine = create_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL))
 Session = sessionmaker(bind=engine)
 
+# Run counters live in Redis and are flushed into scraping_runs (app/utils/run_stats.py)
+run_stats = RunStats(Session)
+
 @CELERY_APP.task(bind=True, max_retries=3)
 def task_discover_hashtag(self, hashtag: str, run_id: int) -> List[str]:
     """Phase 1: Discovery Task"""
     logger.info(f"Task Phase 1: Discovering #{hashtag} (RunID: {run_id})")
     
     discovery = DiscoveryEngine()
+    retrying = False
     
-    # Async to Sync bridge - Robust fix for Celery/Windows
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-    if loop.is_closed():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
     try:
-        new_usernames = loop.run_until_complete(discovery.discover_hashtag(hashtag))
+        new_usernames = run_async(discovery.discover_hashtag(hashtag))
         
-        # Trigger Classification for each new user
-        for username in new_usernames:
-             task_classify_user.delay(username, run_id)
+        # Trigger Classification in chunks (one message per CLASSIFY_BATCH_SIZE users)
+        with TaskBatcher(
+            task_classify_batch, run_id,
+            batch_size=settings.CLASSIFY_BATCH_SIZE, max_wait=settings.CLASSIFY_BATCH_MAX_WAIT,
+            on_send=lambda chunk: run_stats.add_pending(run_id),
+        ) as batcher:
+            batcher.extend(new_usernames)
              
         # Update Run Stats
-        session = Session()
-        run = session.query(ScrapingRun).get(run_id)
-        if run:
-            run.hashtags_processed = (run.hashtags_processed or 0) + 1
-            run.users_discovered = (run.users_discovered or 0) + len(new_usernames)
-            session.commit()
-        session.close()
+        run_stats.incr(run_id, hashtags_processed=1, users_discovered=len(new_usernames))
 
         return new_usernames
     except Exception as e:
         logger.error(f"Discovery failed for #{hashtag}: {e}")
+        retrying = self.request.retries < self.max_retries
         self.retry(exc=e, countdown=60)
+    finally:
+        if not retrying:
+            run_stats.task_done(run_id)
+
+def account_row(username: str, profile: dict, is_qualified: bool, score: int, signals: List[str]) -> dict:
+    """Maps a fetched Instagram profile + classifier result onto an accounts row (raw profile kept)."""
+    return dict(
+        platform="instagram",
+        username=username,
+        status="qualified" if is_qualified else "blacklisted",
+        display_name=profile.get("full_name"),
+        biography=profile.get("biography"),
+        follower_count=profile.get("follower_count"),
+        following_count=profile.get("following_count"),
+        post_count=profile.get("media_count"),
+        category=profile.get("category_name"),
+        city=profile.get("city_name"), # From API or None
+        score=score,
+        matched_signals=signals,
+        reason=None if is_qualified else f"Score {score} < {settings.PASS_THRESHOLD} | Signals: {signals}",
+        classifier_version=Classifier.VERSION,
+        raw_payload=payload.pack(profile),
+        classified_at=datetime.utcnow(),
+        is_business=profile.get("is_business", False),
+        is_professional=profile.get("is_professional_account", False),
+        is_verified=profile.get("is_verified", False),
+        # Contact info
+        email=profile.get("public_email"),
+        phone=profile.get("contact_phone_number"),
+        external_url=profile.get("external_url"),
+        # Address
+        address_json=profile.get("business_address_json")
+    )
+
+def account_writer(batch_size: Optional[int] = None) -> BulkWriter:
+    """
+    Upserts classification rows into accounts. A new verdict replaces a
+    blacklisted / pending row; an existing qualified lead is left untouched.
+    """
+    return BulkWriter(Session, batch_size=batch_size, update=True, update_where=Account.status != "qualified")
+
+def _enrich_new_leads(writer: BulkWriter, rows: Dict[str, dict]):
+    """Logs and queues enrichment for leads the writer actually wrote (not pre-existing ones)."""
+    for written in writer.written.get(Account, []):
+        row = rows[written["username"]]
+        if row["status"] != "qualified":
+            continue
+        logger.success(f"SAVED QUALIFIED LEAD: @{row['username']} (Score: {row['score']})")
+        if not row.get("email"):
+            task_enrich_lead.delay(written["id"])
 
 @CELERY_APP.task(bind=True, max_retries=3)
 def task_classify_user(self, username: str, run_id: int) -> Optional[dict]:
@@ -72,19 +147,9 @@ def task_classify_user(self, username: str, run_id: int) -> Optional[dict]:
     logger.info(f"Task Phase 2: Classifying @{username}")
     
     scraper = GraphQLScraper()
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-    if loop.is_closed():
-         loop = asyncio.new_event_loop()
-         asyncio.set_event_loop(loop)
-
     try:
         # 1. Fetch Profile
-        profile = loop.run_until_complete(scraper.get_user_profile(username))
+        profile = run_async(scraper.get_user_profile(username))
         if not profile:
              return None
              
@@ -92,101 +157,103 @@ def task_classify_user(self, username: str, run_id: int) -> Optional[dict]:
         profile["username"] = username
         
         # 2. Run Classifier
-        is_qualified, score, signals = Classifier.classify(profile)
+        is_qualified, score, signals = decision_cache.classify(Classifier, profile)
         
-        session = Session()
+        # 3. Save (upsert into accounts: never an IntegrityError, so no retry that refetches the profile)
+        row = account_row(username, profile, is_qualified, score, signals)
+        with account_writer() as writer:
+            writer.add(Account, row)
         
         if is_qualified:
-            # SAVE QUALIFIED LEAD
-            exists = session.query(Influencer).filter_by(username=username).first()
-            if not exists:
-                lead = Influencer(
-                    username=username,
-                    full_name=profile.get("full_name"),
-                    biography=profile.get("biography"),
-                    follower_count=profile.get("follower_count"),
-                    following_count=profile.get("following_count"),
-                    media_count=profile.get("media_count"),
-                    category=profile.get("category_name"),
-                    city=profile.get("city_name"), # From API or None
-                    score=score,
-                    matched_signals=signals,
-                    is_business=profile.get("is_business", False),
-                    is_professional=profile.get("is_professional_account", False),
-                    is_verified=profile.get("is_verified", False),
-                    # Contact info
-                    email=profile.get("public_email"),
-                    phone=profile.get("contact_phone_number"),
-                    external_url=profile.get("external_url"),
-                    # Address
-                    address_json=profile.get("business_address_json")
-                )
-                session.add(lead)
-                session.commit()
-                logger.success(f"SAVED QUALIFIED LEAD: @{username} (Score: {score})")
-                
-                # Trigger Enrichment?
-                if not lead.email:
-                    task_enrich_lead.delay(lead.id)
-            
-            # Update Run Stats
-            run = session.query(ScrapingRun).get(run_id)
-            if run:
-                run.users_qualified = (run.users_qualified or 0) + 1
-            session.commit()
-            
+            _enrich_new_leads(writer, {username: row})
         else:
-            # BLACKLIST
-            bl = BlacklistedAccount(
-                username=username,
-                reason=f"Score {score} < {settings.PASS_THRESHOLD} | Signals: {signals}",
-                failed_filters=signals
-            )
-            session.add(bl)
-            session.commit()
             logger.info(f"Blacklisted @{username}")
-            
-        # Update General Stats
-        run = session.query(ScrapingRun).get(run_id)
-        if run:
-            run.users_classified = (run.users_classified or 0) + 1
-        session.commit()
-        session.close()
+        
+        # Update Run Stats
+        run_stats.incr(run_id, users_classified=1, users_qualified=int(is_qualified))
 
     except Exception as e:
         logger.error(f"Classification failed for @{username}: {e}")
         self.retry(exc=e, countdown=60)
 
+async def _fetch_profiles(scraper: GraphQLScraper, usernames: List[str]) -> Dict[str, Optional[dict]]:
+    """Fetches profiles concurrently over the shared client; failures map to None."""
+    results = await asyncio.gather(
+        *(scraper.get_user_profile(u) for u in usernames), return_exceptions=True
+    )
+    return {
+        u: (r if isinstance(r, dict) else None)
+        for u, r in zip(usernames, results)
+    }
+
+@CELERY_APP.task(bind=True, max_retries=3)
+def task_classify_batch(self, usernames: List[str], run_id: int) -> dict:
+    """
+    Phase 2 (batched): fetch + classify a chunk of usernames.
+    Profiles are fetched concurrently; leads and blacklist rows for the whole
+    chunk are upserted in one transaction (INSERT ... ON CONFLICT, see account_writer),
+    run counters in one Redis round trip.
+    """
+    usernames = list(dict.fromkeys(usernames)) # Dedupe, keep order
+    logger.info(f"Task Phase 2: Classifying batch of {len(usernames)} users")
+    
+    scraper = GraphQLScraper()
+    retrying = False
+    try:
+        profiles = run_async(_fetch_profiles(scraper, usernames))
+        
+        rows = {}
+        classified = qualified = 0
+        with account_writer(batch_size=len(usernames) + 1) as writer:
+            for username in usernames:
+                profile = profiles.get(username)
+                if not profile:
+                    continue
+                profile["username"] = username
+                is_qualified, score, signals = decision_cache.classify(Classifier, profile)
+                classified += 1
+                qualified += int(is_qualified)
+                rows[username] = account_row(username, profile, is_qualified, score, signals)
+                writer.add(Account, rows[username])
+        
+        _enrich_new_leads(writer, rows)
+        blacklisted = sum(1 for w in writer.written.get(Account, []) if rows[w["username"]]["status"] == "blacklisted")
+        
+        run_stats.incr(run_id, users_classified=classified, users_qualified=qualified)
+        logger.info(
+            f"Batch done: {classified}/{len(usernames)} classified, {qualified} qualified, "
+            f"{blacklisted} blacklisted"
+        )
+        return {"classified": classified, "qualified": qualified, "blacklisted": blacklisted}
+
+    except Exception as e:
+        logger.error(f"Batch classification failed ({len(usernames)} users): {e}")
+        retrying = self.request.retries < self.max_retries
+        self.retry(exc=e, countdown=60)
+    finally:
+        if not retrying:
+            run_stats.task_done(run_id)
+
 @CELERY_APP.task(bind=True)
 def task_enrich_lead(self, lead_id: int):
     """Phase 3: Enrichment Task"""
     logger.info(f"Task Phase 3: Enriching Lead ID {lead_id}")
     
     session = Session()
-    lead = session.query(Influencer).get(lead_id)
+    lead = session.get(Account, lead_id)
     if not lead:
         session.close()
         return
         
     enricher = EnrichmentEngine()
     
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-    if loop.is_closed():
-         loop = asyncio.new_event_loop()
-         asyncio.set_event_loop(loop)
-         
     try:
         user_data = {
             "username": lead.username,
             "biography": lead.biography,
             "external_url": lead.external_url
         }
-        email = loop.run_until_complete(enricher.enrich_user(user_data))
+        email = run_async(enricher.enrich_user(user_data))
         
         if email:
             lead.email = email
@@ -221,11 +288,17 @@ def task_run_full_pipeline(dry_run: bool = False):
     # 2. Load Hashtags
     HASHTAGS = settings.HASHTAGS
     
+    if not dry_run:
+        run_stats.add_pending(run_id, len(HASHTAGS))
     for tag in HASHTAGS:
         if dry_run:
             logger.info(f"[DRY RUN] Would queue task_discover_hashtag('{tag}')")
         else:
             task_discover_hashtag.delay(tag, run_id)
+    
+    # Run is finalized (status/completed_at) once every queued task has finished
+    if not dry_run:
+        run_stats.seal(run_id)
             
     logger.success(f"Pipeline started! Run ID: {run_id}")
 
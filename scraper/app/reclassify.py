@@ -0,0 +1,206 @@
+"""
+Offline re-classification: re-scores stored profiles (accounts.raw_payload)
+with the current classifier, no API calls.
+
+Accounts are read in id-keyset chunks of RECLASSIFY_CHUNK_SIZE and scored
+by Classifier.classify_batch / TikTokClassifier.classify_batch in a process
+pool (RECLASSIFY_WORKERS). Chunks are shipped still compressed and only
+(id, verdict, score, signals) comes back, so the parent just reads, diffs and
+writes: one bulk UPDATE per chunk for every account whose status, score or
+classifier version changed. With dry_run=True nothing is written.
+
+Instagram's "inactive" hard filter is judged as of classified_at (when the
+stored profile was fetched), not today, so old payloads aren't all rejected.
+
+    reclassify(dry_run=True, threshold=40, diff_path="moves.csv")
+    reclassify(platforms=["instagram"], statuses=["blacklisted"])  # rescue pass
+
+Accounts without a stored payload (classified before raw_payload existed) are
+counted as no_payload and left alone; rescue_leads.py re-fetches those.
+"""
+import csv
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timezone
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+from loguru import logger
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session as SASession
+from app.classifier import Classifier
+from app.config import settings
+from app.models import Account
+from app.tiktok_classifier import TikTokClassifier
+from app.utils import payload
+
+CLASSIFIERS = {"instagram": Classifier, "tiktok": TikTokClassifier}
+
+# Payload key profile_text() reads the handle from (not always in the API response)
+USERNAME_KEYS = {"instagram": "username", "tiktok": "unique_id"}
+
+DIFF_FIELDS = ["platform", "username", "old_status", "new_status", "old_score", "new_score", "signals"]
+
+
+def _init_worker(threshold: Optional[int]):
+    if threshold is not None:
+        settings.PASS_THRESHOLD = threshold
+
+
+def _classify_chunk(platform: str, rows: List[tuple]) -> List[tuple]:
+    """Worker: rows of (id, username, raw_payload, classified_at epoch) -> (id, qualified, score, signals)."""
+    profiles = []
+    for _, username, blob, _ in rows:
+        profile = payload.unpack(blob) or {}
+        profile.setdefault(USERNAME_KEYS[platform], username)
+        profiles.append(profile)
+
+    classifier = CLASSIFIERS[platform]
+    batch = classifier.to_columns(profiles)
+    if platform == "instagram":
+        fetched_at = np.array([ts or time.time() for *_, ts in rows], dtype=np.float64)
+        qualified, scores, signals = classifier.classify_batch(batch, now=fetched_at)
+    else:
+        qualified, scores, signals = classifier.classify_batch(batch)
+    return [(row[0], bool(q), int(s), sig) for row, q, s, sig in zip(rows, qualified.tolist(), scores.tolist(), signals)]
+
+
+def _iter_chunks(
+    session_factory: Callable[[], SASession], platform: str, statuses: Sequence[str], chunk_size: int
+) -> Iterator[List[tuple]]:
+    """Chunks of (id, username, status, score, classifier_version, raw_payload, classified_at), by id."""
+    a = Account
+    query = (
+        select(a.id, a.username, a.status, a.score, a.classifier_version, a.raw_payload, a.classified_at)
+        .where(a.platform == platform, a.status.in_(statuses), a.raw_payload.is_not(None))
+        .order_by(a.id)
+        .limit(chunk_size)
+    )
+    last_id = 0
+    while True:
+        session = session_factory()
+        try:
+            rows = session.execute(query.where(a.id > last_id)).all()
+        finally:
+            session.close()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        yield rows
+        if len(rows) < chunk_size:
+            return
+
+
+def reclassify(
+    platforms: Sequence[str] = ("instagram", "tiktok"),
+    statuses: Sequence[str] = ("qualified", "blacklisted"),
+    threshold: Optional[int] = None,
+    dry_run: bool = False,
+    diff_path: Optional[str] = None,
+    session_factory: Optional[Callable[[], SASession]] = None,
+    chunk_size: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> Dict:
+    """
+    Re-scores the platforms' stored profiles and applies the new verdicts
+    (unless dry_run). `threshold` overrides PASS_THRESHOLD for this run.
+    Status moves are written to `diff_path` as CSV when given.
+
+    Returns {"dry_run", "diff_path", "platforms": {platform: {"scanned",
+    "promoted", "demoted", "rescored", "unchanged", "no_payload"}}}; promoted /
+    demoted count moves into / out of qualified, rescored counts same-status
+    rows whose score or classifier version changed.
+    """
+    if session_factory is None:
+        from app.pipeline import Session as session_factory
+    chunk_size = chunk_size or settings.RECLASSIFY_CHUNK_SIZE
+    workers = workers or settings.RECLASSIFY_WORKERS or os.cpu_count() or 1
+    pass_threshold = settings.PASS_THRESHOLD if threshold is None else threshold
+
+    diff_file = open(diff_path, "w", newline="", encoding="utf-8") if diff_path else None
+    diff = csv.writer(diff_file) if diff_file else None
+    if diff:
+        diff.writerow(DIFF_FIELDS)
+
+    results = {"dry_run": dry_run, "diff_path": diff_path, "platforms": {}}
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(threshold,)) as pool:
+            for platform in platforms:
+                stats = {"scanned": 0, "promoted": 0, "demoted": 0, "rescored": 0, "unchanged": 0, "no_payload": 0}
+                results["platforms"][platform] = stats
+                version = CLASSIFIERS[platform].VERSION
+
+                session = session_factory()
+                try:
+                    stats["no_payload"] = session.execute(
+                        select(func.count()).select_from(Account).where(
+                            Account.platform == platform, Account.status.in_(statuses), Account.raw_payload.is_(None)
+                        )
+                    ).scalar()
+                finally:
+                    session.close()
+
+                # Keep ~2 chunks per worker in flight; results are consumed in submission order
+                in_flight = deque()
+                for chunk in _iter_chunks(session_factory, platform, statuses, chunk_size):
+                    # classified_at is naive UTC (datetime.utcnow)
+                    jobs = [(r[0], r[1], r[5], r[6].replace(tzinfo=timezone.utc).timestamp() if r[6] else None) for r in chunk]
+                    in_flight.append((chunk, pool.submit(_classify_chunk, platform, jobs)))
+                    if len(in_flight) >= workers * 2:
+                        _apply(session_factory, platform, *_take(in_flight), version, pass_threshold, stats, diff, dry_run)
+                while in_flight:
+                    _apply(session_factory, platform, *_take(in_flight), version, pass_threshold, stats, diff, dry_run)
+
+                logger.info(
+                    f"Re-classified {stats['scanned']} {platform} accounts{' (dry run)' if dry_run else ''}: "
+                    f"{stats['promoted']} promoted, {stats['demoted']} demoted, {stats['rescored']} re-scored, "
+                    f"{stats['no_payload']} without stored payload"
+                )
+    finally:
+        if diff_file:
+            diff_file.close()
+    return results
+
+
+def _take(in_flight: deque):
+    chunk, future = in_flight.popleft()
+    return chunk, future.result()
+
+
+def _apply(session_factory, platform, chunk, verdicts, version, threshold, stats, diff, dry_run):
+    """Diffs one chunk against its new verdicts and writes the changed rows in one bulk UPDATE."""
+    changes = []
+    for (account_id, username, old_status, old_score, old_version, _, _), (_, qualified, score, signals) in zip(chunk, verdicts):
+        new_status = "qualified" if qualified else "blacklisted"
+        stats["scanned"] += 1
+        if new_status != old_status:
+            stats["promoted" if qualified else "demoted"] += 1
+            if diff:
+                diff.writerow([platform, username, old_status, new_status, old_score, score, "; ".join(signals)])
+        elif score != old_score or version != old_version:
+            stats["rescored"] += 1
+        else:
+            stats["unchanged"] += 1
+            continue
+        changes.append(dict(
+            id=account_id,
+            status=new_status,
+            score=score,
+            matched_signals=signals,
+            reason=None if qualified else f"Score {score} < {threshold} | Signals: {signals}",
+            classifier_version=version,
+        ))
+
+    if dry_run or not changes:
+        return
+    session = session_factory()
+    try:
+        session.execute(update(Account), changes)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
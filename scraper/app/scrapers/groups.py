@@ -68,31 +68,33 @@ class GroupScraper(GraphQLScraper):
         score = 0
         detected_city = "SoCal"
         
+        location = LocationClassifier.scan_bio(bio_lower)["location_groups"]
+        
         # Tier 1 (Emoji)
-        if any(w in bio_lower for w in LocationClassifier.LOCATION_SIGNALS["strict_emoji"]):
+        if "strict_emoji" in location:
             score += 25
             
         # Tier 2 (Pipe)
-        elif any(w in bio_lower for w in LocationClassifier.LOCATION_SIGNALS["pipe_format"]):
+        elif "pipe_format" in location:
             score += 22
             
         # Tier 3 (Specific Cities)
-        elif any(w in bio_lower for w in LocationClassifier.LOCATION_SIGNALS["la_cities"]):
+        elif "la_cities" in location:
             score += 18
             detected_city = "Los Angeles"
-        elif any(w in bio_lower for w in LocationClassifier.LOCATION_SIGNALS["oc_cities"]):
+        elif "oc_cities" in location:
             score += 18
             detected_city = "Orange County"
-        elif any(w in bio_lower for w in LocationClassifier.LOCATION_SIGNALS["sd_cities"]):
+        elif "sd_cities" in location:
             score += 18
             detected_city = "San Diego"
         
         # Tier 4 (Regional Soft) - NEW: Added for Hiking groups which are often just "SoCal"
-        elif any(w in bio_lower for w in LocationClassifier.LOCATION_SIGNALS["regional_soft"]):
+        elif "regional_soft" in location:
             score += 12
             
         # Tier 5 (Area Codes - Strong for local clubs)
-        elif any(w in bio_lower for w in LocationClassifier.LOCATION_SIGNALS["area_codes"]):
+        elif "area_codes" in location:
             score += 10
             
         # Group Threshold: 10 points
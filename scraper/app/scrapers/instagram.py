@@ -4,6 +4,9 @@ import httpx
 from typing import List, Dict, Optional
 from datetime import datetime
 from app.config import settings
+from app.utils.http_pool import http_pool
+from app.utils.profile_cache import profile_cache
+from app.utils.rate_limiter import rate_limits
 # from app.models import Influencer # Not strictly used if returning dicts
 
 logger = logging.getLogger(__name__)
@@ -33,10 +36,11 @@ class GraphQLScraper:
             "x-rapidapi-key": settings.RAPIDAPI_KEY,
             "x-rapidapi-host": settings.RAPIDAPI_HOST,
         }
-        self.client = httpx.AsyncClient(
-            headers=self.headers,
-            timeout=30.0
-        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared keep-alive client for the RapidAPI host (see app/utils/http_pool.py)."""
+        return http_pool.get(settings.RAPIDAPI_HOST, headers=self.headers, timeout=30.0)
 
     # ... (existing methods) ...
 
@@ -442,14 +446,27 @@ class GraphQLScraper:
             logger.warning(f"Failed to normalize post: {e}")
             return None
 
-    async def get_post_info(self, shortcode: str) -> Optional[str]:
+    async def get_post_info(self, shortcode: str, use_cache: bool = True) -> Optional[str]:
         """
         Fetches post details to get the username (Pro Plan feature).
         Uses 'get_media_data_v2.php' with 'media_code'.
         Returns username as string if found.
+        The post owner is cached (see app/utils/profile_cache.py).
         """
+        owner = await profile_cache.fetch(
+            "instagram", "post", shortcode,
+            lambda: self._fetch_post_owner(shortcode),
+            use_cache=use_cache, ttl=settings.POST_CACHE_TTL,
+        )
+        if owner:
+            return owner.get("username")
+        return None
+
+    async def _fetch_post_owner(self, shortcode: str):
+        """Raw owner dict of a post, profile_cache.NOT_FOUND, or None on transient errors."""
         try:
             params = {"media_code": shortcode} # Correct pro param
+            await rate_limits.acquire(settings.RAPIDAPI_HOST)
             response = await self.client.get(self.POST_INFO_URL, params=params)
              
             if response.status_code == 200:
@@ -463,8 +480,9 @@ class GraphQLScraper:
                      item = data["data"]
                 
                 owner = item.get("owner") or item.get("user")
-                if owner:
-                    return owner.get("username")
+                return owner or profile_cache.NOT_FOUND
+            elif response.status_code == 404:
+                return profile_cache.NOT_FOUND
             elif response.status_code == 429:
                 logger.error(f"Quota Exceeded in get_post_info: {response.text}")
             else:
@@ -474,17 +492,58 @@ class GraphQLScraper:
             logger.error(f"Error fetching post info for {shortcode}: {e}")
         return None
 
-    async def get_user_profile(self, username: str) -> Optional[Dict]:
+    async def get_user_profile(self, username: str, use_cache: bool = True) -> Optional[Dict]:
         """
         Fetches user info via RapidAPI (Pro Plan).
         Uses 'ig_get_fb_profile_v3.php' (Account Data V2) via POST.
         Param: 'username_or_url'
+        The raw payload is cached (see app/utils/profile_cache.py); pass
+        use_cache=False to force a fresh fetch.
         """
+        user = await profile_cache.fetch(
+            "instagram", "profile", username,
+            lambda: self._fetch_user_payload(username),
+            use_cache=use_cache,
+        )
+        if not user:
+            return None
+
+        try:
+            biography = user.get("biography", "")
+            # Fallback if specific fields are named differently in V2
+            if not biography and "about" in user:
+                 biography = user["about"].get("text", "")
+
+            return {
+                "id": user.get("id"),
+                "username": username,
+                "biography": biography,
+                "full_name": user.get("full_name", ""),
+                "follower_count": user.get("follower_count", 0),
+                "following_count": user.get("following_count", 0),
+                "media_count": user.get("media_count", 0),
+                "is_business": user.get("is_business", False),
+                "is_professional_account": user.get("is_professional_account", False),
+                "is_verified": user.get("is_verified", False),
+                "category_name": user.get("category", ""),
+                "public_email": user.get("public_email"),
+                "contact_phone_number": user.get("contact_phone_number"),
+                "external_url": user.get("external_url"),
+                "city_name": user.get("city_name"),
+                "business_address_json": user.get("business_address_json")
+            }
+        except Exception as e:
+            logger.error(f"Error parsing profile for {username}: {e}")
+        return None
+
+    async def _fetch_user_payload(self, username: str):
+        """Raw user dict, profile_cache.NOT_FOUND, or None on transient errors."""
         try:
             # POST Request for Account Data V2
             data = {"username_or_url": username} 
             
             # Note: We use self.client.post here
+            await rate_limits.acquire(settings.RAPIDAPI_HOST)
             response = await self.client.post(self.USER_INFO_URL, data=data)
              
             if response.status_code == 200:
@@ -492,29 +551,15 @@ class GraphQLScraper:
                 
                 # 'ig_get_fb_profile_v3' usually returns the dict directly or in 'data'
                 user = data.get("data", data)
-                
-                biography = user.get("biography", "")
-                # Fallback if specific fields are named differently in V2
-                if not biography and "about" in user:
-                     biography = user["about"].get("text", "")
-
-                return {
-                    "username": username,
-                    "biography": biography,
-                    "full_name": user.get("full_name", ""),
-                    "follower_count": user.get("follower_count", 0),
-                    "following_count": user.get("following_count", 0),
-                    "media_count": user.get("media_count", 0),
-                    "is_business": user.get("is_business", False),
-                    "is_professional_account": user.get("is_professional_account", False),
-                    "is_verified": user.get("is_verified", False),
-                    "category_name": user.get("category", ""),
-                    "public_email": user.get("public_email"),
-                    "contact_phone_number": user.get("contact_phone_number"),
-                    "external_url": user.get("external_url"),
-                    "city_name": user.get("city_name"),
-                    "business_address_json": user.get("business_address_json")
-                }
+                if not user:
+                    return profile_cache.NOT_FOUND
+                if not isinstance(user, dict) or not (user.get("username") or user.get("id") or user.get("pk")):
+                    # Error bodies ({"message": ...}) come back as 200 too: don't cache them as a profile
+                    logger.warning(f"Unexpected profile payload for {username}: {str(data)[:100]}")
+                    return None
+                return user
+            elif response.status_code == 404:
+                return profile_cache.NOT_FOUND
             else:
                  logger.warning(f"Failed to get profile for {username}: {response.status_code} | {response.text[:100]}")
                  
@@ -1,10 +1,19 @@
 
+import re
 import httpx
 from typing import List, Dict, Optional
 from loguru import logger
 from app.config import settings
+from app.utils.http_pool import http_pool
+from app.utils.rate_limiter import rate_limits
+from app.utils.profile_cache import profile_cache
 
 class TikTokScraper:
+    # /user/info answers unknown / banned users with a 200, a non-zero code and
+    # a msg like "user not exist"; quota, rate-limit and server errors use the
+    # same envelope, so only these messages are cached as NOT_FOUND.
+    USER_GONE_MSG = re.compile(r"(?:user|account).*(?:not ?exist|doesn'?t exist|not found|banned|suspended)", re.I)
+
     def __init__(self):
         # Validate configuration
         if not settings.TIKTOK_HOST or not settings.TIKTOK_HOST.strip():
@@ -33,91 +42,100 @@ class TikTokScraper:
             "sort_type": 0
         }
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.get(url, headers=self.headers, params=params)
-                if response.status_code != 200:
-                    logger.error(f"TikTok API Error {response.status_code}: {response.text}")
-                    return []
-                
-                data = response.json()
-                if data.get("code") != 0:
-                    logger.error(f"TikTok API Code Error: {data}")
-                    return []
-                    
-                # Extract videos
-                # Structure: data -> data -> videos (list) OR data -> data (list)
-                # Based on test: data -> data -> videos
-                inner_data = data.get("data", {})
-                posts = []
-                
-                if isinstance(inner_data, dict):
-                    posts = inner_data.get("videos", [])
-                elif isinstance(inner_data, list):
-                    posts = inner_data
-                
-                return posts
-                
-            except Exception as e:
-                logger.error(f"Exception scraping #{hashtag}: {e}")
+        client = http_pool.get(settings.TIKTOK_HOST, timeout=30.0)
+        try:
+            response = await client.get(url, headers=self.headers, params=params)
+            if response.status_code != 200:
+                logger.error(f"TikTok API Error {response.status_code}: {response.text}")
+                return []
+            
+            data = response.json()
+            if data.get("code") != 0:
+                logger.error(f"TikTok API Code Error: {data}")
                 return []
+                
+            # Extract videos
+            # Structure: data -> data -> videos (list) OR data -> data (list)
+            # Based on test: data -> data -> videos
+            inner_data = data.get("data", {})
+            posts = []
+            
+            if isinstance(inner_data, dict):
+                posts = inner_data.get("videos", [])
+            elif isinstance(inner_data, list):
+                posts = inner_data
+            
+            return posts
+            
+        except Exception as e:
+            logger.error(f"Exception scraping #{hashtag}: {e}")
+            return []
 
-    async def get_user_profile(self, username: str) -> Optional[Dict]:
+    async def get_user_profile(self, username: str, use_cache: bool = True) -> Optional[Dict]:
         """
         Fetches user profile details.
+        The raw payload is cached (see app/utils/profile_cache.py); pass
+        use_cache=False to force a fresh fetch.
         """
+        inner_data = await profile_cache.fetch(
+            "tiktok", "profile", username,
+            lambda: self._fetch_user_payload(username),
+            use_cache=use_cache,
+        )
+        if not isinstance(inner_data, dict):
+            return None
+
+        # Structure: data -> data -> user (dict)
+        user_data = inner_data.get("user")
+        
+        # Sometimes it might be just inner_data if structure varies, but test confirmed 'user' key
+        if not user_data and "stats" in inner_data:
+             user_data = inner_data
+        
+        if not user_data:
+            return None
+            
+        # Normalize metrics (stats are usually nested in 'stats' dict inside user or sibling)
+        # Usually RapidAPI TikTok endpoints return:
+        # { data: { user: {...}, stats: {...} } } OR { data: { user: { stats: ... } } }
+        # Merge them if they are separate.
+        stats = inner_data.get("stats")
+        if stats:
+            user_data["stats"] = stats
+            
+        return user_data
+
+    async def _fetch_user_payload(self, username: str):
+        """Raw 'data' dict of /user/info, profile_cache.NOT_FOUND, or None on transient errors."""
         url = f"{self.base_url}/user/info"
         params = {
             "unique_id": username,
         }
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.get(url, headers=self.headers, params=params)
-                if response.status_code != 200:
-                    logger.error(f"TikTok API User Error {response.status_code}: {response.text}")
-                    return None
-                    
-                data = response.json()
-                if data.get("code") != 0:
-                    logger.warning(f"TikTok User Not Found or Error: {data}")
-                    return None
-                    
-                # Structure: data -> data -> user (dict)
-                inner_data = data.get("data", {})
-                user_data = inner_data.get("user")
-                
-                # Sometimes it might be just inner_data if structure varies, but test confirmed 'user' key
-                if not user_data and "stats" in inner_data:
-                     user_data = inner_data
+        client = http_pool.get(settings.TIKTOK_HOST, timeout=30.0)
+        try:
+            await rate_limits.acquire(settings.TIKTOK_HOST, settings.TIKTOK_RATE_LIMIT)
+            response = await client.get(url, headers=self.headers, params=params)
+            if response.status_code != 200:
+                logger.error(f"TikTok API User Error {response.status_code}: {response.text}")
+                return profile_cache.NOT_FOUND if response.status_code == 404 else None
                 
-                if not user_data:
-                    return None
-                    
-                # Normalize metrics (stats are usually nested in 'stats' dict inside user or sibling)
-                # Test response: user object has 'stats'? NO, test showed 'stats' might be separate or inside.
-                # Let's check test output again:
-                # "User Keys:", user.keys() -> includes 'stats'? 
-                # Wait, my test output didn't show full keys.
-                # Usually RapidAPI TikTok endpoints return:
-                # { data: { user: {...}, stats: {...} } } OR { data: { user: { stats: ... } } }
-                # I will assume we merge them if they are separate.
+            data = response.json()
+            if data.get("code") != 0:
+                if self.USER_GONE_MSG.search(str(data.get("msg") or "")):
+                    logger.warning(f"TikTok user {username} not found: {data}")
+                    return profile_cache.NOT_FOUND
+                logger.warning(f"TikTok API error for {username}: {data}")
+                return None
                 
-                stats = inner_data.get("stats")
-                if stats:
-                    user_data["stats"] = stats
-                elif "stats" not in user_data:
-                    # Maybe stats are missing?
-                    pass
-                    
-                return user_data
+            return data.get("data") or profile_cache.NOT_FOUND
 
-            except httpx.ConnectError as e:
-                logger.error(f"Connection error fetching user {username} - check network/DNS: {e}")
-                return None
-            except httpx.TimeoutException as e:
-                logger.error(f"Timeout fetching user {username}: {e}")
-                return None
-            except Exception as e:
-                logger.error(f"Exception fetching user {username}: {e}")
-                return None
+        except httpx.ConnectError as e:
+            logger.error(f"Connection error fetching user {username} - check network/DNS: {e}")
+            return None
+        except httpx.TimeoutException as e:
+            logger.error(f"Timeout fetching user {username}: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Exception fetching user {username}: {e}")
+            return None
@@ -1,7 +1,10 @@
 
-from typing import Tuple, List, Dict, Any
+import hashlib
+from typing import Tuple, List, Dict, Any, Optional, Sequence
+import numpy as np
 from loguru import logger
 from app.config import settings
+from app.utils.keyword_matcher import KeywordMatcher
 
 class TikTokClassifier:
     """
@@ -9,6 +12,9 @@ class TikTokClassifier:
     Adapted from Instagram Classifier.
     """
     
+    # Stored on accounts.classifier_version; bump when signals / weights change
+    VERSION = "tt-1.0"
+    
     # --- POSITIVE SIGNALS (Add Points) ---
     POSITIVE_SIGNALS = {
         # Identity
@@ -47,6 +53,16 @@ class TikTokClassifier:
         ])
     }
     
+    @classmethod
+    def fingerprint(cls, user_data: Dict[str, Any]) -> str:
+        """Hash of every input classify() reads (app/utils/decision_cache.py key)."""
+        stats = user_data.get("stats", {})
+        inputs = (
+            user_data.get("unique_id"), user_data.get("nickname"), user_data.get("signature"),
+            stats.get("followerCount", 0), stats.get("videoCount", 0),
+        )
+        return hashlib.sha1(repr(inputs).encode()).hexdigest()
+
     @classmethod
     def classify(cls, user_data: Dict[str, Any]) -> Tuple[bool, int, List[str]]:
         """
@@ -80,27 +96,107 @@ class TikTokClassifier:
              return False, 0, [f"HARD_FAIL: {r}" for r in fail_reasons]
              
         # 2. Scoring
-        score = 0
-        matched = []
+        score, matched = cls._score_text(cls.profile_text(user_data))
+        
+        # 3. Final Check
+        is_qualified = score >= settings.PASS_THRESHOLD
         
+        return is_qualified, score, matched
+
+    @classmethod
+    def _get_matcher(cls) -> KeywordMatcher:
+        """Compiled matcher over POSITIVE_SIGNALS and NEGATIVE_SIGNALS, built once per class."""
+        matcher = cls.__dict__.get("_matcher")
+        if matcher is None:
+            table = {name: keywords for name, (_, keywords) in cls.POSITIVE_SIGNALS.items()}
+            for name, (_, keywords) in cls.NEGATIVE_SIGNALS.items():
+                table["neg:" + name] = keywords
+            matcher = KeywordMatcher(table)
+            cls._matcher = matcher
+        return matcher
+
+    @classmethod
+    def profile_text(cls, user_data: Dict[str, Any]) -> str:
+        """Lowercased 'signature nickname unique_id' string that the signal tables are matched against."""
         bio = (user_data.get("signature") or "").lower()
         nickname = (user_data.get("nickname") or "").lower()
         unique_id = (user_data.get("unique_id") or "").lower()
-        text_content = f"{bio} {nickname} {unique_id}"
+        return f"{bio} {nickname} {unique_id}"
+
+    @classmethod
+    def _score_text(cls, text_content: str) -> Tuple[int, List[str]]:
+        score = 0
+        matched = []
+        hits = cls._get_matcher().match(text_content)
         
         # Positive
         for signal_name, (points, keywords) in cls.POSITIVE_SIGNALS.items():
-            if any(k in text_content for k in keywords):
+            if signal_name in hits:
                 score += points
                 matched.append(signal_name)
                 
         # Negative
         for signal_name, (points, keywords) in cls.NEGATIVE_SIGNALS.items():
-            if any(k in text_content for k in keywords):
+            if ("neg:" + signal_name) in hits:
                 score += points
                 matched.append(signal_name)
         
-        # 3. Final Check
-        is_qualified = score >= settings.PASS_THRESHOLD
-        
-        return is_qualified, score, matched
+        return score, matched
+
+    # --- BATCH API (columnar re-scoring) ---
+
+    HARD_FILTER_FLAGS = [
+        (1, "followers_below_min"),
+        (2, "followers_above_max"),
+        (4, "video_count"),
+    ]
+
+    @classmethod
+    def to_columns(cls, profiles: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+        """Builds the columnar batch classify_batch() expects from TikTok user dicts."""
+        stats = [p.get("stats", {}) for p in profiles]
+        return {
+            "follower_count": np.array([s.get("followerCount") or 0 for s in stats], dtype=np.int64),
+            "following_count": np.array([s.get("followingCount") or 0 for s in stats], dtype=np.int64),
+            "media_count": np.array([s.get("videoCount") or 0 for s in stats], dtype=np.int64),
+            "text": [cls.profile_text(p) for p in profiles],
+        }
+
+    @classmethod
+    def hard_filter_mask(cls, batch: Dict[str, Any]) -> np.ndarray:
+        """Vectorized hard filters of classify(); 0 means the row passes."""
+        followers = np.asarray(batch["follower_count"])
+        videos = np.asarray(batch["media_count"])
+        flags = np.zeros(len(followers), dtype=np.int8)
+        flags[followers < settings.FOLLOWER_MIN] |= 1
+        flags[followers > settings.FOLLOWER_MAX] |= 2
+        flags[videos < 5] |= 4
+        return flags
+
+    @classmethod
+    def classify_batch(cls, batch: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, List[List[str]]]:
+        """
+        Columnar classify(). See Classifier.classify_batch; media_count holds the
+        TikTok video count. Returns (qualified, scores, signals per row).
+        """
+        flags = cls.hard_filter_mask(batch)
+        n = len(flags)
+        scores = np.zeros(n, dtype=np.int64)
+
+        fail_labels: Dict[int, List[str]] = {}
+        signals: List[List[str]] = []
+        for value in flags.tolist():
+            if value not in fail_labels:
+                fail_labels[value] = [f"HARD_FAIL: {name}" for bit, name in cls.HARD_FILTER_FLAGS if value & bit]
+            signals.append(list(fail_labels[value]))
+
+        texts = batch["text"]
+        for i in np.flatnonzero(flags == 0).tolist():
+            scores[i], signals[i] = cls._score_text(texts[i])
+
+        qualified = (flags == 0) & (scores >= settings.PASS_THRESHOLD)
+        logger.info(
+            f"Batch classified {n} TikTok profiles: {int((flags == 0).sum())} passed hard filters, "
+            f"{int(qualified.sum())} qualified"
+        )
+        return qualified, scores, signals
@@ -5,6 +5,7 @@ from typing import List
 from loguru import logger
 from app.config import settings
 from app.scrapers.tiktok import TikTokScraper
+from app.utils.dedup import dedup_store
 
 class TikTokDiscoveryEngine:
     """
@@ -15,6 +16,7 @@ class TikTokDiscoveryEngine:
     def __init__(self):
         self.redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
         self.scraper = TikTokScraper()
+        self.seen_users = dedup_store("tiktok_seen_users", self.redis)
         
     async def discover_hashtag(self, hashtag: str) -> List[str]:
         """
@@ -29,23 +31,18 @@ class TikTokDiscoveryEngine:
             logger.warning(f"No posts found for #{hashtag} on TikTok")
             return []
             
-        new_usernames = []
-        
-        # 2. Extract & Dedupe
+        # 2. Extract usernames (feed order, no repeats)
+        usernames = []
         for post in posts:
             author = post.get("author")
-            if not author:
-                continue
-                
-            username = author.get("unique_id")
-            if not username:
-                continue
-                
-            # Redis Dedupe: "tiktok_seen_users"
-            if not self.redis.sismember("tiktok_seen_users", username):
-                self.redis.sadd("tiktok_seen_users", username)
-                new_usernames.append(username)
-                logger.debug(f"Discovered new TikTok user: @{username}")
+            if author and author.get("unique_id"):
+                usernames.append(author["unique_id"])
+        usernames = list(dict.fromkeys(usernames))
+        
+        # 3. Dedupe against "tiktok_seen_users" in one batched check-and-add
+        new_usernames = [u for u, new in zip(usernames, self.seen_users.check_and_add(usernames)) if new]
+        for username in new_usernames:
+            logger.debug(f"Discovered new TikTok user: @{username}")
                 
         logger.info(f"#{hashtag}: Found {len(posts)} posts, {len(new_usernames)} new unique users.")
         return new_usernames
@@ -1,52 +1,67 @@
 
-import asyncio
 from loguru import logger
-from app.pipeline import CELERY_APP, Session
+from datetime import datetime
+from app.pipeline import CELERY_APP, Session, run_stats, account_writer
 from app.config import settings
-from app.models import TikTokInfluencer, TikTokBlacklistedAccount, ScrapingRun
+from app.models import Account, ScrapingRun
 from app.tiktok_discovery import TikTokDiscoveryEngine
 from app.tiktok_classifier import TikTokClassifier
 from app.scrapers.tiktok import TikTokScraper
+from app.utils.async_runtime import run_async
+from app.utils.decision_cache import decision_cache
+from app.utils import payload
 
 # Reuse the same CELERY_APP instance
 
+def tiktok_account_row(username: str, profile: dict, is_qualified: bool, score: int, signals: list) -> dict:
+    """Maps a TikTok user payload + classifier result onto an accounts row (raw payload kept)."""
+    stats = profile.get("stats", {})
+    return dict(
+        platform="tiktok",
+        username=username,
+        status="qualified" if is_qualified else "blacklisted",
+        display_name=profile.get("nickname"),
+        biography=profile.get("signature"),
+        follower_count=stats.get("followerCount"),
+        following_count=stats.get("followingCount"),
+        heart_count=stats.get("heartCount"),
+        post_count=stats.get("videoCount"),
+        is_verified=profile.get("verified", False),
+        score=score,
+        matched_signals=signals,
+        reason=None if is_qualified else f"Score {score} < Threshold | Signals: {signals}",
+        classifier_version=TikTokClassifier.VERSION,
+        raw_payload=payload.pack(profile),
+        classified_at=datetime.utcnow(),
+        is_business=False # API doesn't clearly say, defaulting false
+    )
+
 @CELERY_APP.task(bind=True, max_retries=3)
 def task_tiktok_discover(self, hashtag: str, run_id: int):
     """Phase 1: TikTok Discovery Task"""
     logger.info(f"TikTok Task Phase 1: Discovering #{hashtag} (RunID: {run_id})")
     
     discovery = TikTokDiscoveryEngine()
+    retrying = False
     
-    # Async Sync Bridge
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    if loop.is_closed():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
     try:
-        new_usernames = loop.run_until_complete(discovery.discover_hashtag(hashtag))
+        new_usernames = run_async(discovery.discover_hashtag(hashtag))
         
         # Trigger Classification
+        run_stats.add_pending(run_id, len(new_usernames))
         for username in new_usernames:
             task_tiktok_classify.delay(username, run_id)
             
-        # Update Stats (Shared Run or Separate? Shared for now is fine if just counting)
-        # Actually, let's just log it. Updating SQL might compete with IG scrapers if running parallel.
-        # But we use ACID db so it's fine.
-        session = Session()
-        run = session.query(ScrapingRun).get(run_id)
-        if run:
-            run.users_discovered = (run.users_discovered or 0) + len(new_usernames)
-            session.commit()
-        session.close()
+        # Update Stats (Redis counters, shared run row is only touched by the periodic flush)
+        run_stats.incr(run_id, hashtags_processed=1, users_discovered=len(new_usernames))
         
     except Exception as e:
         logger.error(f"TikTok Discovery failed for #{hashtag}: {e}")
+        retrying = self.request.retries < self.max_retries
         self.retry(exc=e, countdown=60)
+    finally:
+        if not retrying:
+            run_stats.task_done(run_id)
 
 @CELERY_APP.task(bind=True, max_retries=3)
 def task_tiktok_classify(self, username: str, run_id: int):
@@ -54,63 +69,34 @@ def task_tiktok_classify(self, username: str, run_id: int):
     logger.info(f"TikTok Task Phase 2: Classifying @{username}")
     
     scraper = TikTokScraper()
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    if loop.is_closed():
-         loop = asyncio.new_event_loop()
-         asyncio.set_event_loop(loop)
-         
+    retrying = False
     try:
         # 1. Fetch Profile
-        profile = loop.run_until_complete(scraper.get_user_profile(username))
+        profile = run_async(scraper.get_user_profile(username))
         if not profile:
             return None
             
         # 2. Run Classifier
-        is_qualified, score, signals = TikTokClassifier.classify(profile)
+        is_qualified, score, signals = decision_cache.classify(TikTokClassifier, profile)
         
-        session = Session()
+        # 3. Save (upsert into accounts: a duplicate no longer fails the task into a retry)
+        with account_writer() as writer:
+            writer.add(Account, tiktok_account_row(username, profile, is_qualified, score, signals))
         
-        if is_qualified:
-            # SAVE QUALIFIED
-            exists = session.query(TikTokInfluencer).filter_by(username=username).first()
-            if not exists:
-                stats = profile.get("stats", {})
-                lead = TikTokInfluencer(
-                    username=username,
-                    nickname=profile.get("nickname"),
-                    biography=profile.get("signature"),
-                    follower_count=stats.get("followerCount"),
-                    following_count=stats.get("followingCount"),
-                    heart_count=stats.get("heartCount"),
-                    video_count=stats.get("videoCount"),
-                    is_verified=profile.get("verified", False),
-                    score=score,
-                    matched_signals=signals,
-                    is_business=False # API doesn't clearly say, defaulting false
-                )
-                session.add(lead)
-                session.commit()
-                logger.success(f"SAVED TIKTOK LEAD: @{username} (Score: {score})")
-        else:
-            # BLACKLIST
-            bl = TikTokBlacklistedAccount(
-                username=username,
-                reason=f"Score {score} < Threshold | Signals: {signals}",
-                failed_filters=signals
-            )
-            session.add(bl)
-            session.commit()
+        if not is_qualified:
             logger.info(f"Blacklisted TikTok @{username}")
+        elif writer.written.get(Account):
+            logger.success(f"SAVED TIKTOK LEAD: @{username} (Score: {score})")
             
-        session.close()
+        run_stats.incr(run_id, users_classified=1, users_qualified=int(is_qualified))
         
     except Exception as e:
         logger.error(f"TikTok Classification failed for @{username}: {e}")
+        retrying = self.request.retries < self.max_retries
         self.retry(exc=e, countdown=60)
+    finally:
+        if not retrying:
+            run_stats.task_done(run_id)
 
 @CELERY_APP.task
 def task_run_tiktok_pipeline(dry_run: bool = False):
@@ -128,11 +114,16 @@ def task_run_tiktok_pipeline(dry_run: bool = False):
     
     HASHTAGS = settings.HASHTAGS
     
+    if not dry_run:
+        run_stats.add_pending(run_id, len(HASHTAGS))
     for tag in HASHTAGS:
         if dry_run:
              logger.info(f"[DRY RUN] Would queue task_tiktok_discover('{tag}')")
              break # Just one for dry run
         else:
              task_tiktok_discover.delay(tag, run_id)
+    
+    if not dry_run:
+        run_stats.seal(run_id)
              
     logger.success(f"TikTok Pipeline Started! Run ID: {run_id}")
@@ -0,0 +1,136 @@
+import asyncio
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+from loguru import logger
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD concurrency limit for an API whose real capacity is unknown.
+
+    Every success adds 1/limit (about +1 per round trip of the whole window,
+    like TCP congestion avoidance) up to `maximum`. A 429 halves the limit, and
+    a success slower than `latency_target` (EWMA) trims it by 10%, never below
+    `minimum`. Only requests started after the last decrease can trigger another
+    one, so a burst of 429s from the same window counts once. pause() stops new
+    acquisitions until a Retry-After deadline.
+
+        start = await limiter.acquire()
+        ... request ...
+        limiter.release(start, throttled=resp.status_code == 429)
+    """
+
+    def __init__(
+        self,
+        initial: float,
+        minimum: float,
+        maximum: float,
+        latency_target: Optional[float] = None,
+        name: str = "adaptive",
+    ):
+        self.minimum = max(1.0, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(self.maximum, max(self.minimum, initial))
+        self.latency_target = latency_target
+        self.name = name
+        self.in_flight = 0
+        self.latency: Optional[float] = None # EWMA of successful requests, seconds
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._waiters: deque = deque()
+        self.stats = {"acquired": 0, "throttled": 0, "decreases": 0, "peak_limit": self.limit}
+
+    async def acquire(self) -> float:
+        """Waits for a free slot (and any pause); returns the start time for release()."""
+        while True:
+            delay = self._paused_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                self.stats["acquired"] += 1
+                return time.monotonic()
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+    def release(self, start: float, throttled: bool = False, ok: bool = True, end: Optional[float] = None):
+        """
+        Frees the slot and adapts: throttled (429) -> decrease, ok -> increase / latency check.
+        `end` is when the response arrived, if the slot was held past it (e.g. while a
+        consumer took the result), so only the request itself counts as latency.
+        """
+        self.in_flight -= 1
+        now = time.monotonic()
+        if throttled:
+            self.stats["throttled"] += 1
+            self._decrease(start, 0.5, "429")
+        elif ok:
+            latency = (end or now) - start
+            self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+            if self.latency_target and self.latency > self.latency_target:
+                self._decrease(start, 0.9, f"latency {self.latency:.1f}s")
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+                self.stats["peak_limit"] = max(self.stats["peak_limit"], self.limit)
+        self._wake()
+
+    def pause(self, seconds: float):
+        """No new acquisitions for `seconds` (e.g. a Retry-After)."""
+        until = time.monotonic() + seconds
+        if until > self._paused_until:
+            self._paused_until = until
+            logger.warning(f"{self.name}: pausing new requests for {seconds:.0f}s")
+
+    def _decrease(self, start: float, factor: float, reason: str):
+        if start < self._last_decrease:
+            return
+        self._last_decrease = time.monotonic()
+        old = self.limit
+        self.limit = max(self.minimum, self.limit * factor)
+        self.stats["decreases"] += 1
+        if int(old) != int(self.limit):
+            logger.info(f"{self.name}: concurrency {old:.1f} -> {self.limit:.1f} ({reason})")
+
+    def _wake(self):
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def snapshot(self) -> Dict:
+        return dict(
+            self.stats,
+            limit=round(self.limit, 1),
+            peak_limit=round(self.stats["peak_limit"], 1),
+            latency=round(self.latency, 2) if self.latency is not None else None,
+        )
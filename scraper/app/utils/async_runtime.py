@@ -0,0 +1,115 @@
+import asyncio
+import os
+import threading
+from typing import Any, Awaitable, Optional
+
+from loguru import logger
+from app.config import settings
+from app.utils.http_pool import http_pool
+from app.utils.browser_pool import browser_pool
+
+
+class AsyncRuntime:
+    """
+    One long-lived event loop per worker process, running in a background thread.
+
+    Celery task bodies stay synchronous and hand their coroutine to run(), which
+    schedules it on the shared loop and blocks the calling thread until it
+    finishes. With a threaded worker pool (--pool=threads --concurrency=N) every
+    task thread parks on its own future while the single loop keeps up to
+    ASYNC_TASK_CONCURRENCY coroutines in flight, reusing the same pooled HTTP
+    connections. With prefork/solo pools it still saves a loop (and client) per task.
+
+    Started on worker_process_init (see app/pipeline.py) or lazily on first use,
+    so scripts that call tasks directly work unchanged.
+    """
+
+    def __init__(self, concurrency: Optional[int] = None):
+        self._concurrency = concurrency
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._pid = os.getpid()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        self.start()
+        return self._loop
+
+    def start(self):
+        """Starts the loop thread if it isn't running in this process yet."""
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked child: the parent's loop thread doesn't exist here
+                self._pid = os.getpid()
+                self._loop = self._thread = self._sem = None
+
+            if self._loop is not None and not self._loop.is_closed():
+                return
+
+            loop = asyncio.new_event_loop()
+            limit = self._concurrency or settings.ASYNC_TASK_CONCURRENCY
+            ready = threading.Event()
+
+            def _run():
+                asyncio.set_event_loop(loop)
+                self._sem = asyncio.Semaphore(limit)
+                ready.set()
+                loop.run_forever()
+
+            self._thread = threading.Thread(target=_run, name="async-runtime", daemon=True)
+            self._thread.start()
+            ready.wait()
+            self._loop = loop
+            logger.info(f"Async runtime started (pid {self._pid}, concurrency {limit})")
+
+    async def _bounded(self, coro: Awaitable) -> Any:
+        async with self._sem:
+            return await coro
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None) -> Any:
+        """
+        Runs `coro` on the shared loop and returns its result (re-raises its
+        exception). If the wait ends early (timeout, Celery soft time limit, ...)
+        the coroutine is cancelled so it releases its slot and connections.
+        """
+        loop = self.loop
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("AsyncRuntime.run() called from inside the runtime loop; await the coroutine instead")
+        future = asyncio.run_coroutine_threadsafe(self._bounded(coro), loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def stop(self):
+        """Closes pooled HTTP clients and browsers on the loop, then stops and closes the loop."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            if loop is None or loop.is_closed() or self._pid != os.getpid():
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(http_pool.aclose(), loop).result(10)
+            except Exception as e:
+                logger.warning(f"Async runtime: error closing HTTP clients: {e}")
+            try:
+                asyncio.run_coroutine_threadsafe(browser_pool.close(), loop).result(30)
+            except Exception as e:
+                logger.warning(f"Async runtime: error closing browser pool: {e}")
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(10)
+            loop.close()
+            self._loop = self._thread = self._sem = None
+            logger.info(f"Async runtime stopped (pid {self._pid})")
+
+
+# Singleton instance (one per worker process)
+runtime = AsyncRuntime()
+
+
+def run_async(coro: Awaitable, timeout: Optional[float] = None) -> Any:
+    """Shortcut for runtime.run(): run a coroutine from synchronous task code."""
+    return runtime.run(coro, timeout)
@@ -0,0 +1,143 @@
+"""
+Static (no browser) email extraction for bio-link pages (Linktree, Beacons,
+Carrd, Taplink, ...). Most of them ship the page content in the initial HTML:
+either as mailto: links or as embedded JSON (Next.js __NEXT_DATA__, inline
+state objects). Only pages that are rendered client-side need Chromium.
+"""
+import html as htmllib
+import json
+import re
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+from loguru import logger
+from app.utils import emails
+from app.utils.http_pool import http_pool
+
+MAILTO_RE = re.compile(r"""href\s*=\s*["']mailto:([^"'?#\s]+)""", re.IGNORECASE)
+NEXT_DATA_RE = re.compile(r'<script[^>]+id=["\']__NEXT_DATA__["\'][^>]*>(.*?)</script>', re.DOTALL | re.IGNORECASE)
+INLINE_STATE_RE = re.compile(
+    r"window\.(?:__INITIAL_STATE__|__PRELOADED_STATE__|__APOLLO_STATE__|data)\s*=\s*(\{.*?\})\s*;?\s*</script>",
+    re.DOTALL,
+)
+SCRIPT_STYLE_RE = re.compile(r"<(script|style|noscript)\b.*?</\1>", re.DOTALL | re.IGNORECASE)
+TAG_RE = re.compile(r"<[^>]+>")
+SPA_ROOT_RE = re.compile(r'<div[^>]+id=["\'](?:root|app|__next|__nuxt)["\'][^>]*>\s*</div>', re.IGNORECASE)
+
+BROWSER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# Statuses worth a browser retry (bot walls / rate limiting); anything else is final
+ESCALATE_STATUSES = {403, 429, 503}
+
+# Visible text below this many characters (with scripts present) means JS-rendered
+MIN_STATIC_TEXT = 200
+
+
+def _walk_strings(node) -> Iterator[str]:
+    if isinstance(node, str):
+        yield node
+    elif isinstance(node, dict):
+        for value in node.values():
+            yield from _walk_strings(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _walk_strings(value)
+
+
+def _email_from_json(blob: str) -> Optional[str]:
+    """mailto: values first (explicit email links), then any email-looking string."""
+    try:
+        data = json.loads(blob)
+    except ValueError:
+        return None
+    strings = list(_walk_strings(data))
+    for value in strings:
+        if value.lower().startswith("mailto:"):
+            email = emails.clean(value[7:].split("?")[0])
+            if email:
+                return email
+    for value in strings:
+        email = emails.first(value)
+        if email:
+            return email
+    return None
+
+
+def parse_next_data(html: str) -> Optional[str]:
+    """Next.js pages (Linktree, Beacons) embed the full page props as JSON."""
+    match = NEXT_DATA_RE.search(html)
+    return _email_from_json(match.group(1)) if match else None
+
+
+def parse_inline_state(html: str) -> Optional[str]:
+    """Pages that bootstrap from a `window.<state> = {...}` object (Taplink and others)."""
+    for match in INLINE_STATE_RE.finditer(html):
+        email = _email_from_json(match.group(1))
+        if email:
+            return email
+    return None
+
+
+# Embedded-JSON parsers per aggregator; unknown hosts try all of them
+AGGREGATOR_PARSERS: Dict[str, List[Callable[[str], Optional[str]]]] = {
+    "linktr.ee": [parse_next_data],
+    "beacons.ai": [parse_next_data, parse_inline_state],
+    "taplink.cc": [parse_inline_state],
+    "carrd.co": [],
+}
+
+
+def visible_text(html: str) -> str:
+    return htmllib.unescape(TAG_RE.sub(" ", SCRIPT_STYLE_RE.sub(" ", html)))
+
+
+def parse(url: str, html: str) -> Optional[str]:
+    """Email from static HTML: mailto links, then embedded JSON, then visible text."""
+    for match in MAILTO_RE.finditer(html):
+        email = emails.clean(htmllib.unescape(match.group(1)))
+        if email:
+            return email
+
+    host = urlparse(url).netloc.lower().removeprefix("www.")
+    parsers = next((p for domain, p in AGGREGATOR_PARSERS.items() if host.endswith(domain)), None)
+    for parser in (parsers if parsers is not None else [parse_next_data, parse_inline_state]):
+        email = parser(html)
+        if email:
+            return email
+
+    return emails.first(visible_text(html))
+
+
+def looks_js_rendered(html: str) -> bool:
+    """True when the static HTML is an empty shell that a browser would fill in."""
+    if NEXT_DATA_RE.search(html):
+        # Server-rendered Next.js: everything is already in the JSON
+        return False
+    has_scripts = "<script" in html.lower()
+    text = " ".join(visible_text(html).split())
+    return bool(SPA_ROOT_RE.search(html)) or (has_scripts and len(text) < MIN_STATIC_TEXT)
+
+
+async def fetch(url: str, timeout: float = 10.0) -> Tuple[Optional[str], bool, bool]:
+    """
+    GET the page with the shared client. Returns (html, escalate, failed):
+    html is None when there is nothing to parse; escalate says a browser might
+    still succeed; failed marks a transient miss (network error, bot wall,
+    429 / 5xx) whose empty result must not be cached as "no email".
+    """
+    try:
+        response = await http_pool.get().get(url, headers=BROWSER_HEADERS, follow_redirects=True, timeout=timeout)
+    except httpx.HTTPError as e:
+        logger.debug(f"Static fetch failed for {url}: {e}")
+        return None, True, True
+    if response.status_code != 200:
+        status = response.status_code
+        return None, status in ESCALATE_STATUSES, status in ESCALATE_STATUSES or status >= 500
+    if "html" not in response.headers.get("content-type", "text/html"):
+        return None, False, False
+    return response.text, False, False
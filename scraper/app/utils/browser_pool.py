@@ -0,0 +1,192 @@
+import asyncio
+import random
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+from loguru import logger
+from playwright.async_api import Browser, BrowserContext, Playwright, async_playwright
+from app.config import settings
+
+IPHONE = "iPhone 12 Pro"
+
+USER_AGENTS = [
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (Linux; Android 10; SM-G981B) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/80.0.3987.162 Mobile Safari/537.36"
+]
+
+
+class _BrowserSlot:
+    """One pooled Chromium process plus its idle contexts."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.browser: Optional[Browser] = None
+        self.lock = asyncio.Lock()
+        self.active = 0
+        self.leases = 0
+        self.retiring = False
+        self.idle: Dict[bool, List[BrowserContext]] = {False: [], True: []}
+        self.uses: Dict[int, int] = {}
+
+    @property
+    def healthy(self) -> bool:
+        return self.browser is not None and self.browser.is_connected()
+
+
+class BrowserPool:
+    """
+    Long-lived Chromium browsers for enrichment (Tier 2 bio links, Tier 3 mobile).
+
+    BROWSER_POOL_SIZE browsers are launched on first use and shared by every
+    lease. A lease hands out a BrowserContext (desktop, or the prebuilt iPhone
+    profile with mobile=True), at most BROWSER_CONTEXTS_PER_BROWSER at a time
+    per browser. On release the context's pages are closed and its cookies
+    cleared, and it is kept for reuse up to BROWSER_CONTEXT_MAX_USES times.
+
+    Browsers that disconnect are relaunched on the next lease. After
+    BROWSER_RECYCLE_AFTER leases a browser is drained and restarted to cap
+    Chromium's memory growth.
+
+        async with browser_pool.lease(mobile=True) as context:
+            page = await context.new_page()
+
+    Playwright objects are bound to the event loop that created them; the pool
+    restarts itself if it is used from a different loop (e.g. a new asyncio.run()).
+    """
+
+    def __init__(self, size: Optional[int] = None, contexts_per_browser: Optional[int] = None):
+        self._size = size
+        self._contexts_per_browser = contexts_per_browser
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._playwright: Optional[Playwright] = None
+        self._iphone: Dict = {}
+        self._slots: List[_BrowserSlot] = []
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        self.stats = {"launches": 0, "recycles": 0, "leases": 0, "contexts_created": 0}
+
+    @property
+    def size(self) -> int:
+        return self._size or settings.BROWSER_POOL_SIZE
+
+    async def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # First use, or the previous loop is gone: its Playwright objects are unusable
+            self._loop = loop
+            self._playwright = None
+            self._start_lock = asyncio.Lock()
+        if self._playwright is not None:
+            return
+        async with self._start_lock:
+            if self._playwright is not None:
+                return
+            per_browser = self._contexts_per_browser or settings.BROWSER_CONTEXTS_PER_BROWSER
+            self._playwright = await async_playwright().start()
+            self._iphone = dict(self._playwright.devices[IPHONE])
+            self._slots = [_BrowserSlot(i) for i in range(self.size)]
+            self._sem = asyncio.Semaphore(self.size * per_browser)
+            logger.info(f"Browser pool started ({self.size} browsers x {per_browser} contexts)")
+
+    async def _launch(self, slot: _BrowserSlot):
+        async with slot.lock:
+            if slot.healthy:
+                return
+            if slot.browser is not None:
+                logger.warning(f"Browser pool: browser {slot.index} disconnected, relaunching")
+                await self._retire(slot)
+            slot.browser = await self._playwright.chromium.launch(headless=True)
+            slot.idle = {False: [], True: []}
+            slot.uses = {}
+            slot.leases = 0
+            slot.retiring = False
+            self.stats["launches"] += 1
+
+    def _pick_slot(self) -> _BrowserSlot:
+        candidates = [s for s in self._slots if not s.retiring] or self._slots
+        return min(candidates, key=lambda s: s.active)
+
+    async def _checkout(self, slot: _BrowserSlot, mobile: bool) -> BrowserContext:
+        if slot.idle[mobile]:
+            return slot.idle[mobile].pop()
+        if mobile:
+            profile = dict(self._iphone, user_agent=random.choice(USER_AGENTS))
+            context = await slot.browser.new_context(**profile)
+        else:
+            context = await slot.browser.new_context()
+        slot.uses[id(context)] = 0
+        self.stats["contexts_created"] += 1
+        return context
+
+    async def _checkin(self, slot: _BrowserSlot, context: BrowserContext, mobile: bool, ok: bool):
+        slot.active -= 1
+        slot.leases += 1
+        uses = slot.uses.get(id(context), 0) + 1
+        slot.uses[id(context)] = uses
+
+        reuse = ok and slot.healthy and uses < settings.BROWSER_CONTEXT_MAX_USES
+        try:
+            if reuse:
+                for page in context.pages:
+                    await page.close()
+                await context.clear_cookies()
+                slot.idle[mobile].append(context)
+            else:
+                slot.uses.pop(id(context), None)
+                await context.close()
+        except Exception:
+            slot.uses.pop(id(context), None)
+
+        if slot.leases >= settings.BROWSER_RECYCLE_AFTER:
+            slot.retiring = True
+        if slot.retiring and slot.active == 0:
+            self.stats["recycles"] += 1
+            await self._retire(slot)
+
+    async def _retire(self, slot: _BrowserSlot):
+        browser, slot.browser = slot.browser, None
+        slot.idle = {False: [], True: []}
+        slot.uses = {}
+        slot.retiring = False
+        if browser is not None:
+            try:
+                await browser.close()
+            except Exception:
+                pass
+
+    @asynccontextmanager
+    async def lease(self, mobile: bool = False):
+        """Yields a pooled BrowserContext; close your pages or let the pool do it."""
+        await self._ensure_started()
+        async with self._sem:
+            slot = self._pick_slot()
+            slot.active += 1
+            try:
+                await self._launch(slot)
+                context = await self._checkout(slot, mobile)
+            except Exception:
+                slot.active -= 1
+                raise
+
+            self.stats["leases"] += 1
+            ok = False
+            try:
+                yield context
+                ok = True
+            finally:
+                await self._checkin(slot, context, mobile, ok)
+
+    async def close(self):
+        """Closes every browser and stops Playwright (call at the end of a run)."""
+        if self._playwright is None or self._loop is not asyncio.get_running_loop():
+            return
+        for slot in self._slots:
+            await self._retire(slot)
+        await self._playwright.stop()
+        self._playwright = None
+        self._slots = []
+        logger.info(f"Browser pool closed: {self.stats}")
+
+
+# Singleton instance (one per worker process)
+browser_pool = BrowserPool()
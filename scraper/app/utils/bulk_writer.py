@@ -0,0 +1,125 @@
+from typing import Callable, Dict, List, Optional, Sequence
+
+from loguru import logger
+from sqlalchemy import and_, insert, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session as SASession
+from app.config import settings
+
+# Columns an upsert never overwrites (first-seen timestamps)
+KEEP_ON_UPDATE = {"id", "discovered_at", "created_at"}
+
+
+class BulkWriter:
+    """
+    Buffers rows (plain column dicts) for models with a unique key and writes
+    them in batches with one INSERT ... ON CONFLICT per table (PostgreSQL and
+    SQLite), so there is no existence query per row and a duplicate can never
+    raise IntegrityError. Rows already in the table are skipped, or updated
+    with update=True (only those matching `update_where`, if given). Other
+    dialects fall back to one IN lookup per batch.
+
+        with BulkWriter(Session, update=True, update_where=Account.status != "qualified") as writer:
+            writer.add(Account, lead_row(...))
+            writer.add(Account, blacklist_row(...))
+        writer.written[Account]  # [{"id", "platform", "username"}] rows actually inserted (or updated)
+
+    Rows are flushed every BULK_WRITE_BATCH adds, on flush(), and when the
+    `with` block exits. Within a buffer the last row for a key wins.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], SASession],
+        batch_size: Optional[int] = None,
+        update: bool = False,
+        key: Sequence[str] = ("platform", "username"),
+        update_where=None,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.BULK_WRITE_BATCH
+        self.update = update
+        self.key = [key] if isinstance(key, str) else list(key)
+        self.update_where = update_where
+        self._buffers: Dict[type, Dict[tuple, dict]] = {}
+        self._pending = 0
+        self.written: Dict[type, List[dict]] = {}
+        self.stats = {"rows": 0, "written": 0, "conflicts": 0, "batches": 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+
+    def add(self, model: type, row: dict):
+        self._buffers.setdefault(model, {})[tuple(row[k] for k in self.key)] = row
+        self._pending += 1
+        self.stats["rows"] += 1
+        if self._pending >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> Dict[type, List[dict]]:
+        """Writes everything buffered in one transaction; returns the rows written by this flush."""
+        buffers, self._buffers, self._pending = self._buffers, {}, 0
+        if not buffers:
+            return {}
+
+        written: Dict[type, List[dict]] = {}
+        session = self.session_factory()
+        try:
+            for model, rows in buffers.items():
+                written[model] = self._write(session, model, list(rows.values()))
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+        self.stats["batches"] += 1
+        for model, rows in written.items():
+            self.written.setdefault(model, []).extend(rows)
+            self.stats["written"] += len(rows)
+            self.stats["conflicts"] += len(buffers[model]) - len(rows)
+        logger.debug(f"Bulk write: {', '.join(f'{m.__tablename__}={len(r)}' for m, r in written.items())}")
+        return written
+
+    def _write(self, session: SASession, model: type, rows: List[dict]) -> List[dict]:
+        table = model.__table__
+        keys = [table.c[k] for k in self.key]
+        dialect = session.get_bind().dialect.name
+
+        if dialect in ("postgresql", "sqlite"):
+            stmt = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(table)
+            if self.update:
+                columns = [c for c in rows[0] if c not in KEEP_ON_UPDATE and c not in self.key]
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=keys, set_={c: stmt.excluded[c] for c in columns}, where=self.update_where
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=keys)
+            result = session.execute(stmt.returning(table.c.id, *keys), rows)
+            return [dict(r._mapping) for r in result]
+
+        # Generic fallback: one lookup for the whole batch
+        key_of = lambda row: tuple(row[k] for k in self.key)
+        existing = {tuple(r) for r in session.execute(select(*keys).where(tuple_(*keys).in_([key_of(r) for r in rows])))}
+        new = [r for r in rows if key_of(r) not in existing]
+        changed = list(new)
+        if self.update:
+            for row in rows:
+                if key_of(row) in existing:
+                    values = {c: v for c, v in row.items() if c not in KEEP_ON_UPDATE}
+                    match = and_(*(k == v for k, v in zip(keys, key_of(row))))
+                    if self.update_where is not None:
+                        match = and_(match, self.update_where)
+                    if session.execute(table.update().where(match).values(**values)).rowcount:
+                        changed.append(row)
+        if new:
+            session.execute(insert(table), new)
+        if not changed:
+            return []
+        ids = session.execute(select(table.c.id, *keys).where(tuple_(*keys).in_([key_of(r) for r in changed])))
+        return [dict(r._mapping) for r in ids]
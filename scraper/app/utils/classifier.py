@@ -1,5 +1,7 @@
 import re
-from typing import Tuple, List, Dict, Any
+from typing import Tuple, List, Dict, Any, Optional, Sequence, Set
+import numpy as np
+from app.utils.keyword_matcher import KeywordMatcher
 
 class LocationClassifier:
     """
@@ -211,30 +213,30 @@ class LocationClassifier:
         """
         bio_lower = bio_text.lower() if bio_text else ""
         user = username.lower() if username else ""
+        scan = cls.scan_bio(bio_lower, user)
         
         # --- STAGE 1: HARD REJECTS ---
         
         # 1A: Username
-        if cls.is_bad_username(user):
+        if scan["bad_username"]:
             return False, f"REJECTED: Bad username '{user}'", 0
         
         # 1B: Negative Location
-        for neg in cls.LOCATION_BLACKLIST:
-            if neg in bio_lower:
-                return False, f"REJECTED: Negative Location '{neg}'", 0
+        if scan["blacklist"]:
+            return False, f"REJECTED: Negative Location '{scan['blacklist'][0]}'", 0
                 
         # --- STAGE 2: LOCATION SCORING ---
-        loc_score, matched_loc = cls.calculate_location_score(bio_text)
+        loc_score, matched_loc = scan["location"]
         if loc_score == 0:
              return False, "REJECTED: Not in SoCal", 0
              
         # --- STAGE 3: CONTENT INTEGRITY ---
-        passes_content, reason = cls.passes_content_integrity(bio_lower, user)
+        passes_content, reason = cls._content_integrity(scan["content"])
         if not passes_content:
              return False, f"REJECTED: {reason}", 0
              
         # --- STAGE 4: CONTENT SCORING ---
-        content_score, matched_cats = cls.calculate_content_score(bio_lower, user)
+        content_score, matched_cats = cls._content_score(scan["content"])
         
         # --- STAGE 5: ENGAGEMENT BONUS ---
         eng_bonus = cls._calculate_engagement_bonus(metrics, content_score + loc_score) if metrics else 0
@@ -246,120 +248,145 @@ class LocationClassifier:
             
         return False, f"FAILED: {total_score} pts", total_score
 
+    # Location tiers in priority order: (LOCATION_SIGNALS key, points, label).
+    # regional_soft is split so 'california' terms can be dropped for Baja bios.
+    LOCATION_TIERS = [
+        ("strict_emoji", 25, "strict_emoji"),
+        ("pipe_format", 22, "pipe_format"),
+        ("la_cities", 18, "la_city"),
+        ("oc_cities", 18, "oc_city"),
+        ("sd_cities", 18, "sd_city"),
+        ("ie_cities", 18, "ie_city"),
+        ("la_neighborhoods_sgv", 18, "sgv_hood"),
+        ("area_codes", 8, "area_code"),
+        ("regional_soft", 12, "regional_soft"),
+    ]
+
+    @classmethod
+    def _get_scanner(cls) -> KeywordMatcher:
+        """
+        Compiled matcher over LOCATION_SIGNALS, LOCATION_BLACKLIST and CONTENT_SIGNALS.
+        Built once per class on first use. Group names are prefixed by table
+        ('loc:', 'neg:', 'content:') and each blacklist term is its own group so
+        the first hit in list order can be reported.
+        """
+        scanner = cls.__dict__.get("_scanner")
+        if scanner is None:
+            table = {}
+            for name, terms in cls.LOCATION_SIGNALS.items():
+                if name == "regional_soft":
+                    table["loc:regional_soft"] = [t for t in terms if "california" not in t]
+                    table["loc:regional_soft_california"] = [t for t in terms if "california" in t]
+                else:
+                    table["loc:" + name] = terms
+            table["loc:baja"] = ["baja"]
+            for term in cls.LOCATION_BLACKLIST:
+                table["neg:" + term] = [term]
+            for name, terms in cls.CONTENT_SIGNALS.items():
+                table["content:" + name] = terms
+            scanner = KeywordMatcher(table)
+            cls._scanner = scanner
+        return scanner
+
+    @classmethod
+    def _get_username_rules(cls) -> Tuple[KeywordMatcher, "re.Pattern"]:
+        """USERNAME_BLACKLIST matcher plus the whitelist patterns as one alternation."""
+        rules = cls.__dict__.get("_username_rules")
+        if rules is None:
+            rules = (
+                KeywordMatcher({"blacklist": cls.USERNAME_BLACKLIST}),
+                re.compile("|".join(f"(?:{p})" for p in cls.USERNAME_WHITELIST_PATTERNS)),
+            )
+            cls._username_rules = rules
+        return rules
+
+    @classmethod
+    def scan_bio(cls, bio_lower: str, username: str = "") -> Dict[str, Any]:
+        """
+        One pass over `bio_lower + " " + username` (both lowercased).
+        Returns:
+            location:        (points, label) of the best location tier in the bio
+            location_groups: LOCATION_SIGNALS keys found in the bio
+            blacklist:       LOCATION_BLACKLIST terms found in the bio, in list order
+            content:         CONTENT_SIGNALS keys found in bio + username
+            bad_username:    result of is_bad_username(username)
+        """
+        bio_hits, hits = cls._get_scanner().match_split(f"{bio_lower} {username}", len(bio_lower))
+
+        location_groups = set()
+        for group in bio_hits:
+            if group.startswith("loc:regional_soft"):
+                location_groups.add("regional_soft")
+            elif group.startswith("loc:") and group != "loc:baja":
+                location_groups.add(group[4:])
+
+        location = (0, "")
+        for name, points, label in cls.LOCATION_TIERS:
+            if name == "regional_soft":
+                hit = "loc:regional_soft" in bio_hits or (
+                    "loc:regional_soft_california" in bio_hits and "loc:baja" not in bio_hits
+                )
+            else:
+                hit = name in location_groups
+            if hit:
+                location = (points, label)
+                break
+
+        return {
+            "location": location,
+            "location_groups": location_groups,
+            "blacklist": [t for t in cls.LOCATION_BLACKLIST if ("neg:" + t) in bio_hits],
+            "content": {g[8:] for g in hits if g.startswith("content:")},
+            "bad_username": cls.is_bad_username(username) if username else False,
+        }
+
     @classmethod
     def calculate_location_score(cls, bio_text: str) -> Tuple[int, str]:
-        bio_lower = bio_text.lower()
-        score = 0
-        best_match = ""
-        
-        # Check Strict Emoji (High Confidence)
-        for term in cls.LOCATION_SIGNALS["strict_emoji"]:
-            if term in bio_lower:
-                return 25, "strict_emoji"
-                
-        # Check Pipe Format
-        for term in cls.LOCATION_SIGNALS["pipe_format"]:
-            if term in bio_lower:
-                return 22, "pipe_format"
-        
-        # Check Cities - LA
-        for term in cls.LOCATION_SIGNALS["la_cities"]:
-            if term in bio_lower:
-                return 18, "la_city"
-        # Check Cities - OC
-        for term in cls.LOCATION_SIGNALS["oc_cities"]:
-            if term in bio_lower:
-                return 18, "oc_city"
-        # Check Cities - SD
-        for term in cls.LOCATION_SIGNALS["sd_cities"]:
-            if term in bio_lower:
-                return 18, "sd_city"
-        # Check Cities - IE
-        for term in cls.LOCATION_SIGNALS["ie_cities"]:
-            if term in bio_lower:
-                return 18, "ie_city"
-        # Check SGV Neighborhoods
-        for term in cls.LOCATION_SIGNALS["la_neighborhoods_sgv"]:
-            if term in bio_lower:
-                return 18, "sgv_hood"
-        
-        # Check Area Codes
-        for ac in cls.LOCATION_SIGNALS["area_codes"]:
-            if ac in bio_lower:
-                return 8, "area_code"
-                
-        # Check Regional Soft (Lowest)
-        for term in cls.LOCATION_SIGNALS["regional_soft"]:
-            if term in bio_lower:
-                 # Special check for 'california' to ensure it's not 'baja california'
-                 if "baja" in bio_lower and "california" in term:
-                     continue
-                 return 12, "regional_soft"
+        return cls.scan_bio(bio_text.lower())["location"]
+
+    # Content categories scored by calculate_content_score, in report order:
+    # (CONTENT_SIGNALS key, points, label)
+    CONTENT_SCORES = [
+        ("food_primary", 15, "food_primary"),
+        ("food_niche", 10, "food_niche"),
+        ("lifestyle_primary", 15, "lifestyle"),  # Boosted to ensure pass
+        ("lifestyle_local", 10, "local_discovery"),
+        ("coffee_signals", 15, "coffee"),  # Boosted (Coffee is a strong signal)
+        ("creator_signals", 12, "creator"),  # Boosted
+        ("collab_signals", 15, "collab_ready"),
+        ("college_signals", 12, "college"),  # Boosted
+    ]
 
-        return 0, ""
+    @classmethod
+    def _content_hits(cls, bio: str, username: str) -> Set[str]:
+        hits = cls._get_scanner().match((bio + " " + username).lower())
+        return {g[8:] for g in hits if g.startswith("content:")}
 
     @classmethod
     def calculate_content_score(cls, bio, username):
-        combined = (bio + " " + username).lower()
+        return cls._content_score(cls._content_hits(bio, username))
+
+    @classmethod
+    def _content_score(cls, content: Set[str]) -> Tuple[int, List[str]]:
         score = 0
         matched_categories = []
-        
-        # FOOD SCORING
-        if any(kw in combined for kw in cls.CONTENT_SIGNALS["food_primary"]):
-            score += 15
-            matched_categories.append("food_primary")
-        if any(kw in combined for kw in cls.CONTENT_SIGNALS["food_niche"]):
-            score += 10
-            matched_categories.append("food_niche")
-        
-        # LIFESTYLE SCORING
-        if any(kw in combined for kw in cls.CONTENT_SIGNALS["lifestyle_primary"]):
-            score += 15 # Boosted to ensure pass
-            matched_categories.append("lifestyle")
-        if any(kw in combined for kw in cls.CONTENT_SIGNALS["lifestyle_local"]):
-            score += 10
-            matched_categories.append("local_discovery")
-            
-        # COFFEE SCORING
-        if any(kw in combined for kw in cls.CONTENT_SIGNALS["coffee_signals"]):
-            score += 15 # Boosted (Coffee is a strong signal)
-            matched_categories.append("coffee")
-            
-        # CREATOR SCORING
-        if any(kw in combined for kw in cls.CONTENT_SIGNALS["creator_signals"]):
-            score += 12 # Boosted
-            matched_categories.append("creator")
-            
-        # COLLAB INTENT
-        if any(kw in combined for kw in cls.CONTENT_SIGNALS["collab_signals"]):
-            score += 15
-            matched_categories.append("collab_ready")
-            
-        # COLLEGE SCORING
-        if any(kw in combined for kw in cls.CONTENT_SIGNALS["college_signals"]):
-            score += 12 # Boosted
-            matched_categories.append("college")
-            
+        for name, points, label in cls.CONTENT_SCORES:
+            if name in content:
+                score += points
+                matched_categories.append(label)
         return score, matched_categories
 
     @classmethod
     def passes_content_integrity(cls, bio, username):
-        combined = (bio + " " + username).lower()
-        
-        has_food = any(kw in combined for kw in 
-            cls.CONTENT_SIGNALS["food_primary"] + 
-            cls.CONTENT_SIGNALS["food_niche"] + 
-            cls.CONTENT_SIGNALS["food_specific"]
-        )
-        
-        has_lifestyle = any(kw in combined for kw in 
-            cls.CONTENT_SIGNALS["lifestyle_primary"] + 
-            cls.CONTENT_SIGNALS["lifestyle_local"]
-        )
-        
-        has_coffee = any(kw in combined for kw in cls.CONTENT_SIGNALS["coffee_signals"])
-        has_creator = any(kw in combined for kw in cls.CONTENT_SIGNALS["creator_signals"])
-        has_college = any(kw in combined for kw in cls.CONTENT_SIGNALS["college_signals"])
+        return cls._content_integrity(cls._content_hits(bio, username))
+
+    @classmethod
+    def _content_integrity(cls, content: Set[str]) -> Tuple[bool, str]:
+        has_food = bool(content & {"food_primary", "food_niche", "food_specific"})
+        has_lifestyle = bool(content & {"lifestyle_primary", "lifestyle_local"})
+        has_coffee = "coffee_signals" in content
+        has_creator = "creator_signals" in content
+        has_college = "college_signals" in content
         
         if has_food or has_lifestyle or has_coffee or has_college:
             return True, "content_match"
@@ -397,16 +424,72 @@ class LocationClassifier:
             
         return min(bonus, 30)
 
+    @classmethod
+    def engagement_bonus_batch(cls, n: int, likes=None, comments=None, views=None) -> np.ndarray:
+        """Vectorized _calculate_engagement_bonus() over n rows of metric arrays (missing arrays count as 0)."""
+        likes = np.zeros(n) if likes is None else np.asarray(likes)
+        comments = np.zeros(n) if comments is None else np.asarray(comments)
+        views = np.zeros(n) if views is None else np.asarray(views)
+
+        bonus = np.select([views > 10000, views > 5000, views > 1000], [20, 15, 10], default=0)
+        bonus = bonus + np.where(comments >= 5, 5, 0) + np.where(likes >= 200, 5, 0)
+        return np.minimum(bonus, 30)
+
+    @classmethod
+    def classify_batch(
+        cls,
+        bios: Sequence[Optional[str]],
+        usernames: Sequence[Optional[str]],
+        likes=None,
+        comments=None,
+        views=None,
+    ) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+        """
+        Columnar classify_account(). Engagement bonuses are computed as one
+        vectorized pass over the metric arrays; each bio is scanned once.
+        Returns (passed bool array, score int array, reason per row).
+        """
+        n = len(bios)
+        bonus = cls.engagement_bonus_batch(n, likes, comments, views)
+        passed = np.zeros(n, dtype=bool)
+        scores = np.zeros(n, dtype=np.int64)
+        reasons: List[str] = []
+
+        for i in range(n):
+            bio_lower = bios[i].lower() if bios[i] else ""
+            user = usernames[i].lower() if usernames[i] else ""
+            scan = cls.scan_bio(bio_lower, user)
+
+            if scan["bad_username"]:
+                reasons.append(f"REJECTED: Bad username '{user}'")
+                continue
+            if scan["blacklist"]:
+                reasons.append(f"REJECTED: Negative Location '{scan['blacklist'][0]}'")
+                continue
+            loc_score, matched_loc = scan["location"]
+            if loc_score == 0:
+                reasons.append("REJECTED: Not in SoCal")
+                continue
+            passes_content, reason = cls._content_integrity(scan["content"])
+            if not passes_content:
+                reasons.append(f"REJECTED: {reason}")
+                continue
+
+            content_score, matched_cats = cls._content_score(scan["content"])
+            total_score = loc_score + content_score + int(bonus[i])
+            scores[i] = total_score
+            if total_score >= cls.PASSING_THRESHOLD:
+                passed[i] = True
+                reasons.append(f"PASSED: {total_score} pts ({matched_loc}, cats={matched_cats})")
+            else:
+                reasons.append(f"FAILED: {total_score} pts")
+
+        return passed, scores, reasons
+
     @classmethod
     def is_bad_username(cls, username: str) -> bool:
         user = username.lower()
-        for term in cls.USERNAME_BLACKLIST:
-            if term in user:
-                is_exception = False
-                for pattern in cls.USERNAME_WHITELIST_PATTERNS:
-                    if re.match(pattern, user):
-                        is_exception = True
-                        break
-                if not is_exception:
-                    return True 
-        return False
+        blacklist, whitelist = cls._get_username_rules()
+        if not blacklist.match(user):
+            return False
+        return not whitelist.match(user)
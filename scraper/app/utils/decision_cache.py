@@ -0,0 +1,202 @@
+import hashlib
+import inspect
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis
+from redis.backoff import NoBackoff
+from redis.retry import Retry
+from loguru import logger
+from app.config import settings
+
+Decision = Tuple[bool, int, List[str]]
+
+
+class DecisionCache:
+    """
+    Memoizes classifier verdicts so an account seen again (hashtags, network
+    peers, dorks) isn't rescored.
+
+    Key: (ruleset hash, classifier.fingerprint(profile)). The ruleset hash
+    covers the classifier's upper-case class attributes (signal tables,
+    VERSION, ...), its source, and the current value of every `settings.X` its
+    source reads, so editing a keyword list or a threshold (even at runtime)
+    switches to a fresh key space and old verdicts are never served.
+
+    Lookups go to an in-process LRU (DECISION_CACHE_SIZE) first, then Redis
+    (shared across workers, DECISION_CACHE_TTL), then classify(). A Redis hit
+    costs one GET; a miss one GET plus one pipelined SET that also flushes the
+    shared hit / miss counters (buffered locally, STATS_KEY hash). After any
+    Redis error the cache runs on the LRU alone for DECISION_CACHE_REDIS_BACKOFF
+    seconds, so a dead Redis costs one short timeout, not one per profile.
+    Safe to share between the threads of a worker (--pool=threads).
+
+        is_qualified, score, signals = decision_cache.classify(Classifier, profile)
+    """
+
+    KEY = "decision_cache:{ruleset}:{fingerprint}"
+    STATS_KEY = "decision_cache:stats"
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
+        self._redis = redis_client
+        self._lock = threading.Lock()
+        self._lru: "OrderedDict[Tuple[str, str], Decision]" = OrderedDict()
+        self._static: Dict[type, Tuple[str, List[str]]] = {}
+        self._rulesets: Dict[tuple, str] = {}
+        self._unflushed: Dict[str, int] = {} # Shared counter deltas not yet in Redis
+        self._redis_down_until = 0.0
+        self.local_stats: Dict[str, Dict[str, int]] = {}
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            # A verdict costs microseconds to recompute: never wait long on (or retry) Redis
+            self._redis = redis.from_url(
+                settings.REDIS_URL, socket_timeout=0.25, socket_connect_timeout=0.25, retry=Retry(NoBackoff(), 0)
+            )
+        return self._redis
+
+    def _redis_available(self) -> bool:
+        return time.monotonic() >= self._redis_down_until
+
+    def _redis_failed(self, e: Exception):
+        self._redis_down_until = time.monotonic() + settings.DECISION_CACHE_REDIS_BACKOFF
+        logger.warning(f"Decision cache: Redis unavailable ({e}), LRU only for {settings.DECISION_CACHE_REDIS_BACKOFF:.0f}s")
+
+    def ruleset_hash(self, classifier: type) -> str:
+        static = self._static.get(classifier)
+        if static is None:
+            source = inspect.getsource(classifier)
+            tables = {k: v for k, v in vars(classifier).items() if k.isupper()}
+            digest = hashlib.sha1(json.dumps([tables, source], sort_keys=True, default=str).encode()).hexdigest()
+            static = (digest, sorted(set(re.findall(r"settings\.([A-Z][A-Z0-9_]*)", source))))
+            with self._lock:
+                static = self._static.setdefault(classifier, static)
+        digest, names = static
+        config = (classifier, digest, *[getattr(settings, name) for name in names])
+        ruleset = self._rulesets.get(config)
+        if ruleset is None:
+            ruleset = hashlib.sha1(json.dumps(config[1:], default=str).encode()).hexdigest()[:16]
+            with self._lock:
+                self._rulesets[config] = ruleset
+        return ruleset
+
+    def _count(self, classifier: type, event: str):
+        """Call with the lock held. Redis hits / misses are also buffered for the shared counters."""
+        counts = self.local_stats.setdefault(classifier.__name__, {"lru_hits": 0, "redis_hits": 0, "misses": 0})
+        counts[event] += 1
+        if event != "lru_hits":
+            field = f"{classifier.__name__}:{event.removeprefix('redis_')}"
+            self._unflushed[field] = self._unflushed.get(field, 0) + 1
+
+    def _take_unflushed(self) -> Dict[str, int]:
+        with self._lock:
+            unflushed, self._unflushed = self._unflushed, {}
+        return unflushed
+
+    def _restore_unflushed(self, unflushed: Dict[str, int]):
+        with self._lock:
+            for field, n in unflushed.items():
+                self._unflushed[field] = self._unflushed.get(field, 0) + n
+
+    def _remember(self, key: Tuple[str, str], decision: Decision):
+        """Call with the lock held."""
+        self._lru[key] = decision
+        self._lru.move_to_end(key)
+        while len(self._lru) > settings.DECISION_CACHE_SIZE:
+            self._lru.popitem(last=False)
+
+    def classify(self, classifier: type, user_data: Dict[str, Any]) -> Decision:
+        """classifier.classify(user_data), memoized."""
+        if not settings.DECISION_CACHE_ENABLED:
+            return classifier.classify(user_data)
+
+        key = (self.ruleset_hash(classifier), classifier.fingerprint(user_data))
+        with self._lock:
+            decision = self._lru.get(key)
+            if decision is not None:
+                self._lru.move_to_end(key)
+                self._count(classifier, "lru_hits")
+        if decision is not None:
+            return decision[0], decision[1], list(decision[2])
+
+        redis_key = self.KEY.format(ruleset=key[0], fingerprint=key[1])
+        use_redis = self._redis_available()
+        blob = None
+        if use_redis:
+            try:
+                blob = self.redis.get(redis_key)
+            except redis.RedisError as e:
+                self._redis_failed(e)
+                use_redis = False
+        if blob is not None:
+            decision = tuple(json.loads(blob))
+            with self._lock:
+                self._remember(key, decision)
+                self._count(classifier, "redis_hits")
+            return decision[0], decision[1], list(decision[2])
+
+        decision = classifier.classify(user_data)
+        with self._lock:
+            self._remember(key, (decision[0], decision[1], list(decision[2])))
+            self._count(classifier, "misses")
+        if use_redis:
+            unflushed = self._take_unflushed()
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.set(redis_key, json.dumps(decision, separators=(",", ":")), ex=settings.DECISION_CACHE_TTL)
+                for field, n in unflushed.items():
+                    pipe.hincrby(self.STATS_KEY, field, n)
+                pipe.execute()
+            except redis.RedisError as e:
+                self._restore_unflushed(unflushed)
+                self._redis_failed(e)
+        return decision
+
+    def clear(self):
+        """Drops this process's LRU (Redis entries expire on their own)."""
+        with self._lock:
+            self._lru.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        {"local": this process, per classifier (lru_hits, redis_hits, misses,
+        hit_rate) plus lru size; "shared": Redis hits / misses across all
+        workers, per classifier, with hit_rate}.
+        """
+        with self._lock:
+            local: Dict[str, Any] = {}
+            for name, counts in self.local_stats.items():
+                lookups = sum(counts.values())
+                hits = counts["lru_hits"] + counts["redis_hits"]
+                local[name] = dict(counts, hit_rate=round(hits / lookups, 3) if lookups else 0.0)
+            local["lru_size"] = len(self._lru)
+
+        raw = {}
+        if self._redis_available():
+            unflushed = self._take_unflushed()
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                for field, n in unflushed.items():
+                    pipe.hincrby(self.STATS_KEY, field, n)
+                pipe.hgetall(self.STATS_KEY)
+                raw = pipe.execute()[-1]
+            except redis.RedisError as e:
+                self._restore_unflushed(unflushed)
+                self._redis_failed(e)
+        shared: Dict[str, Dict[str, Any]] = {}
+        for field, value in raw.items():
+            name, event = field.decode().rsplit(":", 1)
+            shared.setdefault(name, {})[event] = int(value)
+        for counts in shared.values():
+            lookups = counts.get("hits", 0) + counts.get("misses", 0)
+            counts["hit_rate"] = round(counts.get("hits", 0) / lookups, 3) if lookups else 0.0
+        return {"local": local, "shared": shared}
+
+
+# Singleton instance (one LRU per worker process, shared by its threads)
+decision_cache = DecisionCache()
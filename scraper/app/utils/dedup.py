@@ -0,0 +1,325 @@
+import hashlib
+import math
+import time
+from typing import Dict, Iterable, List, Optional
+
+import redis
+from loguru import logger
+from app.config import settings
+
+
+class DedupStore:
+    """
+    "Have we seen this id before?" store used by discovery (seen_owners,
+    seen_usernames, tiktok_seen_users). Backends:
+
+        set     exact Redis sets (the original behaviour; memory grows with every id)
+        bloom   Bloom filter in a Redis bitmap, sized for DEDUP_CAPACITY items at
+                DEDUP_ERROR_RATE; no delete
+        cuckoo  RedisBloom cuckoo filter (needs the RedisBloom module); supports delete
+
+    With DEDUP_WINDOW > 0 ids live in rotating generations: writes go to the
+    current window's key, reads check the last DEDUP_GENERATIONS windows and old
+    generations expire on their own. An id is therefore forgotten between
+    (GENERATIONS - 1) and GENERATIONS windows after it was first added. With
+    DEDUP_WINDOW = 0 there is a single key; for the set backend it is named
+    like the store, so it keeps using the existing Redis sets.
+
+    All operations are batched: one round trip per call, not per id.
+    """
+
+    backend = "set"
+
+    def __init__(
+        self,
+        name: str,
+        redis_client: Optional[redis.Redis] = None,
+        window: Optional[int] = None,
+        generations: Optional[int] = None,
+    ):
+        self.name = name
+        # Probabilistic backends get their own key so they never collide with a legacy set
+        self.key = name if self.backend == "set" else f"{name}:{self.backend}"
+        self._redis = redis_client
+        self.window = settings.DEDUP_WINDOW if window is None else window
+        self.generations = max(1, generations or settings.DEDUP_GENERATIONS) if self.window else 1
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        return self._redis
+
+    # --- Generations ---
+
+    def _keys(self) -> List[str]:
+        """Current generation first, then older ones still inside the window."""
+        if not self.window:
+            return [self.key]
+        current = int(time.time() // self.window)
+        return [f"{self.key}:{current - i}" for i in range(self.generations)]
+
+    def _ttl(self) -> int:
+        return self.window * self.generations if self.window else 0
+
+    # --- Public API ---
+
+    def check_and_add(self, items: Iterable[str]) -> List[bool]:
+        """Adds items to the current generation; True for each item not seen before."""
+        items = list(items)
+        if not items:
+            return []
+        keys = self._keys()
+        if len(keys) == 1:
+            return self._add(keys[0], items)
+
+        seen_before = self._contains(keys[1:], items)
+        new = list(dict.fromkeys(item for item, seen in zip(items, seen_before) if not seen))
+        added = dict(zip(new, self._add(keys[0], new)))
+        # An item repeated inside one batch is only new the first time
+        return [not seen and added.pop(item, False) for item, seen in zip(items, seen_before)]
+
+    def contains(self, items: Iterable[str]) -> List[bool]:
+        items = list(items)
+        return self._contains(self._keys(), items) if items else []
+
+    def add(self, items: Iterable[str]):
+        self.check_and_add(items)
+
+    def remove(self, items: Iterable[str]):
+        """Best effort: forget items so they are reported new again (not supported by bloom)."""
+        items = list(items)
+        if items:
+            self._remove(self._keys(), items)
+
+    def stats(self) -> Dict:
+        """Memory footprint and false-positive rate (estimate for probabilistic backends)."""
+        generations = [self._key_stats(key) for key in self._keys()]
+        fpr_miss = 1.0
+        for gen in generations:
+            fpr_miss *= 1 - gen["false_positive_rate"]
+        return {
+            "name": self.name,
+            "backend": self.backend,
+            "window": self.window,
+            "items": sum(g["items"] for g in generations),
+            "memory_bytes": sum(g["memory_bytes"] for g in generations),
+            "false_positive_rate": 1 - fpr_miss,
+            "generations": generations,
+        }
+
+    def _memory_usage(self, key: str) -> int:
+        try:
+            return int(self.redis.memory_usage(key, samples=0) or 0)
+        except redis.ResponseError:
+            return 0
+
+    # --- Backend hooks (set backend) ---
+
+    def _add(self, key: str, items: List[str]) -> List[bool]:
+        pipe = self.redis.pipeline(transaction=False)
+        for item in items:
+            pipe.sadd(key, item)
+        if self._ttl():
+            pipe.expire(key, self._ttl())
+        return [bool(added) for added in pipe.execute()[:len(items)]]
+
+    def _contains(self, keys: List[str], items: List[str]) -> List[bool]:
+        pipe = self.redis.pipeline(transaction=False)
+        for key in keys:
+            for item in items:
+                pipe.sismember(key, item)
+        flags = pipe.execute()
+        n = len(items)
+        return [any(flags[g * n + i] for g in range(len(keys))) for i in range(n)]
+
+    def _remove(self, keys: List[str], items: List[str]):
+        pipe = self.redis.pipeline(transaction=False)
+        for key in keys:
+            pipe.srem(key, *items)
+        pipe.execute()
+
+    def _key_stats(self, key: str) -> Dict:
+        return {
+            "key": key,
+            "items": self.redis.scard(key),
+            "memory_bytes": self._memory_usage(key),
+            "false_positive_rate": 0.0,
+        }
+
+
+class BloomDedupStore(DedupStore):
+    """
+    Bloom filter over a plain Redis bitmap (works on any Redis, no modules).
+    Check-and-add runs as one Lua script per batch, so it is atomic across workers.
+    """
+
+    backend = "bloom"
+
+    # KEYS[1] bitmap, KEYS[2] meta hash; ARGV: add flag, k, ttl, then k offsets per item
+    SCRIPT = """
+    local add, k, ttl = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+    local result, added = {}, 0
+    for i = 0, (#ARGV - 3) / k - 1 do
+        local new = 0
+        for j = 1, k do
+            local offset = ARGV[3 + i * k + j]
+            local bit
+            if add == 1 then bit = redis.call('SETBIT', KEYS[1], offset, 1)
+            else bit = redis.call('GETBIT', KEYS[1], offset) end
+            if bit == 0 then new = 1 end
+        end
+        result[i + 1] = new
+        added = added + new
+    end
+    if add == 1 then
+        if added > 0 then redis.call('HINCRBY', KEYS[2], 'added', added) end
+        if ttl > 0 then
+            redis.call('EXPIRE', KEYS[1], ttl)
+            redis.call('EXPIRE', KEYS[2], ttl)
+        end
+    end
+    return result
+    """
+
+    def __init__(self, name: str, redis_client: Optional[redis.Redis] = None,
+                 window: Optional[int] = None, generations: Optional[int] = None,
+                 capacity: Optional[int] = None, error_rate: Optional[float] = None):
+        super().__init__(name, redis_client, window, generations)
+        self.capacity = capacity or settings.DEDUP_CAPACITY
+        self.error_rate = error_rate or settings.DEDUP_ERROR_RATE
+        # Optimal size: m = -n ln p / (ln 2)^2 bits, k = m/n ln 2 hash functions
+        self.bits = int(math.ceil(-self.capacity * math.log(self.error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / self.capacity * math.log(2)))
+        self._script = None
+
+    def _offsets(self, items: List[str]) -> List[int]:
+        """k bit positions per item via double hashing of one 128-bit digest."""
+        offsets = []
+        for item in items:
+            digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+            h1 = int.from_bytes(digest[:8], "little")
+            h2 = int.from_bytes(digest[8:], "little") | 1
+            offsets.extend((h1 + i * h2) % self.bits for i in range(self.hashes))
+        return offsets
+
+    def _run(self, key: str, items: List[str], add: bool) -> List[bool]:
+        if self._script is None:
+            self._script = self.redis.register_script(self.SCRIPT)
+        flags = self._script(
+            keys=[key, f"{key}:meta"],
+            args=[int(add), self.hashes, self._ttl(), *self._offsets(items)],
+        )
+        return [bool(flag) for flag in flags]
+
+    def _add(self, key: str, items: List[str]) -> List[bool]:
+        # Dedupe inside the batch: a repeated item would find its own bits set
+        unique = list(dict.fromkeys(items))
+        added = dict(zip(unique, self._run(key, unique, add=True)))
+        return [added.pop(item, False) for item in items]
+
+    def _contains(self, keys: List[str], items: List[str]) -> List[bool]:
+        found = [False] * len(items)
+        for key in keys:
+            # "new" from the script means at least one bit was unset -> not present
+            for i, new in enumerate(self._run(key, items, add=False)):
+                found[i] = found[i] or not new
+        return found
+
+    def _remove(self, keys: List[str], items: List[str]):
+        logger.debug(f"Dedup '{self.name}': bloom backend cannot forget {len(items)} items")
+
+    def _key_stats(self, key: str) -> Dict:
+        items = int(self.redis.hget(f"{key}:meta", "added") or 0)
+        fill = self.redis.bitcount(key) / self.bits
+        return {
+            "key": key,
+            "items": items,
+            "memory_bytes": self._memory_usage(key) or self.redis.strlen(key),
+            "fill_ratio": round(fill, 4),
+            # Probability that all k bits of an unseen item are already set
+            "false_positive_rate": fill ** self.hashes,
+        }
+
+
+class CuckooDedupStore(DedupStore):
+    """
+    RedisBloom cuckoo filter (CF.* commands). Like bloom but supports remove(),
+    so hashtag discovery can un-claim owners whose lookup failed.
+    """
+
+    backend = "cuckoo"
+    BUCKET_SIZE = 2
+    FINGERPRINT_BITS = 8 # RedisBloom's fixed fingerprint size
+
+    def __init__(self, name: str, redis_client: Optional[redis.Redis] = None,
+                 window: Optional[int] = None, generations: Optional[int] = None,
+                 capacity: Optional[int] = None):
+        super().__init__(name, redis_client, window, generations)
+        self.capacity = capacity or settings.DEDUP_CAPACITY
+        self._reserved = set()
+
+    def _reserve(self, key: str):
+        if key in self._reserved:
+            return
+        try:
+            self.redis.execute_command("CF.RESERVE", key, self.capacity, "BUCKETSIZE", self.BUCKET_SIZE)
+        except redis.ResponseError as e:
+            if "exists" not in str(e).lower():
+                raise
+        if self._ttl():
+            self.redis.expire(key, self._ttl())
+        self._reserved.add(key)
+
+    def _add(self, key: str, items: List[str]) -> List[bool]:
+        self._reserve(key)
+        pipe = self.redis.pipeline(transaction=False)
+        for item in items:
+            pipe.execute_command("CF.ADDNX", key, item)
+        return [bool(added) for added in pipe.execute()]
+
+    def _contains(self, keys: List[str], items: List[str]) -> List[bool]:
+        pipe = self.redis.pipeline(transaction=False)
+        for key in keys:
+            for item in items:
+                pipe.execute_command("CF.EXISTS", key, item)
+        flags = pipe.execute()
+        n = len(items)
+        return [any(flags[g * n + i] for g in range(len(keys))) for i in range(n)]
+
+    def _remove(self, keys: List[str], items: List[str]):
+        pipe = self.redis.pipeline(transaction=False)
+        for key in keys:
+            for item in items:
+                pipe.execute_command("CF.DEL", key, item)
+        pipe.execute(raise_on_error=False)
+
+    def _key_stats(self, key: str) -> Dict:
+        try:
+            raw = self.redis.execute_command("CF.INFO", key)
+        except redis.ResponseError:
+            return {"key": key, "items": 0, "memory_bytes": 0, "false_positive_rate": 0.0}
+        info = dict(zip(raw[::2], raw[1::2]))
+        items = int(info.get("Number of items inserted", 0)) - int(info.get("Number of items deleted", 0))
+        return {
+            "key": key,
+            "items": items,
+            "memory_bytes": int(info.get("Size", 0)),
+            # Upper bound: 2 candidate buckets x BUCKET_SIZE fingerprints / 2^f
+            "false_positive_rate": 2 * self.BUCKET_SIZE / 2 ** self.FINGERPRINT_BITS if items else 0.0,
+        }
+
+
+BACKENDS = {
+    "set": DedupStore,
+    "bloom": BloomDedupStore,
+    "cuckoo": CuckooDedupStore,
+}
+
+
+def dedup_store(name: str, redis_client: Optional[redis.Redis] = None, backend: Optional[str] = None) -> DedupStore:
+    """Dedup store for `name` using the configured DEDUP_BACKEND."""
+    backend = backend or settings.DEDUP_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown DEDUP_BACKEND '{backend}'. Use one of: {', '.join(BACKENDS)}")
+    return BACKENDS[backend](name, redis_client)
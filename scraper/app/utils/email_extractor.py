@@ -1,7 +1,13 @@
-import re
 import httpx
 from urllib.parse import urlparse
 import logging
+from typing import List, Optional
+from app.config import settings
+from app.utils import emails
+from app.utils.emails import EmailScanner
+from app.utils.bio_links import ESCALATE_STATUSES
+from app.utils.http_pool import http_pool
+from app.utils.enrichment_cache import enrichment_cache
 
 logger = logging.getLogger(__name__)
 
@@ -13,7 +19,7 @@ class EmailExtractor:
     3. IG/TikTok Email button (API fields)
     """
     
-    EMAIL_REGEX = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
+    EMAIL_REGEX = emails.EMAIL_RE.pattern
     
     # Common link aggregators to parse
     LINK_AGGREGATORS = [
@@ -22,20 +28,19 @@ class EmailExtractor:
         "stan.store", "koji.to", "snipfeed.co",
     ]
     
+    # Pages worth scanning; images, PDFs, videos etc. are skipped unread
+    SCAN_CONTENT_TYPES = ("html", "text/plain")
+    
+    # Link-in-bio fetches (per process): pages scanned, bytes read, why reading stopped early
+    fetch_stats = {"pages": 0, "bytes": 0, "early_stops": 0, "capped": 0, "skipped_type": 0}
+    
     @classmethod
     def extract_from_bio(cls, bio_text: str) -> str:
-        """Method 1: Direct extraction from bio"""
+        """Method 1: Direct extraction from bio (plain and obfuscated addresses)"""
         if not bio_text:
             return None
-        
-        matches = re.findall(cls.EMAIL_REGEX, bio_text)
-        if matches:
-            # Return first valid-looking email
-            for email in matches:
-                if cls._is_valid_email(email):
-                    return email.lower()
-        
-        return None
+        # First valid-looking email
+        return emails.first(bio_text, allow_role=False)
     
     @classmethod
     async def extract_from_external_url(cls, external_url: str) -> str:
@@ -43,26 +48,53 @@ class EmailExtractor:
         if not external_url:
             return None
         
+        # Link aggregators and standard sites alike: Cache -> Fetch -> Scan for Email
+        found = await enrichment_cache.url_emails(external_url, lambda: cls._scan_page(external_url), source="scan")
+        for email in found:
+            if cls._is_valid_email(email):
+                return email
+        return None
+    
+    @classmethod
+    async def _scan_page(cls, url: str) -> Optional[List[str]]:
+        """
+        Streams the page through EmailScanner and stops as soon as a valid
+        email shows up, after EXTRACT_MAX_BYTES, or right away for non-HTML
+        content. Returns the addresses seen (role inboxes included, they are
+        filtered on read), or None for transient failures that shouldn't be cached.
+        """
+        # Use a generic user agent for this fetch
+        headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+        }
         try:
-            domain = urlparse(external_url).netloc.lower()
-            
-            # Check if it's a link aggregator or standard site
-            # We treat them similarly: Fetch -> Scan for Email
-            
-            # Use a generic user agent for this fetch
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            }
-            
-            async with httpx.AsyncClient(headers=headers, follow_redirects=True, timeout=10.0) as client:
-                response = await client.get(external_url)
-                if response.status_code == 200:
-                    return cls.extract_from_bio(response.text)
-                
+            client = http_pool.get()
+            async with client.stream("GET", url, headers=headers, follow_redirects=True, timeout=10.0) as response:
+                if response.status_code in ESCALATE_STATUSES or response.status_code >= 500:
+                    return None # Transient (bot wall, rate limit, server error): don't cache
+                if response.status_code != 200:
+                    return []
+                content_type = response.headers.get("content-type", "text/html").lower()
+                if not any(t in content_type for t in cls.SCAN_CONTENT_TYPES):
+                    cls.fetch_stats["skipped_type"] += 1
+                    return []
+
+                scanner = EmailScanner()
+                async for chunk in response.aiter_text():
+                    if any(cls._is_valid_email(e) for e in scanner.feed(chunk)):
+                        cls.fetch_stats["early_stops"] += 1
+                        break
+                    if response.num_bytes_downloaded >= settings.EXTRACT_MAX_BYTES:
+                        cls.fetch_stats["capped"] += 1
+                        logger.debug(f"Stopped reading {url} at {response.num_bytes_downloaded} bytes")
+                        break
+                cls.fetch_stats["pages"] += 1
+                cls.fetch_stats["bytes"] += response.num_bytes_downloaded
+                # Leaving the block closes the stream; the rest of the body is never read
+                return scanner.close()
         except Exception as e:
-            logger.warning(f"Error extracting email from URL {external_url}: {e}")
-        
-        return None
+            logger.warning(f"Error extracting email from URL {url}: {e}")
+            return None
     
     @classmethod
     def extract_from_api(cls, profile_data: dict) -> str:
@@ -119,19 +151,5 @@ class EmailExtractor:
     
     @staticmethod
     def _is_valid_email(email: str) -> bool:
-        """Basic email validation blacklist"""
-        if not email:
-            return False
-        
-        # Exclude common non-personal emails/junk
-        excluded_patterns = [
-            "noreply", "no-reply", "support@", "info@", "hello@",
-            "contact@", "admin@", "sales@", "help@", "wix.com",
-            "sentry.io", "example.com", "domain.com", ".png", ".jpg"
-        ]
-        
-        email_lower = email.lower()
-        if any(pattern in email_lower for pattern in excluded_patterns):
-            return False
-            
-        return True
+        """Basic email validation blacklist (junk addresses and shared inboxes)"""
+        return emails.is_valid(email, allow_role=False)
@@ -0,0 +1,185 @@
+"""
+Shared email extraction for bios, bio-link pages and scraped HTML.
+
+Instead of sliding a regex over every character of the input, the scan jumps
+between "@" signs (and obfuscated "at" tokens) with str.find and only matches
+the local part / domain around them, so megabytes of markup with a handful
+of addresses cost little more than a substring search. Obfuscations handled:
+"[at]" "(at)" "{at}" " at " and "[dot]" "(dot)" "{dot}" " dot " (a bare " at "
+only before a well-known mail host). Candidates are validated as they are
+produced (junk like sentry DSNs and logo@2x.png is dropped by one compiled
+pattern).
+
+    emails.first(bio)                      # first usable address or None
+    emails.extract(html, allow_role=False) # all addresses, deduped, in order
+
+    scanner = EmailScanner()
+    async for chunk in response.aiter_text():
+        scanner.feed(chunk)
+    found = scanner.close()
+"""
+import re
+from typing import Iterator, List, Optional, Set, Tuple
+from urllib.parse import unquote
+
+EMAIL_RE = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+
+# Local part ending right before an "@" / "at" token (searched backwards from it)
+LOCAL_RE = re.compile(r"[a-zA-Z0-9._%+-]{1,64}$")
+_DOT = r"\s*[\[({]\s*dot\s*[\])}]\s*|\s+dot\s+|\."
+DOMAIN_RE = re.compile(rf"[a-zA-Z0-9-]+(?:(?:{_DOT})[a-zA-Z0-9-]+)*(?:{_DOT})[a-zA-Z]{{2,24}}", re.IGNORECASE)
+DOT_TOKEN_RE = re.compile(_DOT, re.IGNORECASE)
+AT_TOKEN_RE = re.compile(r"\s*[\[({]\s*at\s*[\])}]\s*|\s+at\s+", re.IGNORECASE)
+
+# Strings that match the email pattern but are never contact addresses. Anchored to
+# domain labels / whole local-part tokens, so sentrybakery@gmail.com is kept
+JUNK_RE = re.compile(
+    r"@(?:[\w-]+\.)*(?:sentry|wixpress|wix|no-?reply)\."
+    r"|@(?:example|domain)\.com$"
+    r"|(?:^|[._+-])(?:no-?reply|do-?not-?reply)(?=[._+-]|@)"
+    r"|@[23]x\."
+    r"|\.(?:png|jpe?g|gif|webp|svg|ico|css|js)$"
+)
+# Shared inboxes; EmailExtractor skips them, the enrichment tiers keep them
+ROLE_RE = re.compile(r"(?:support|info|hello|contact|admin|sales|help)@")
+
+# A bare " at " is only trusted before a well-known mail host (whatever the dot
+# form), otherwise "eat at joes.com" / "meet at home dot com" would become addresses
+MAIL_PROVIDERS = {"gmail", "googlemail", "yahoo", "hotmail", "outlook", "live", "msn",
+                  "icloud", "me", "aol", "proton", "protonmail", "gmx", "zoho"}
+
+# Longest candidate we can produce (local + token + domain), used for stream overlap
+MAX_CANDIDATE = 64 + 16 + 255
+
+
+def clean(candidate: str, allow_role: bool = True) -> Optional[str]:
+    """Normalized address, or None if it isn't a usable contact email."""
+    email = candidate.strip().strip(".").lower()
+    if "%" in email:
+        email = unquote(email)
+    if not EMAIL_RE.fullmatch(email) or JUNK_RE.search(email):
+        return None
+    if not allow_role and ROLE_RE.search(email):
+        return None
+    return email
+
+
+def is_valid(email: str, allow_role: bool = True) -> bool:
+    return bool(email) and clean(email, allow_role) is not None
+
+
+def _domain(text: str, pos: int, bare_at: bool) -> Optional[Tuple[str, int]]:
+    match = DOMAIN_RE.match(text, pos)
+    if not match:
+        return None
+    raw, end = match.group(0), match.end()
+    plain_dot = False
+    for token in DOT_TOKEN_RE.finditer(raw):
+        if token.group(0) == ".":
+            plain_dot = True
+        elif plain_dot:
+            # "jane@gmail.com dot me": the domain was complete at the plain-dot TLD
+            raw, end = raw[:token.start()], pos + token.start()
+            break
+    domain = DOT_TOKEN_RE.sub(".", raw)
+    if bare_at and domain.split(".", 1)[0].lower() not in MAIL_PROVIDERS:
+        return None
+    return domain, end
+
+
+def _candidates(text: str) -> List[Tuple[int, int, str]]:
+    """(start, end, raw address) for every plausible address, in text order."""
+    found = []
+    at = text.find("@")
+    while at != -1:
+        local = LOCAL_RE.search(text, max(0, at - 64), at)
+        domain = _domain(text, at + 1, False) if local else None
+        if domain:
+            found.append((local.start(), domain[1], f"{local.group(0)}@{domain[0]}"))
+        at = text.find("@", at + 1)
+
+    obfuscated = False
+    for token in AT_TOKEN_RE.finditer(text):
+        local = LOCAL_RE.search(text, max(0, token.start() - 64), token.start())
+        if not local:
+            continue
+        domain = _domain(text, token.end(), not token.group(0).strip().startswith(("[", "(", "{")))
+        if domain:
+            found.append((local.start(), domain[1], f"{local.group(0)}@{domain[0]}"))
+            obfuscated = True
+    if obfuscated:
+        found.sort()
+    return found
+
+
+def _might_contain(text: str) -> bool:
+    """Cheap prefilter: no "@" and no "at" at all means no address."""
+    return "@" in text or "at" in text or "AT" in text or "At" in text
+
+
+def iter_emails(text: str, allow_role: bool = True) -> Iterator[str]:
+    """Valid addresses in text order (may repeat)."""
+    if not text or not _might_contain(text):
+        return
+    for _, _, raw in _candidates(text):
+        email = clean(raw, allow_role)
+        if email:
+            yield email
+
+
+def first(text: str, allow_role: bool = True) -> Optional[str]:
+    return next(iter_emails(text, allow_role), None)
+
+
+def extract(text: str, allow_role: bool = True) -> List[str]:
+    return list(dict.fromkeys(iter_emails(text, allow_role)))
+
+
+class EmailScanner:
+    """
+    Incremental extraction over response chunks: only the current chunk plus a
+    small overlap is held, so an address split across chunks is still found
+    exactly once.
+    """
+
+    # Text kept from the previous chunk / trailing region whose matches may still grow
+    OVERLAP = 2 * MAX_CANDIDATE
+    MARGIN = MAX_CANDIDATE
+
+    def __init__(self, allow_role: bool = True):
+        self.allow_role = allow_role
+        self.emails: List[str] = []
+        self._seen: Set[str] = set()
+        self._tail = ""
+        self._offset = 0 # Absolute position of _tail[0]
+        self._done = 0 # Candidates ending before this absolute position are settled
+
+    def _scan(self, buf: str, cut: int) -> List[str]:
+        new = []
+        if _might_contain(buf):
+            for _, end, raw in _candidates(buf):
+                end += self._offset
+                if end < self._done or end >= cut:
+                    continue
+                email = clean(raw, self.allow_role)
+                if email and email not in self._seen:
+                    self._seen.add(email)
+                    self.emails.append(email)
+                    new.append(email)
+        self._done = max(self._done, cut)
+        return new
+
+    def feed(self, chunk: str) -> List[str]:
+        """Adds a chunk; returns the addresses first seen in it."""
+        buf = self._tail + chunk
+        new = self._scan(buf, self._offset + len(buf) - self.MARGIN)
+        keep = min(len(buf), self.OVERLAP)
+        self._offset += len(buf) - keep
+        self._tail = buf[len(buf) - keep:]
+        return new
+
+    def close(self) -> List[str]:
+        """Flushes the trailing overlap; returns every address found."""
+        self._scan(self._tail, self._offset + len(self._tail) + 1)
+        self._tail = ""
+        return self.emails
@@ -0,0 +1,184 @@
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+import redis
+from loguru import logger
+from app.config import settings
+
+# Query params that never change the page (share / click tracking); utm_* too
+TRACKING_PARAMS = {"igshid", "igsh", "fbclid", "gclid", "ref", "si"}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of an external URL so every lead sharing a page hits the same
+    entry: https, lowercase host without www., no fragment, no trailing slash,
+    tracking params dropped and the rest sorted.
+    """
+    url = url.strip()
+    if "://" not in url:
+        url = f"https://{url}"
+    parts = urlparse(url)
+    host = parts.netloc.lower().removeprefix("www.")
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith("utm_")
+    )
+    return urlunparse(("https", host, parts.path.rstrip("/"), "", urlencode(query), ""))
+
+
+class EnrichmentCache:
+    """
+    Cache for enrichment results so re-runs don't re-visit pages.
+
+    - URL cache (Redis): (source, normalized external URL) -> emails found on
+      the page. Shared by every lead pointing at the same agency / restaurant
+      group / linktree page, across runs and workers. `source` names the
+      producer ("tier2" = EnrichmentEngine's static + browser waterfall,
+      "scan" = EmailExtractor's static stream): they visit pages differently,
+      so one's negative is not the other's, and each reads only its own entries. Pages that yielded nothing are
+      cached as negative entries whose TTL backs off: ENRICH_CACHE_NEGATIVE_TTL
+      after the first empty visit, doubling on each further empty visit up to
+      ENRICH_CACHE_NEGATIVE_MAX_TTL. Loaders return None for failures that
+      should not be cached at all.
+    - Bio cache (in-process LRU): sha1(bio) -> Tier 1 result. Tier 1 is a regex,
+      so a Redis round trip would cost more than recomputing it; the LRU only
+      saves re-scanning identical bios within one worker.
+
+    Lookups bump counters in the STATS_KEY hash (Redis down = pass-through).
+
+        email = await enrichment_cache.url_emails(url, load, source="tier2")
+    """
+
+    URL_KEY = "enrich_cache:url:{source}:{digest}"
+    STATS_KEY = "enrich_cache:stats"
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
+        self._redis = redis_client
+        self._bios: "OrderedDict[str, Optional[str]]" = OrderedDict()
+        self.bio_stats = {"hits": 0, "misses": 0}
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.from_url(settings.REDIS_URL, socket_timeout=1.0)
+        return self._redis
+
+    @staticmethod
+    def _digest(value: str) -> str:
+        return hashlib.sha1(value.encode("utf-8", "ignore")).hexdigest()
+
+    def _key(self, source: str, url: str) -> str:
+        return self.URL_KEY.format(source=source, digest=self._digest(normalize_url(url)))
+
+    def _count(self, event: str):
+        try:
+            self.redis.hincrby(self.STATS_KEY, f"url:{event}", 1)
+        except redis.RedisError:
+            pass
+
+    # --- URL -> emails ---
+
+    def get_url(self, source: str, url: str) -> Tuple[bool, List[str]]:
+        """Returns (found, emails); emails is [] for negative entries."""
+        try:
+            blob = self.redis.get(self._key(source, url))
+        except redis.RedisError as e:
+            logger.debug(f"Enrichment cache read failed: {e}")
+            return False, []
+        if blob is None:
+            return False, []
+        return True, json.loads(blob)["emails"]
+
+    def set_url(self, source: str, url: str, emails: List[str]):
+        """Stores a result; an empty list is a negative entry with backoff."""
+        key = self._key(source, url)
+        try:
+            if emails:
+                entry = {"emails": emails}
+                ttl = settings.ENRICH_CACHE_TTL
+            else:
+                previous = self.redis.get(key)
+                misses = json.loads(previous).get("misses", 0) + 1 if previous else 1
+                entry = {"emails": [], "misses": misses}
+                ttl = min(settings.ENRICH_CACHE_NEGATIVE_TTL * 2 ** (misses - 1), settings.ENRICH_CACHE_NEGATIVE_MAX_TTL)
+            self.redis.set(key, json.dumps(entry, separators=(",", ":")), ex=ttl)
+        except redis.RedisError as e:
+            logger.debug(f"Enrichment cache write failed: {e}")
+
+    def invalidate_url(self, source: str, url: str):
+        try:
+            self.redis.delete(self._key(source, url))
+        except redis.RedisError:
+            pass
+
+    async def url_emails(
+        self,
+        url: str,
+        loader: Callable[[], Awaitable[Optional[List[str]]]],
+        source: str,
+        use_cache: bool = True,
+    ) -> List[str]:
+        """
+        Cached emails for (source, url), or awaits loader() and caches what it returns.
+
+        loader() returns the emails found ([] = page has none, negative-cached)
+        or None (transient failure, not cached). Returns [] for both misses.
+        Entries are returned as stored: callers validate before using them.
+        """
+        if not settings.ENRICH_CACHE_ENABLED:
+            return await loader() or []
+
+        if use_cache:
+            found, emails = self.get_url(source, url)
+            if found:
+                self._count("hits" if emails else "negative_hits")
+                return emails
+
+        self._count("misses" if use_cache else "bypass")
+        emails = await loader()
+        if emails is None:
+            return []
+        self.set_url(source, url, emails)
+        self._count("stores")
+        return emails
+
+    # --- bio hash -> Tier 1 ---
+
+    def bio_result(self, bio: str, compute: Callable[[str], Optional[str]]) -> Optional[str]:
+        """compute(bio) memoized on sha1(bio), LRU-bounded by ENRICH_BIO_CACHE_SIZE."""
+        if not bio or not settings.ENRICH_CACHE_ENABLED:
+            return compute(bio)
+        digest = self._digest(bio)
+        if digest in self._bios:
+            self._bios.move_to_end(digest)
+            self.bio_stats["hits"] += 1
+            return self._bios[digest]
+        self.bio_stats["misses"] += 1
+        result = self._bios[digest] = compute(bio)
+        if len(self._bios) > settings.ENRICH_BIO_CACHE_SIZE:
+            self._bios.popitem(last=False)
+        return result
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """URL counters (all workers, from Redis) and this process's bio LRU counters, with hit_rate."""
+        try:
+            raw = self.redis.hgetall(self.STATS_KEY)
+        except redis.RedisError:
+            raw = {}
+        url = {field.decode().split(":", 1)[1]: int(value) for field, value in raw.items()}
+        hits = url.get("hits", 0) + url.get("negative_hits", 0)
+        lookups = hits + url.get("misses", 0)
+        url["hit_rate"] = round(hits / lookups, 3) if lookups else 0.0
+
+        bio = dict(self.bio_stats, size=len(self._bios))
+        lookups = bio["hits"] + bio["misses"]
+        bio["hit_rate"] = round(bio["hits"] / lookups, 3) if lookups else 0.0
+        return {"url": url, "bio": bio}
+
+
+# Singleton instance (one per worker process)
+enrichment_cache = EnrichmentCache()
@@ -0,0 +1,133 @@
+import asyncio
+import os
+from typing import Dict, Optional, Tuple
+
+import httpx
+from loguru import logger
+from app.config import settings
+
+try:
+    import h2  # noqa: F401 - httpx only needs it importable for http2=True
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Pool key for clients that talk to arbitrary sites (bio links, external pages)
+ANY_HOST = "*"
+
+
+class HTTPClientPool:
+    """
+    Process-wide pool of keep-alive httpx.AsyncClient instances.
+
+    One client per (event loop, host): httpx connections are bound to the loop
+    that opened them, and per-host clients let each RapidAPI/Firecrawl host keep
+    its own auth headers and connection limits. Open-web fetches share the
+    ANY_HOST client, which pools connections per origin internally.
+
+    The pool is owned by the worker process: a forked child starts empty, and
+    clients of closed loops are dropped on the next lookup.
+    """
+
+    def __init__(self):
+        self._pid = os.getpid()
+        self._clients: Dict[Tuple[int, str], httpx.AsyncClient] = {}
+        self._loops: Dict[int, asyncio.AbstractEventLoop] = {}
+        self._warned_http2 = False
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        )
+
+    def _http2(self) -> bool:
+        if not settings.HTTP2_ENABLED:
+            return False
+        if not HTTP2_AVAILABLE:
+            if not self._warned_http2:
+                logger.warning("HTTP2_ENABLED is set but 'h2' is not installed. Falling back to HTTP/1.1.")
+                self._warned_http2 = True
+            return False
+        return True
+
+    def _prune(self):
+        """Forget clients inherited from a parent process or left on closed loops."""
+        if os.getpid() != self._pid:
+            self._pid = os.getpid()
+            self._clients.clear()
+            self._loops.clear()
+            return
+        for loop_id, loop in list(self._loops.items()):
+            if loop.is_closed():
+                del self._loops[loop_id]
+                for key in [k for k in self._clients if k[0] == loop_id]:
+                    del self._clients[key]
+
+    def get(
+        self,
+        host: str = ANY_HOST,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 30.0,
+    ) -> httpx.AsyncClient:
+        """
+        Returns the shared client for `host` on the running event loop, creating it
+        on first use. `headers`/`timeout` only apply when the client is created;
+        pass per-request values for anything caller-specific.
+        """
+        loop = asyncio.get_running_loop()
+        self._prune()
+
+        key = (id(loop), host)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                headers=headers,
+                timeout=timeout,
+                limits=self._limits(),
+                http2=self._http2(),
+            )
+            self._clients[key] = client
+            self._loops[id(loop)] = loop
+            logger.debug(f"HTTP pool: opened client for {host} (pid {self._pid})")
+        return client
+
+    async def aclose(self, host: Optional[str] = None):
+        """
+        Closes the client for `host` on the running event loop, or every client
+        on it when no host is given. The loop may be shared (AsyncRuntime), so
+        components close their own host and leave the rest to whoever owns the loop.
+        """
+        loop_id = id(asyncio.get_running_loop())
+        if host is not None:
+            client = self._clients.pop((loop_id, host), None)
+            if client is not None:
+                await client.aclose()
+            return
+        for key in [k for k in self._clients if k[0] == loop_id]:
+            await self._clients.pop(key).aclose()
+        self._loops.pop(loop_id, None)
+
+    def shutdown(self):
+        """
+        Synchronous close of all clients, for worker exit hooks.
+        Clients on loops that are closed or still running are just dropped.
+        """
+        if os.getpid() != self._pid:
+            self._clients.clear()
+            self._loops.clear()
+            return
+        for loop_id, loop in list(self._loops.items()):
+            clients = [c for k, c in self._clients.items() if k[0] == loop_id]
+            if clients and not loop.is_closed() and not loop.is_running():
+                try:
+                    loop.run_until_complete(asyncio.gather(*(c.aclose() for c in clients)))
+                except Exception as e:
+                    logger.warning(f"HTTP pool: error closing clients on shutdown: {e}")
+        self._clients.clear()
+        self._loops.clear()
+
+
+# Singleton instance (one per worker process)
+http_pool = HTTPClientPool()
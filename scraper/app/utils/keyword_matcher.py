@@ -0,0 +1,110 @@
+import re
+from typing import Dict, Iterable, List, Set, FrozenSet, Tuple
+
+class KeywordMatcher:
+    """
+    Compiled multi-keyword matcher.
+
+    Takes a table of {signal_name: [keywords]} and builds ONE regex (a trie of
+    all keywords wrapped in a lookahead) so a single scan over the text reports
+    every signal group whose keywords appear anywhere in it.
+
+    Semantics are identical to `any(k.lower() in text for k in keywords)` per
+    group: text must already be lowercased, keywords are lowercased here.
+    """
+
+    def __init__(self, signal_table: Dict[str, Iterable[str]]):
+        keyword_groups: Dict[str, Set[str]] = {}
+        for signal_name, keywords in signal_table.items():
+            for kw in keywords:
+                kw = kw.lower()
+                if kw:
+                    keyword_groups.setdefault(kw, set()).add(signal_name)
+
+        # The regex reports the LONGEST keyword starting at each position.
+        # Every shorter keyword starting there is a prefix of it, so we
+        # precompute the union of groups over all keyword-prefixes, keeping
+        # the running union at each prefix length for match_split().
+        self._groups_for: Dict[str, FrozenSet[str]] = {}
+        self._prefix_groups: Dict[str, List[Tuple[int, FrozenSet[str]]]] = {}
+        for kw in keyword_groups:
+            groups = set()
+            steps = []
+            for i in range(1, len(kw) + 1):
+                if kw[:i] in keyword_groups:
+                    groups |= keyword_groups[kw[:i]]
+                    steps.append((i, frozenset(groups)))
+            self._groups_for[kw] = steps[-1][1]
+            self._prefix_groups[kw] = steps
+
+        self.signal_names = frozenset(signal_table)
+        self._pattern = None
+        if keyword_groups:
+            trie = self._build_trie(keyword_groups)
+            self._pattern = re.compile(f"(?=({self._trie_to_regex(trie)}))")
+
+    @staticmethod
+    def _build_trie(keywords: Iterable[str]) -> dict:
+        trie: dict = {}
+        for kw in keywords:
+            node = trie
+            for ch in kw:
+                node = node.setdefault(ch, {})
+            node[""] = True  # Terminal marker
+        return trie
+
+    @classmethod
+    def _trie_to_regex(cls, node: dict) -> str:
+        terminal = "" in node
+        branches = [
+            re.escape(ch) + cls._trie_to_regex(child)
+            for ch, child in sorted(node.items()) if ch != ""
+        ]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not terminal:
+            return branches[0]
+        body = "(?:" + "|".join(branches) + ")"
+        # Greedy '?' => longest keyword at a position is tried first
+        return body + "?" if terminal else body
+
+    def match(self, text: str) -> Set[str]:
+        """Returns the set of signal names with at least one keyword in `text` (lowercased)."""
+        hits: Set[str] = set()
+        if not text or self._pattern is None:
+            return hits
+
+        seen = set()
+        for m in self._pattern.finditer(text):
+            kw = m.group(1)
+            if kw in seen:
+                continue
+            seen.add(kw)
+            hits |= self._groups_for[kw]
+            if len(hits) == len(self.signal_names):
+                break
+        return hits
+
+    def match_split(self, text: str, split: int) -> Tuple[Set[str], Set[str]]:
+        """
+        Single scan returning (hits within text[:split], hits within text).
+        Lets callers score a prefix (e.g. the bio) and the full combined text
+        without scanning twice.
+        """
+        head: Set[str] = set()
+        hits: Set[str] = set()
+        if not text or self._pattern is None:
+            return head, hits
+
+        for m in self._pattern.finditer(text):
+            kw = m.group(1)
+            hits |= self._groups_for[kw]
+            room = split - m.start()
+            if room >= len(kw):
+                head |= self._groups_for[kw]
+            else:
+                for length, groups in self._prefix_groups[kw]:
+                    if length > room:
+                        break
+                    head |= groups
+        return head, hits
@@ -0,0 +1,17 @@
+import json
+import zlib
+from typing import Optional
+
+# Raw API profiles stored on accounts.raw_payload (zlib-compressed compact JSON, ~5x smaller)
+
+
+def pack(payload: Optional[dict]) -> Optional[bytes]:
+    if payload is None:
+        return None
+    return zlib.compress(json.dumps(payload, separators=(",", ":"), default=str).encode(), 6)
+
+
+def unpack(blob: Optional[bytes]) -> Optional[dict]:
+    if not blob:
+        return None
+    return json.loads(zlib.decompress(blob))
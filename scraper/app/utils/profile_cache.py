@@ -0,0 +1,136 @@
+import json
+import zlib
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import redis
+from loguru import logger
+from app.config import settings
+
+
+class ProfileCache:
+    """
+    Redis read-through cache for raw RapidAPI payloads (profiles, post owners).
+
+    Entries are keyed by platform + kind + identifier and stored as zlib-compressed
+    JSON with a TTL, so callers re-run their normal parsing on a hit. Lookups the
+    API answered with "does not exist" are cached too (NOT_FOUND, shorter TTL);
+    transient failures (timeouts, 429, 5xx) are never cached.
+
+    Every lookup bumps a per platform/kind counter in the STATS_KEY hash
+    (hits / negative_hits / misses / bypass / stores); see stats(). If Redis is down the
+    cache degrades to a pass-through.
+
+        payload = await profile_cache.fetch("instagram", "profile", username, load)
+    """
+
+    KEY = "profile_cache:{platform}:{kind}:{ident}"
+    STATS_KEY = "profile_cache:stats"
+
+    # Loader return value meaning "the API says this account/post doesn't exist"
+    NOT_FOUND = object()
+    _NOT_FOUND_BLOB = b"\x00"
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
+        self._redis = redis_client
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.from_url(settings.REDIS_URL, socket_timeout=1.0)
+        return self._redis
+
+    def _key(self, platform: str, kind: str, ident: str) -> str:
+        return self.KEY.format(platform=platform, kind=kind, ident=ident.strip().lower())
+
+    def _count(self, platform: str, kind: str, event: str):
+        try:
+            self.redis.hincrby(self.STATS_KEY, f"{platform}:{kind}:{event}", 1)
+        except redis.RedisError:
+            pass
+
+    def get(self, platform: str, kind: str, ident: str) -> Tuple[bool, Any]:
+        """Returns (found, payload); payload is NOT_FOUND for negative entries."""
+        try:
+            blob = self.redis.get(self._key(platform, kind, ident))
+        except redis.RedisError as e:
+            logger.debug(f"Profile cache read failed: {e}")
+            return False, None
+        if blob is None:
+            return False, None
+        if blob == self._NOT_FOUND_BLOB:
+            return True, self.NOT_FOUND
+        return True, json.loads(zlib.decompress(blob))
+
+    def set(self, platform: str, kind: str, ident: str, payload: Any, ttl: Optional[int] = None):
+        if payload is self.NOT_FOUND:
+            blob = self._NOT_FOUND_BLOB
+            ttl = settings.PROFILE_CACHE_NEGATIVE_TTL
+        else:
+            blob = zlib.compress(json.dumps(payload, separators=(",", ":")).encode())
+            ttl = ttl or settings.PROFILE_CACHE_TTL
+        try:
+            self.redis.set(self._key(platform, kind, ident), blob, ex=ttl)
+        except redis.RedisError as e:
+            logger.debug(f"Profile cache write failed: {e}")
+
+    def invalidate(self, platform: str, kind: str, ident: str):
+        try:
+            self.redis.delete(self._key(platform, kind, ident))
+        except redis.RedisError:
+            pass
+
+    async def fetch(
+        self,
+        platform: str,
+        kind: str,
+        ident: str,
+        loader: Callable[[], Awaitable[Any]],
+        use_cache: bool = True,
+        ttl: Optional[int] = None,
+    ) -> Optional[Any]:
+        """
+        Returns the cached payload, or awaits loader() and caches what it returns.
+
+        loader() returns the payload, NOT_FOUND (negative-cached), or None
+        (transient failure, not cached). fetch() returns None for both misses.
+        use_cache=False skips the read but still refreshes the entry.
+        """
+        if not settings.PROFILE_CACHE_ENABLED:
+            payload = await loader()
+            return None if payload is self.NOT_FOUND else payload
+
+        if use_cache:
+            found, payload = self.get(platform, kind, ident)
+            if found:
+                self._count(platform, kind, "negative_hits" if payload is self.NOT_FOUND else "hits")
+                return None if payload is self.NOT_FOUND else payload
+
+        self._count(platform, kind, "misses" if use_cache else "bypass")
+        payload = await loader()
+        if payload is None:
+            return None
+
+        self.set(platform, kind, ident, payload, ttl)
+        self._count(platform, kind, "stores")
+        return None if payload is self.NOT_FOUND else payload
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Counters per 'platform:kind' plus hit_rate (positive + negative hits / lookups)."""
+        try:
+            raw = self.redis.hgetall(self.STATS_KEY)
+        except redis.RedisError:
+            return {}
+
+        stats: Dict[str, Dict[str, float]] = {}
+        for field, value in raw.items():
+            scope, event = field.decode().rsplit(":", 1)
+            stats.setdefault(scope, {})[event] = int(value)
+        for counts in stats.values():
+            hits = counts.get("hits", 0) + counts.get("negative_hits", 0)
+            lookups = hits + counts.get("misses", 0)
+            counts["hit_rate"] = round(hits / lookups, 3) if lookups else 0.0
+        return stats
+
+
+# Singleton instance
+profile_cache = ProfileCache()
@@ -0,0 +1,74 @@
+import asyncio
+import time
+from typing import Dict, Optional, Tuple
+
+from app.config import settings
+
+
+class AsyncRateLimiter:
+    """
+    Token bucket for one host: `rate` requests/second with bursts of up to `burst`.
+
+    acquire() waits until a token is free, so any number of concurrent coroutines
+    can share the bucket and the host still sees at most `rate` req/s on average.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class HostRateLimits:
+    """
+    Registry of per-host AsyncRateLimiters, one per (event loop, host) like the
+    HTTP pool (asyncio locks must not be shared across loops).
+
+        await rate_limits.acquire(settings.RAPIDAPI_HOST)
+    """
+
+    def __init__(self):
+        self._limiters: Dict[Tuple[int, str], AsyncRateLimiter] = {}
+        self._loops: Dict[int, asyncio.AbstractEventLoop] = {}
+
+    def _prune(self):
+        """Forget limiters left on closed loops (a new loop can reuse a dead one's id)."""
+        for loop_id, loop in list(self._loops.items()):
+            if loop.is_closed():
+                del self._loops[loop_id]
+                for key in [k for k in self._limiters if k[0] == loop_id]:
+                    del self._limiters[key]
+
+    def get(self, host: str, default: Optional[float] = None) -> AsyncRateLimiter:
+        """HOST_RATE_LIMITS[host] if configured, else `default` (or DEFAULT_HOST_RATE_LIMIT)."""
+        loop = asyncio.get_running_loop()
+        key = (id(loop), host)
+        limiter = self._limiters.get(key)
+        if limiter is None or self._loops.get(id(loop)) is not loop:
+            self._prune()
+            rate = settings.HOST_RATE_LIMITS.get(host, default or settings.DEFAULT_HOST_RATE_LIMIT)
+            limiter = self._limiters[key] = AsyncRateLimiter(rate)
+            self._loops[id(loop)] = loop
+        return limiter
+
+    async def acquire(self, host: str, default: Optional[float] = None):
+        await self.get(host, default).acquire()
+
+
+# Singleton instance (one per worker process)
+rate_limits = HostRateLimits()
@@ -0,0 +1,135 @@
+from datetime import datetime
+from typing import Dict, Optional
+
+import redis
+from loguru import logger
+from sqlalchemy import case, func, update
+
+from app.config import settings
+from app.models import ScrapingRun
+
+
+class RunStats:
+    """
+    ScrapingRun counters accumulated in Redis instead of read-modify-write on the row.
+
+    Workers HINCRBY a per-run hash (atomic, no row locks). The totals are copied
+    into scraping_runs at most once per RUN_STATS_FLUSH_INTERVAL (whichever worker
+    grabs the flush lock) and again when the run is finalized. Flushes only ever
+    raise a column, so out-of-order flushes cannot roll a counter back.
+
+    Completion is tracked with a pending-task counter: producers call
+    add_pending() before queueing tasks and seal() once everything is queued;
+    each task calls task_done() when it finishes for good. The run is finalized
+    (status + completed_at) when it is sealed and nothing is pending.
+    """
+
+    COUNTERS = ("hashtags_processed", "users_discovered", "users_classified", "users_qualified", "users_enriched")
+    KEY = "run_stats:{run_id}"
+    FLUSH_LOCK_KEY = "run_stats:{run_id}:flush_lock"
+
+    def __init__(self, session_factory, redis_client: Optional[redis.Redis] = None):
+        self.Session = session_factory
+        self._redis = redis_client
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        return self._redis
+
+    def _key(self, run_id: int) -> str:
+        return self.KEY.format(run_id=run_id)
+
+    def incr(self, run_id: int, **counts: int):
+        """Atomically adds to the run's counters, e.g. incr(run_id, users_classified=50)."""
+        unknown = set(counts) - set(self.COUNTERS)
+        if unknown:
+            raise ValueError(f"Unknown run counters: {sorted(unknown)}")
+
+        key = self._key(run_id)
+        pipe = self.redis.pipeline(transaction=False)
+        for field, amount in counts.items():
+            if amount:
+                pipe.hincrby(key, field, amount)
+        pipe.expire(key, settings.RUN_STATS_TTL)
+        pipe.execute()
+        self.maybe_flush(run_id)
+
+    def get(self, run_id: int) -> Dict[str, int]:
+        raw = self.redis.hgetall(self._key(run_id))
+        return {field: int(raw.get(field, 0)) for field in self.COUNTERS}
+
+    def maybe_flush(self, run_id: int):
+        """Flushes if no worker has flushed this run within RUN_STATS_FLUSH_INTERVAL."""
+        lock = self.FLUSH_LOCK_KEY.format(run_id=run_id)
+        if self.redis.set(lock, "1", nx=True, ex=settings.RUN_STATS_FLUSH_INTERVAL):
+            self.flush(run_id)
+
+    def flush(self, run_id: int):
+        """Copies the Redis totals into scraping_runs (never lowers a column)."""
+        totals = self.get(run_id)
+        values = {
+            field: case(
+                (func.coalesce(getattr(ScrapingRun, field), 0) < total, total),
+                else_=getattr(ScrapingRun, field),
+            )
+            for field, total in totals.items() if total
+        }
+        if not values:
+            return
+
+        session = self.Session()
+        try:
+            session.execute(update(ScrapingRun).where(ScrapingRun.id == run_id).values(values))
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.warning(f"Run stats flush failed for run {run_id}: {e}")
+        finally:
+            session.close()
+
+    # --- Completion tracking ---
+
+    def add_pending(self, run_id: int, n: int = 1):
+        """Call BEFORE queueing n tasks that will each call task_done()."""
+        if n:
+            key = self._key(run_id)
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.hincrby(key, "pending", n)
+            pipe.expire(key, settings.RUN_STATS_TTL)
+            pipe.execute()
+
+    def task_done(self, run_id: int, n: int = 1):
+        remaining = self.redis.hincrby(self._key(run_id), "pending", -n)
+        if remaining <= 0 and self.redis.hget(self._key(run_id), "sealed"):
+            self.finalize(run_id)
+
+    def seal(self, run_id: int):
+        """Marks that the producer has queued everything; finalizes now if nothing is pending."""
+        key = self._key(run_id)
+        self.redis.hset(key, "sealed", 1)
+        self.redis.expire(key, settings.RUN_STATS_TTL)
+        if int(self.redis.hget(key, "pending") or 0) <= 0:
+            self.finalize(run_id)
+
+    def finalize(self, run_id: int, status: str = "completed"):
+        """Final flush, then sets status and completed_at (once per run)."""
+        if not self.redis.hsetnx(self._key(run_id), "finalized", 1):
+            return
+        self.flush(run_id)
+
+        session = self.Session()
+        try:
+            session.execute(
+                update(ScrapingRun)
+                .where(ScrapingRun.id == run_id, ScrapingRun.completed_at.is_(None))
+                .values(status=status, completed_at=datetime.utcnow())
+            )
+            session.commit()
+            logger.success(f"Run {run_id} finalized: {status} {self.get(run_id)}")
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Could not finalize run {run_id}: {e}")
+        finally:
+            session.close()
@@ -0,0 +1,69 @@
+import time
+from typing import Any, Callable, List, Optional
+
+from loguru import logger
+
+
+class TaskBatcher:
+    """
+    Buffers items for a batch Celery task and sends them as one message per chunk.
+
+    A chunk is sent when it reaches `batch_size` items or when its oldest item has
+    waited `max_wait` seconds (checked on each add()). Call flush() (or use it as
+    a context manager) so the final partial chunk is not lost. `on_send(chunk)`
+    runs just before each message is queued.
+
+        with TaskBatcher(task_classify_batch, run_id) as batcher:
+            for username in usernames:
+                batcher.add(username)
+    """
+
+    def __init__(
+        self,
+        task,
+        *task_args: Any,
+        batch_size: int = 50,
+        max_wait: float = 5.0,
+        on_send: Optional[Callable[[List[Any]], None]] = None,
+    ):
+        self.task = task
+        self.task_args = task_args
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.on_send = on_send
+        self.messages_sent = 0
+        self.items_sent = 0
+        self._buffer: List[Any] = []
+        self._first_added: Optional[float] = None
+
+    def add(self, item: Any):
+        if not self._buffer:
+            self._first_added = time.monotonic()
+        self._buffer.append(item)
+        if len(self._buffer) >= self.batch_size or self.is_due():
+            self.flush()
+
+    def extend(self, items):
+        for item in items:
+            self.add(item)
+
+    def is_due(self) -> bool:
+        return bool(self._buffer) and time.monotonic() - self._first_added >= self.max_wait
+
+    def flush(self):
+        if not self._buffer:
+            return
+        chunk, self._buffer = self._buffer, []
+        self._first_added = None
+        if self.on_send:
+            self.on_send(chunk)
+        self.task.delay(chunk, *self.task_args)
+        self.messages_sent += 1
+        self.items_sent += len(chunk)
+        logger.debug(f"Queued {self.task.name} with {len(chunk)} items")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
@@ -5,7 +5,7 @@ import time
 # Add the current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from app.pipeline import task_discover_hashtag
+from app.pipeline import task_discover_hashtag, run_stats
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine
 from app.config import settings
@@ -132,6 +132,7 @@ if __name__ == "__main__":
         # Create a new Run ID for this batch
         run_id = create_run_record()
         print(f"\n[{time.strftime('%Y-%m-%d %H:%M:%S')}] Triggering batch scrape (Run ID: {run_id})...")
+        run_stats.add_pending(run_id, sum(len(tags) for tags in HASHTAG_TIERS.values()))
     
         for tier_name, tags in HASHTAG_TIERS.items():
             # scrape_mode logic is not used in task_discover_hashtag currently, defaulting to standard discovery
@@ -140,5 +141,7 @@ if __name__ == "__main__":
                 print(f"Queuing task for #{tag}...")
                 task_discover_hashtag.delay(tag, run_id)
             
+        # Run gets status/completed_at once all of its tasks have finished
+        run_stats.seal(run_id)
         print("All tasks queued! Sleeping for 2 hours...")
         time.sleep(7200)
@@ -0,0 +1,100 @@
+"""
+Benchmark: Tier 2 enrichment with a browser launched per lead vs the shared
+browser pool (app/utils/browser_pool.py).
+
+Serves a stub client-rendered bio-link page (the mailto: link is injected by
+JS, so the static Tier 2 parse misses it) from a local HTTP server and
+runs EnrichmentEngine.enrich_user over N fake leads pointing at it, reporting
+leads/minute and how many Chromium processes were launched.
+
+Usage: python benchmark_browser_pool.py [num_leads] [concurrency]
+"""
+import sys
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+from loguru import logger
+from playwright.async_api import async_playwright
+from app.enrichment import EnrichmentEngine
+from app.utils.browser_pool import BrowserPool
+
+# Client-rendered page: the static Tier 2 parse finds nothing, so every lead needs the browser
+PAGE = b"""<html><body><div id="root"></div><script>
+document.getElementById("root").innerHTML = '<a href="mailto:' + 'creator' + '@stubmail.com">Email me</a>';
+</script></body></html>"""
+
+
+class ColdStartPool:
+    """The old behaviour: a fresh Playwright + Chromium for every lead."""
+
+    def __init__(self):
+        self.stats = {"launches": 0}
+
+    @asynccontextmanager
+    async def lease(self, mobile: bool = False):
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            self.stats["launches"] += 1
+            try:
+                if mobile:
+                    yield await browser.new_context(**p.devices["iPhone 12 Pro"])
+                else:
+                    yield await browser.new_context()
+            finally:
+                await browser.close()
+
+    async def close(self):
+        pass
+
+
+async def handle(reader, writer):
+    try:
+        await reader.readuntil(b"\r\n\r\n")
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/html\r\nConnection: close\r\n"
+            b"Content-Length: " + str(len(PAGE)).encode() + b"\r\n\r\n" + PAGE
+        )
+        await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionResetError):
+        pass
+    finally:
+        writer.close()
+
+
+async def run(name, pool, url, n, concurrency):
+    engine = EnrichmentEngine(pool=pool)
+    sem = asyncio.Semaphore(concurrency)
+    # "linktr.ee" in the path routes the lead to Tier 2; the page always has an email
+    leads = [{"username": f"lead{i}", "biography": "", "external_url": f"{url}/linktr.ee/lead{i}"} for i in range(n)]
+
+    async def one(lead):
+        async with sem:
+            return await engine.enrich_user(lead)
+
+    start = time.perf_counter()
+    found = await asyncio.gather(*(one(lead) for lead in leads))
+    elapsed = time.perf_counter() - start
+    await pool.close()
+
+    hits = sum(1 for email in found if email)
+    print(f"{name:<18} {n / elapsed * 60:>8,.0f} leads/min  {pool.stats['launches']:>4} browser launches  {hits}/{n} emails  ({elapsed:.1f}s)")
+
+
+async def main(n: int, concurrency: int):
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+    print(f"{n} leads, concurrency {concurrency}, stub at {url}")
+
+    await run("launch per lead", ColdStartPool(), url, n, concurrency)
+    await run("browser pool", BrowserPool(), url, n, concurrency)
+
+    server.close()
+    await server.wait_closed()
+
+
+if __name__ == "__main__":
+    logger.remove()
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    asyncio.run(main(n, concurrency))
@@ -0,0 +1,123 @@
+"""
+Benchmark: Classifier.classify throughput (profiles/sec).
+
+Compares the legacy per-group substring scan against the compiled
+KeywordMatcher path and checks that both produce identical scores, then
+times the columnar Classifier.classify_batch path over the same profiles.
+
+Usage: python benchmark_classifier.py [num_profiles]
+"""
+import sys
+import random
+import time
+
+from loguru import logger
+from app.classifier import Classifier
+from app.config import settings
+
+BIOS = [
+    "📍 Los Angeles | Always hungry | DM for collabs",
+    "LA foodie | hidden gems | matcha girl ✨",
+    "Best tacos in LA! Order now on DoorDash",
+    "Realtor in Irvine | DM for listings",
+    "F4F L4L gain train 🚂 follow back",
+    "UGC creator 🎥 San Diego | food photographer | 📧 hello@example.com",
+    "Living my best life in California",
+    "Daily repost of the best food spots | DM to be featured",
+    "Crypto trader | passive income | link in bio",
+    "Home cook & recipe developer | OC | Smorgasburg LA regular",
+]
+
+
+def legacy_classify(user_data):
+    """The pre-KeywordMatcher scoring loop, kept here as the baseline."""
+    passes, fail_reasons = Classifier.passes_hard_filters(user_data)
+    if not passes:
+        return False, 0, [f"HARD_FAIL: {r}" for r in fail_reasons]
+
+    score = 0
+    matched = []
+    bio = (user_data.get("biography") or "").lower()
+    full_name = (user_data.get("full_name") or "").lower()
+    username = (user_data.get("username") or "").lower()
+    text_content = f"{bio} {full_name} {username}"
+    cat = user_data.get("category_name")
+
+    for signal_name, (points, keywords) in Classifier.POSITIVE_SIGNALS.items():
+        if any(k.lower() in text_content for k in keywords):
+            score += points
+            matched.append(signal_name)
+
+    anchor_points, anchor_keywords = Classifier.VENUE_ANCHORS
+    if any(k.lower() in text_content for k in anchor_keywords):
+        score += anchor_points
+        matched.append("venue_anchor_match")
+
+    if cat:
+        if cat in Classifier.POSITIVE_SIGNALS["good_category"][1]:
+            score += 10
+            matched.append("good_category")
+        elif cat.lower() == "food & beverage" and not user_data.get("is_business"):
+            score += 10
+            matched.append("good_category_creator")
+
+    for signal_name, (points, keywords) in Classifier.NEGATIVE_SIGNALS.items():
+        if any(k.lower() in text_content for k in keywords):
+            score += points
+            matched.append(signal_name)
+
+    if cat and cat in Classifier.NEGATIVE_SIGNALS["bad_category"][1]:
+        score += -40
+        matched.append("bad_category")
+
+    return score >= settings.PASS_THRESHOLD, score, matched
+
+
+def make_profiles(n):
+    rng = random.Random(42)
+    profiles = []
+    for i in range(n):
+        profiles.append({
+            "username": f"user_{i}",
+            "full_name": rng.choice(["Jane Eats", "Mike", "", "SD Foodie"]),
+            "biography": " | ".join(rng.sample(BIOS, 2)),
+            "follower_count": rng.randint(1000, 50000),
+            "following_count": rng.randint(100, 1000),
+            "media_count": rng.randint(30, 500),
+            "category_name": rng.choice([None, "Blogger", "Restaurant", "Food & Beverage"]),
+        })
+    return profiles
+
+
+def bench(name, fn, profiles):
+    start = time.perf_counter()
+    results = [fn(p) for p in profiles]
+    elapsed = time.perf_counter() - start
+    print(f"{name:<10} {len(profiles) / elapsed:>12,.0f} profiles/sec  ({elapsed:.2f}s)")
+    return results
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    logger.remove()  # Per-profile logging would dominate the timings
+
+    profiles = make_profiles(n)
+    Classifier.classify(profiles[0])  # Build the matcher outside the timed loop
+
+    before = bench("legacy", legacy_classify, profiles)
+    after = bench("compiled", Classifier.classify, profiles)
+
+    mismatches = sum(1 for a, b in zip(before, after) if a != b)
+    print(f"Mismatched results: {mismatches}")
+    assert mismatches == 0, "Compiled matcher diverged from legacy scoring"
+
+    start = time.perf_counter()
+    batch = Classifier.to_columns(profiles)
+    qualified, scores, _ = Classifier.classify_batch(batch)
+    elapsed = time.perf_counter() - start
+    print(f"{'batch':<10} {len(profiles) / elapsed:>12,.0f} profiles/sec  ({elapsed:.2f}s, incl. to_columns)")
+
+    batch_mismatches = sum(
+        1 for (q, s, _), bq, bs in zip(after, qualified.tolist(), scores.tolist()) if (q, s) != (bq, bs)
+    )
+    print(f"Batch mismatches: {batch_mismatches}")
@@ -0,0 +1,128 @@
+"""
+Benchmark: email extraction throughput (app/utils/emails.py).
+
+Compares the legacy extractors (EnrichmentEngine._tier1_regex and
+EmailExtractor's findall + blacklist scan) with the shared module on:
+  - bios (short text, many calls)
+  - large generated HTML pages (scripts, base64 images, srcset "@2x" assets),
+    whole-string and streamed in 64 KB chunks through EmailScanner.
+
+Usage: python benchmark_email_extraction.py [html_mb] [num_bios]
+"""
+import sys
+import base64
+import random
+import re
+import time
+
+from loguru import logger
+from app.utils import emails
+from app.utils.emails import EmailScanner
+
+BIOS = [
+    "📍 Los Angeles | Always hungry | DM for collabs",
+    "UGC creator 🎥 San Diego | 📧 collabs@tastyfood.co",
+    "LA foodie | hidden gems | matcha girl ✨ | biz: jane [at] gmail [dot] com",
+    "Best tacos in LA! Order now on DoorDash",
+    "Home cook & recipe developer | OC | inquiries: cook(at)kitchenstudio.com",
+    "Eat at joes.com for the best burgers in town",
+    "Living my best life in California",
+    "PR friendly | contact at gmail dot com | mgmt@agency.la",
+]
+
+LEGACY_EMAIL_REGEX = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
+LEGACY_EXCLUDED = [
+    "noreply", "no-reply", "support@", "info@", "hello@",
+    "contact@", "admin@", "sales@", "help@", "wix.com",
+    "sentry.io", "example.com", "domain.com", ".png", ".jpg"
+]
+
+
+def legacy_tier1(text):
+    """The old EnrichmentEngine._tier1_regex."""
+    if not text:
+        return None
+    match = re.search(r'[\w\.-]+@[\w\.-]+\.\w+', text)
+    if match:
+        return match.group(0)
+    match_obfuscated = re.search(r'([\w\.-]+)\s*\[at\]\s*([\w\.-]+\.\w+)', text, re.IGNORECASE)
+    if match_obfuscated:
+        return f"{match_obfuscated.group(1)}@{match_obfuscated.group(2)}"
+    return None
+
+
+def legacy_extract_all(text):
+    """The old EmailExtractor path: findall over the page, blacklist scan per match."""
+    return [
+        m.lower() for m in re.findall(LEGACY_EMAIL_REGEX, text)
+        if not any(p in m.lower() for p in LEGACY_EXCLUDED)
+    ]
+
+
+def make_html(size_mb: float, seed: int = 7) -> str:
+    """Markup-heavy page: base64 images, srcset assets, minified JS, a few real addresses."""
+    rng = random.Random(seed)
+    blob = base64.b64encode(rng.randbytes(3000)).decode()
+    parts = ["<html><head><style>body{margin:0}</style></head><body>"]
+    size = 0
+    i = 0
+    while size < size_mb * 1024 * 1024:
+        i += 1
+        block = (
+            f'<div class="card-{i}"><img src="/img/logo-{i}@2x.png" srcset="/img/a{i}@3x.webp 3x">'
+            f'<img src="data:image/png;base64,{blob}">'
+            f'<script>var s{i}={{"dsn":"https://{i}abc@o1.ingest.sentry.io/1","t":"{"x" * 200}"}};</script>'
+            f"<p>{' '.join(rng.choice(BIOS) for _ in range(3))}</p></div>"
+        )
+        if i % 50 == 0:
+            block += f'<a href="mailto:booking{i}@venue{i}.com">Book</a>'
+        parts.append(block)
+        size += len(block)
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def timed(fn, *args, repeat: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(*args)
+    return result, (time.perf_counter() - start) / repeat
+
+
+def stream(html: str, chunk: int = 64 * 1024):
+    scanner = EmailScanner(allow_role=False)
+    for i in range(0, len(html), chunk):
+        scanner.feed(html[i:i + chunk])
+    return scanner.close()
+
+
+def main(html_mb: float, num_bios: int):
+    bios = [random.choice(BIOS) for _ in range(num_bios)]
+
+    print(f"Bios ({num_bios:,})")
+    legacy, t_legacy = timed(lambda: [legacy_tier1(b) for b in bios])
+    new, t_new = timed(lambda: [emails.first(b) for b in bios])
+    print(f"  legacy tier1     {num_bios / t_legacy:>12,.0f} bios/s  {sum(1 for e in legacy if e):>5} found")
+    print(f"  emails.first     {num_bios / t_new:>12,.0f} bios/s  {sum(1 for e in new if e):>5} found")
+
+    html = make_html(html_mb)
+    mb = len(html) / 1024 / 1024
+    print(f"\nHTML ({mb:.1f} MB)")
+    legacy, t_legacy = timed(legacy_extract_all, html)
+    new, t_new = timed(emails.extract, html, False)
+    streamed, t_stream = timed(stream, html)
+    print(f"  legacy findall   {mb / t_legacy:>8,.1f} MB/s  {len(set(legacy)):>5} distinct ({len(legacy)} matches)")
+    print(f"  emails.extract   {mb / t_new:>8,.1f} MB/s  {len(new):>5} distinct")
+    print(f"  EmailScanner     {mb / t_stream:>8,.1f} MB/s  {len(streamed):>5} distinct (64 KB chunks)")
+    assert streamed == new, "streamed and whole-page results differ"
+
+    junk = sorted({e for e in legacy if not emails.is_valid(e, allow_role=False)})[:5]
+    if junk:
+        print(f"  legacy false positives, e.g. {junk}")
+
+
+if __name__ == "__main__":
+    html_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    num_bios = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    logger.remove()  # Keep the timed runs out of scraper.log
+    main(html_mb, num_bios)
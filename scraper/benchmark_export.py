@@ -0,0 +1,102 @@
+"""
+Benchmark: lead export memory and throughput (app/exporters/stream_export.py).
+
+Seeds a throwaway SQLite database with N Instagram + N/4 TikTok leads, then
+compares the old export (query(Influencer).all() into ORM objects, DictWriter) with
+the keyset-paginated streaming export to CSV and gzip CSV (and Parquet when
+pyarrow is installed). Peak Python heap is measured with tracemalloc.
+
+Usage: python benchmark_export.py [rows] [page_size]
+"""
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from loguru import logger
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base, Account, Influencer
+from app.exporters.stream_export import export, FIELDS, PARQUET_AVAILABLE
+
+
+def seed(Session, rows: int):
+    rng = random.Random(3)
+    session = Session()
+    for platform, n in (("instagram", rows), ("tiktok", rows // 4)):
+        for start in range(0, n, 10_000):
+            session.execute(insert(Account), [
+                dict(
+                    platform=platform,
+                    username=f"{platform}_{i}",
+                    status="qualified",
+                    biography="LA foodie | hidden gems | DM for collabs\n" * 3,
+                    follower_count=rng.randint(1_000, 500_000),
+                    score=rng.choice([None] + list(range(0, 100))),
+                    matched_signals=["bio:foodie", "geo:la"],
+                    email=f"user{i}@gmail.com" if i % 3 else None,
+                )
+                for i in range(start, min(n, start + 10_000))
+            ])
+        session.commit()
+    session.close()
+
+
+def legacy_export(Session, path: str) -> int:
+    """The old export_leads.py: every row as an ORM object before writing."""
+    session = Session()
+    leads = session.query(Influencer).order_by(Influencer.score.desc()).all()
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS["instagram"])
+        writer.writeheader()
+        for lead in leads:
+            writer.writerow({field: getattr(lead, field) for field in FIELDS["instagram"]})
+    session.close()
+    return len(leads)
+
+
+def measure(label: str, fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<28} {rows:>9,} rows  {elapsed:>6.1f}s  {rows / elapsed:>9,.0f} rows/s  peak {peak / 1024 / 1024:>7.1f} MB")
+
+
+def main(rows: int, page_size: int):
+    workdir = tempfile.mkdtemp(prefix="export_bench_")
+    engine = create_engine(f"sqlite:///{os.path.join(workdir, 'leads.db')}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    print(f"Seeding {rows:,} Instagram + {rows // 4:,} TikTok leads...")
+    seed(Session, rows)
+
+    out = lambda name: os.path.join(workdir, name)
+    stream = lambda path, platforms: sum(
+        export(path, platforms=platforms, session_factory=Session, page_size=page_size)["rows"].values()
+    )
+    print(f"\nExport (page size {page_size:,})")
+    measure("legacy .all() -> csv", lambda: legacy_export(Session, out("legacy.csv")))
+    measure("stream -> csv", lambda: stream(out("ig.csv"), ["instagram"]))
+    measure("stream both -> csv.gz", lambda: stream(out("all.csv.gz"), ["instagram", "tiktok"]))
+    if PARQUET_AVAILABLE:
+        measure("stream both -> parquet", lambda: stream(out("all.parquet"), ["instagram", "tiktok"]))
+    else:
+        print("  (pyarrow not installed, skipping Parquet)")
+
+    for name in sorted(os.listdir(workdir)):
+        print(f"  {name:<16} {os.path.getsize(out(name)) / 1024 / 1024:>8.1f} MB")
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    page_size = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    logger.remove()  # Keep the timed runs out of scraper.log
+    main(rows, page_size)
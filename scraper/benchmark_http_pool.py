@@ -0,0 +1,91 @@
+"""
+Benchmark: fresh httpx.AsyncClient per call vs the shared pool (app/utils/http_pool.py).
+
+Starts a local keep-alive HTTP stub server, fires the same number of requests
+through both strategies and reports requests/sec plus how many TCP connections
+the server had to accept (every new connection is a handshake; against a real
+HTTPS host each one also pays a TLS handshake).
+
+Usage: python benchmark_http_pool.py [num_requests] [concurrency]
+"""
+import sys
+import asyncio
+import time
+
+import httpx
+from loguru import logger
+from app.utils.http_pool import http_pool
+
+BODY = b'{"code": 0, "data": {"user": {"unique_id": "stub"}}}'
+
+
+class StubServer:
+    def __init__(self):
+        self.connections = 0
+        self.server = None
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                # Read request head (stub ignores bodies; benchmark only sends GETs)
+                head = await reader.readuntil(b"\r\n\r\n")
+                if not head:
+                    break
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: " + str(len(BODY)).encode() + b"\r\n\r\n" + BODY
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/user/info"
+
+
+async def per_call_client(url: str):
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        await client.get(url)
+
+
+async def pooled_client(url: str):
+    await http_pool.get("127.0.0.1", timeout=30.0).get(url)
+
+
+async def run(name, fetch, url, stub, n, concurrency):
+    stub.connections = 0
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            await fetch(url)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(n)))
+    elapsed = time.perf_counter() - start
+    print(f"{name:<16} {n / elapsed:>10,.0f} req/sec  {stub.connections:>6} connections  ({elapsed:.2f}s)")
+
+
+async def main(n: int, concurrency: int):
+    stub = StubServer()
+    url = await stub.start()
+    print(f"{n} requests, concurrency {concurrency}, stub at {url}")
+
+    await run("per-call client", per_call_client, url, stub, n, concurrency)
+    await run("shared pool", pooled_client, url, stub, n, concurrency)
+
+    await http_pool.aclose()
+    stub.server.close()
+    await stub.server.wait_closed()
+
+
+if __name__ == "__main__":
+    logger.remove()
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    asyncio.run(main(n, concurrency))
@@ -0,0 +1,140 @@
+"""
+Benchmark: hot lead queries on `accounts` with / without its secondary indexes.
+
+Seeds a scratch database (SQLite file by default, or any empty database via
+--database-url, e.g. a throwaway Postgres), drops the accounts indexes
+(all but the (platform, username) key), then prints the EXPLAIN plan and
+median timing of each hot query, recreates the indexes and prints them again.
+
+Queries: enrichment candidates (IG + TikTok), first and a deep keyset export
+page, and the dashboard's per-platform / status counts.
+
+Usage: python benchmark_queries.py [--rows 500000] [--database-url postgresql+pg8000://...]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from loguru import logger
+from sqlalchemy import create_engine, func, insert, inspect, select, text, tuple_
+
+from app.models import Account, Base
+
+# Secondary indexes under test (the unique (platform, username) key stays)
+INDEXES = sorted(Account.__table__.indexes, key=lambda ix: ix.name)
+
+
+def hot_queries(mid_score: int, mid_id: int):
+    a = Account
+    qualified = lambda platform: (a.platform == platform, a.status == "qualified")
+    export_cols = (a.username, a.score, a.email, a.follower_count, a.id)
+    return {
+        "ig enrich candidates": select(a.id, a.username, a.biography, a.external_url)
+            .where(*qualified("instagram"), a.email.is_(None), a.email_enriched == False)  # noqa: E712 - same as run_enrichment.py
+            .order_by(a.score.desc()).limit(50),
+        "tt enrich candidates": select(a.id, a.username, a.biography)
+            .where(*qualified("tiktok"), a.email.is_(None)).order_by(a.score.desc()).limit(50),
+        "ig export first page": select(*export_cols)
+            .where(*qualified("instagram"), a.score.is_not(None)).order_by(a.score.desc(), a.id.desc()).limit(5000),
+        "ig export keyset page": select(*export_cols)
+            .where(*qualified("instagram"), a.score.is_not(None), tuple_(a.score, a.id) < (mid_score, mid_id))
+            .order_by(a.score.desc(), a.id.desc()).limit(5000),
+        "ig with-email count": select(func.count()).select_from(a).where(*qualified("instagram"), a.email.is_not(None)),
+        "dashboard counts": select(a.platform, a.status, func.count(), func.count(a.email)).group_by(a.platform, a.status),
+    }
+
+
+def seed(engine, rows: int):
+    rng = random.Random(5)
+    with engine.begin() as conn:
+        for platform, n in (("instagram", rows), ("tiktok", rows // 2)):
+            for start in range(0, n, 20_000):
+                batch = []
+                for i in range(start, min(n, start + 20_000)):
+                    has_email = rng.random() < 0.35
+                    batch.append(dict(
+                        platform=platform,
+                        username=f"{platform}_{i}",
+                        status="qualified" if rng.random() < 0.3 else "blacklisted",
+                        biography="LA foodie | DM for collabs",
+                        follower_count=rng.randint(1_000, 500_000),
+                        score=rng.choice([None] + list(range(0, 100))),
+                        email=f"user{i}@gmail.com" if has_email else None,
+                        # Most email-less Instagram leads have already been through enrichment
+                        email_enriched=platform == "instagram" and not has_email and rng.random() < 0.9,
+                    ))
+                conn.execute(insert(Account), batch)
+
+
+def explain(conn, stmt) -> str:
+    sql = str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "sqlite":
+        return "\n".join(f"      {row[-1]}" for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+    return "\n".join(f"      {row[0]}" for row in conn.execute(text(f"EXPLAIN {sql}")))
+
+
+def run(engine, label: str, queries: dict, repeat: int) -> dict:
+    print(f"\n=== {label} ===")
+    timings = {}
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE"))
+        for name, stmt in queries.items():
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                conn.execute(stmt).all()
+                samples.append(time.perf_counter() - start)
+            timings[name] = statistics.median(samples) * 1000
+            print(f"  {name:<24} {timings[name]:>9.2f} ms")
+            print(explain(conn, stmt))
+    return timings
+
+
+def main(database_url: str, rows: int, repeat: int):
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    with engine.connect() as conn:
+        if conn.execute(select(func.count()).select_from(Account)).scalar():
+            raise SystemExit("accounts is not empty: point --database-url at a scratch database")
+
+    existing = {ix["name"] for ix in inspect(engine).get_indexes("accounts")}
+    for index in INDEXES:
+        if index.name in existing:
+            index.drop(engine)
+
+    print(f"Seeding {rows:,} Instagram + {rows // 2:,} TikTok accounts ({engine.dialect.name})...")
+    start = time.perf_counter()
+    seed(engine, rows)
+    print(f"  done in {time.perf_counter() - start:.0f}s")
+
+    with engine.connect() as conn:
+        mid_score, mid_id = conn.execute(
+            select(Account.score, Account.id)
+            .where(Account.platform == "instagram", Account.status == "qualified", Account.score.is_not(None))
+            .order_by(Account.score.desc(), Account.id.desc()).offset(rows // 8).limit(1)
+        ).one()
+    queries = hot_queries(mid_score, mid_id)
+
+    before = run(engine, "without secondary indexes", queries, repeat)
+    for index in INDEXES:
+        index.create(engine)
+    after = run(engine, f"with {', '.join(ix.name for ix in INDEXES)}", queries, repeat)
+
+    print("\n=== summary (median ms) ===")
+    for name in queries:
+        print(f"  {name:<24} {before[name]:>9.2f} -> {after[name]:>8.2f}  ({before[name] / max(after[name], 1e-6):>6.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EXPLAIN + timings for hot accounts queries, without/with indexes")
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", help="Empty scratch database (default: temporary SQLite file)")
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='query_bench_'), 'leads.db')}"
+    logger.remove()  # Keep the timed runs out of scraper.log
+    main(url, args.rows, args.repeat)
@@ -1,6 +1,6 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from app.models import BlacklistedAccount
+from app.models import Account
 from app.config import settings
 
 def clear_all_blacklist():
@@ -10,7 +10,9 @@ def clear_all_blacklist():
     session = Session()
     
     try:
-        rows_deleted = session.query(BlacklistedAccount).delete()
+        rows_deleted = session.query(Account).filter(
+            Account.platform == "instagram", Account.status == "blacklisted"
+        ).delete(synchronize_session=False)
         session.commit()
         print(f"✅ Deleted {rows_deleted} users from the Blacklist.")
     except Exception as e:
@@ -1,5 +1,5 @@
 from sqlalchemy import create_engine
-from app.models import Base, BlacklistedAccount
+from app.migrations import migrate
 from config import Config
 
 def create_tables():
@@ -7,20 +7,24 @@ def create_tables():
     engine = create_engine(Config.DATABASE_URI)
     
     print("Creating tables if they don't exist...")
-    # This will strictly create tables that are missing. It won't modify existing ones.
-    Base.metadata.create_all(engine)
+    # create_all only creates missing tables; pending migrations then add
+    # indexes etc. to the existing ones (app/migrations.py)
+    migrate(engine)
     
     print("✅ Tables created successfully.")
-    print("Verifying BlacklistedAccount table...")
+    print("Verifying accounts table and legacy views...")
     
     try:
         from sqlalchemy import inspect
         inspector = inspect(engine)
-        tables = inspector.get_table_names()
-        if 'blacklisted_accounts' in tables:
-             print("✅ 'blacklisted_accounts' table exists.")
+        if 'accounts' in inspector.get_table_names():
+             print("✅ 'accounts' table exists.")
         else:
-             print("❌ 'blacklisted_accounts' table was NOT created.")
+             print("❌ 'accounts' table was NOT created.")
+        if 'blacklisted_accounts' in inspector.get_view_names():
+             print("✅ 'blacklisted_accounts' view exists.")
+        else:
+             print("❌ 'blacklisted_accounts' view was NOT created.")
     except Exception as e:
         print(f"⚠️ Could not verify table existence: {e}")
 
@@ -79,24 +79,25 @@ def export_and_enrich():
     
     from sqlalchemy import create_engine
     from sqlalchemy.orm import sessionmaker
-    from app.models import Influencer, TikTokInfluencer
+    from app.models import Account
     from app.config import settings
     from app.enrichment import EnrichmentEngine
-    import csv
+    from app.enrichment_scheduler import EnrichmentScheduler
+    from app.utils.browser_pool import browser_pool
     
     engine = create_engine(settings.DATABASE_URL)
     Session = sessionmaker(bind=engine)
     session = Session()
     
-    # 1. Export Instagram Leads
-    ig_leads = session.query(Influencer).filter(Influencer.email == None).order_by(Influencer.score.desc()).all()
-    print(f"\n   📸 Instagram: {len(ig_leads)} leads without email")
+    # 1. Leads without email, both platforms in one query (unified accounts table)
+    leads = session.query(Account).filter(
+        Account.status == "qualified", Account.email == None
+    ).order_by(Account.score.desc()).all()
+    ig_count = sum(1 for lead in leads if lead.platform == "instagram")
+    print(f"\n   📸 Instagram: {ig_count} leads without email")
+    print(f"   🎵 TikTok:    {len(leads) - ig_count} leads without email")
     
-    # 2. Export TikTok Leads
-    tt_leads = session.query(TikTokInfluencer).filter(TikTokInfluencer.email == None).order_by(TikTokInfluencer.score.desc()).all()
-    print(f"   🎵 TikTok:    {len(tt_leads)} leads without email")
-    
-    total = len(ig_leads) + len(tt_leads)
+    total = len(leads)
     if total == 0:
         print("\n   ✅ All leads already have emails or no leads found!")
         session.close()
@@ -104,52 +105,31 @@ def export_and_enrich():
     
     print(f"\n   📧 Starting enrichment for {total} total leads...")
     
-    # 3. Run Enrichment
+    # 2. Run Enrichment
     enricher = EnrichmentEngine()
+    tags = {"instagram": "IG", "tiktok": "TT"}
     
     async def enrich_all():
         enriched_count = 0
+        scheduler = EnrichmentScheduler(enricher)
         
-        # Instagram
-        for i, lead in enumerate(ig_leads):
-            user_data = {
-                "username": lead.username,
-                "biography": lead.biography,
-                "external_url": lead.external_url
-            }
-            email = await enricher.enrich_user(user_data)
+        def on_result(lead, email):
+            nonlocal enriched_count
             if email:
                 lead.email = email
                 lead.email_enriched = True
                 enriched_count += 1
-                logger.success(f"[IG] @{lead.username} -> {email}")
-            
-            if (i + 1) % 10 == 0:
-                session.commit()
-                print(f"   Progress: {i+1}/{len(ig_leads)} Instagram leads processed...")
-            
-            await asyncio.sleep(1)  # Rate limit
+                logger.success(f"[{tags.get(lead.platform, lead.platform)}] @{lead.username} -> {email}")
         
-        # TikTok
-        for i, lead in enumerate(tt_leads):
-            user_data = {
-                "username": lead.username,
-                "biography": lead.biography,
-                "external_url": lead.external_url
-            }
-            email = await enricher.enrich_user(user_data)
-            if email:
-                lead.email = email
-                enriched_count += 1
-                logger.success(f"[TT] @{lead.username} -> {email}")
-            
-            if (i + 1) % 10 == 0:
-                session.commit()
-                print(f"   Progress: {i+1}/{len(tt_leads)} TikTok leads processed...")
-            
-            await asyncio.sleep(1)
+        def commit():
+            session.commit()
+            print(f"   Progress: {enriched_count} emails found so far...")
+        
+        # Best score first across both platforms
+        await scheduler.run(leads, on_result=on_result, on_batch=commit)
         
         session.commit()
+        await browser_pool.close()
         return enriched_count
     
     found = asyncio.run(enrich_all())
@@ -157,25 +137,12 @@ def export_and_enrich():
     
     print(f"\n   ✅ Enrichment Complete! Found {found} new emails.")
     
-    # 4. Export Combined CSV
+    # 3. Export Combined CSV (streamed in keyset pages, both platforms in one file)
+    from app.exporters.stream_export import export
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"combined_leads_{timestamp}.csv"
     
-    session = Session()
-    
-    with open(filename, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(['platform', 'username', 'score', 'email', 'followers', 'bio_snippet'])
-        
-        for lead in session.query(Influencer).order_by(Influencer.score.desc()).all():
-            bio = (lead.biography or "")[:100].replace('\n', ' ')
-            writer.writerow(['instagram', lead.username, lead.score, lead.email, lead.follower_count, bio])
-        
-        for lead in session.query(TikTokInfluencer).order_by(TikTokInfluencer.score.desc()).all():
-            bio = (lead.biography or "")[:100].replace('\n', ' ')
-            writer.writerow(['tiktok', lead.username, lead.score, lead.email, lead.follower_count, bio])
-    
-    session.close()
+    export(filename, fields=['username', 'score', 'email', 'follower_count', 'biography'], session_factory=Session)
     print(f"   📁 Exported to: {os.path.abspath(filename)}")
 
 def view_results():
@@ -184,23 +151,28 @@ def view_results():
     
     from sqlalchemy import create_engine
     from sqlalchemy.orm import sessionmaker
-    from app.models import Influencer, TikTokInfluencer, BlacklistedAccount, TikTokBlacklistedAccount
+    from sqlalchemy import func
+    from app.models import Account
     from app.config import settings
     
     engine = create_engine(settings.DATABASE_URL)
     Session = sessionmaker(bind=engine)
     session = Session()
     
-    ig_leads = session.query(Influencer).count()
-    ig_with_email = session.query(Influencer).filter(Influencer.email != None).count()
-    ig_blacklist = session.query(BlacklistedAccount).count()
-    
-    tt_leads = session.query(TikTokInfluencer).count()
-    tt_with_email = session.query(TikTokInfluencer).filter(TikTokInfluencer.email != None).count()
-    tt_blacklist = session.query(TikTokBlacklistedAccount).count()
-    
+    # One pass over accounts: (platform, status) -> (count, with email)
+    counts = {
+        (platform, status): (total, with_email)
+        for platform, status, total, with_email in session.query(
+            Account.platform, Account.status, func.count(), func.count(Account.email)
+        ).group_by(Account.platform, Account.status)
+    }
     session.close()
     
+    ig_leads, ig_with_email = counts.get(("instagram", "qualified"), (0, 0))
+    ig_blacklist = counts.get(("instagram", "blacklisted"), (0, 0))[0]
+    tt_leads, tt_with_email = counts.get(("tiktok", "qualified"), (0, 0))
+    tt_blacklist = counts.get(("tiktok", "blacklisted"), (0, 0))[0]
+    
     print("  ┌────────────────────────────────────────────────────────────┐")
     print("  │                    📊 STATISTICS                          │")
     print("  ├────────────────────────────────────────────────────────────┤")
@@ -0,0 +1,61 @@
+"""
+Discovery dedup stores (app/utils/dedup.py): stats and migration.
+
+    python dedup_admin.py              # items, memory and false-positive rate per store
+    python dedup_admin.py --migrate    # copy the legacy Redis sets into the configured
+                                       # DEDUP_BACKEND, then delete the sets
+
+--migrate only makes sense once DEDUP_BACKEND is bloom/cuckoo or DEDUP_WINDOW > 0;
+with the default (set, no window) the stores already are the legacy sets.
+"""
+import argparse
+
+import redis
+from loguru import logger
+from app.config import settings
+from app.utils.dedup import dedup_store
+
+STORES = ["seen_owners", "seen_usernames", "tiktok_seen_users"]
+
+
+def print_stats(r: redis.Redis):
+    print(f"{'STORE':<20} {'BACKEND':<8} {'ITEMS':>10} {'MEMORY':>10} {'FP RATE':>10}")
+    print("-" * 62)
+    for name in STORES:
+        s = dedup_store(name, r).stats()
+        print(f"{name:<20} {s['backend']:<8} {s['items']:>10,} {s['memory_bytes'] / 1024 ** 2:>8.1f}MB {s['false_positive_rate']:>10.2e}")
+
+
+def migrate(r: redis.Redis, batch_size: int = 5000):
+    if settings.DEDUP_BACKEND == "set" and not settings.DEDUP_WINDOW:
+        logger.warning("DEDUP_BACKEND is 'set' without a window; the legacy sets are already in use. Nothing to do.")
+        return
+
+    for name in STORES:
+        if r.type(name) != "set":
+            continue
+        store = dedup_store(name, r)
+        total = 0
+        batch = []
+        for member in r.sscan_iter(name, count=batch_size):
+            batch.append(member)
+            if len(batch) >= batch_size:
+                store.add(batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            store.add(batch)
+            total += len(batch)
+        r.delete(name)
+        logger.success(f"Migrated {total:,} ids from set '{name}' into {store.backend} store")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Discovery dedup store stats / migration")
+    parser.add_argument("--migrate", action="store_true", help="Move legacy Redis sets into DEDUP_BACKEND")
+    args = parser.parse_args()
+
+    r = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    if args.migrate:
+        migrate(r)
+    print_stats(r)
@@ -1,76 +1,42 @@
-import csv
+import argparse
 import os
 from datetime import datetime
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from app.models import Influencer
-from app.config import settings
+from app.exporters.stream_export import export, PLATFORMS
 from loguru import logger
 
-def export_leads():
+EXTENSIONS = {"csv": ".csv", "gzip": ".csv.gz", "parquet": ".parquet"}
+
+def export_leads(platforms=("instagram",), fmt: str = "csv", min_score: int = 0, output: str = None):
     """
-    Exports all discovered Influencers to a CSV file.
+    Exports discovered leads (streamed page by page, so memory stays flat).
+    Several platforms go into one file with a leading "platform" column.
     """
-    # 1. Setup DB Connection
+    if output is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        prefix = "leads_export" if list(platforms) == ["instagram"] else f"{'_'.join(platforms)}_leads_export"
+        output = f"{prefix}_{timestamp}{EXTENSIONS[fmt]}"
+    
     try:
-        engine = create_engine(settings.DATABASE_URL)
-        Session = sessionmaker(bind=engine)
-        session = Session()
+        result = export(output, platforms=platforms, min_score=min_score)
     except Exception as e:
-        logger.error(f"Database connection failed: {e}")
-        return
-
-    # 2. Fetch Data
-    # Get all influencers, newest first (or highest score)
-    leads = session.query(Influencer).order_by(Influencer.score.desc()).all()
+        logger.error(f"Export failed: {e}")
+        return None
     
-    if not leads:
+    total = sum(result["rows"].values())
+    if not total:
         logger.warning("No leads found in database to export.")
-        return
-
-    # 3. Setup CSV File
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"leads_export_{timestamp}.csv"
-    
-    # Define columns
-    fieldnames = [
-        "username", "full_name", "score", "email", 
-        "follower_count", "following_count", "media_count", 
-        "city", "category", "is_business", "is_verified",
-        "biography", "external_url", "matched_signals", "discovered_at"
-    ]
-    
-    try:
-        with open(filename, mode='w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for lead in leads:
-                writer.writerow({
-                    "username": lead.username,
-                    "full_name": lead.full_name,
-                    "score": lead.score,
-                    "email": lead.email,
-                    "follower_count": lead.follower_count,
-                    "following_count": lead.following_count,
-                    "media_count": lead.media_count,
-                    "city": lead.city,
-                    "category": lead.category,
-                    "is_business": lead.is_business,
-                    "is_verified": lead.is_verified,
-                    "biography": (lead.biography or "").replace('\n', ' '), # Cleanup bio
-                    "external_url": lead.external_url,
-                    "matched_signals": lead.matched_signals,
-                    "discovered_at": lead.discovered_at
-                })
-                
-        logger.success(f"✅ Successfully exported {len(leads)} leads to: {filename}")
-        print(f"\n[OUTPUT] File created: {os.path.abspath(filename)}")
-        
-    except Exception as e:
-        logger.error(f"Failed to write CSV: {e}")
-    finally:
-        session.close()
+    else:
+        logger.success(f"✅ Successfully exported {total} leads to: {output}")
+        print(f"\n[OUTPUT] File created: {os.path.abspath(output)}")
+    return result
 
 if __name__ == "__main__":
-    export_leads()
+    parser = argparse.ArgumentParser(description="Export leads (CSV / gzip CSV / Parquet)")
+    parser.add_argument("--platform", choices=[*PLATFORMS, "all"], default="instagram")
+    parser.add_argument("--format", choices=list(EXTENSIONS), default="csv")
+    parser.add_argument("--min-score", type=int, default=0, help="Minimum score filter (default: 0)")
+    parser.add_argument("--output", help="Output path (default: timestamped file)")
+    args = parser.parse_args()
+    
+    platforms = list(PLATFORMS) if args.platform == "all" else [args.platform]
+    export_leads(platforms, args.format, args.min_score, args.output)
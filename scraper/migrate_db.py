@@ -0,0 +1,26 @@
+import argparse
+from sqlalchemy import create_engine
+from loguru import logger
+from app.config import settings
+from app.migrations import migrate, pending, applied_versions
+
+def main():
+    parser = argparse.ArgumentParser(description="Create missing tables and apply pending schema migrations")
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--status", action="store_true", help="List applied / pending migrations and exit")
+    args = parser.parse_args()
+    
+    engine = create_engine(args.database_url)
+    if args.status:
+        for version in applied_versions(engine):
+            print(f"  [x] {version}")
+        for version, description in pending(engine):
+            print(f"  [ ] {version}  {description}")
+        return
+    
+    applied = migrate(engine)
+    if applied:
+        logger.success(f"Applied {len(applied)} migration(s): {', '.join(applied)}")
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,13 @@
 
-from app.models import Base, TikTokInfluencer, TikTokBlacklistedAccount
 from app.config import settings
+from app.migrations import migrate as apply_migrations
 from sqlalchemy import create_engine
 
 def migrate():
     print("Migrating Database for TikTok...")
     engine = create_engine(settings.DATABASE_URL)
-    Base.metadata.create_all(engine)
+    # create_all + versioned migrations (indexes on existing tables), see app/migrations.py
+    apply_migrations(engine)
     print("Migration Complete. TikTok tables created.")
 
 if __name__ == "__main__":
@@ -0,0 +1,26 @@
+import argparse
+from app.reclassify import reclassify, CLASSIFIERS
+
+def print_report(result: dict):
+    mode = "DRY RUN - nothing written" if result["dry_run"] else "applied"
+    print(f"\n{'PLATFORM':<10} | {'SCANNED':>8} | {'PROMOTED':>8} | {'DEMOTED':>8} | {'RESCORED':>8} | {'NO PAYLOAD':>10}   ({mode})")
+    print("-" * 70)
+    for platform, s in result["platforms"].items():
+        print(f"{platform:<10} | {s['scanned']:>8} | {s['promoted']:>8} | {s['demoted']:>8} | {s['rescored']:>8} | {s['no_payload']:>10}")
+    if result["diff_path"]:
+        print(f"\n[OUTPUT] Status moves written to: {result['diff_path']}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-score stored profiles with the current classifier (no API calls)")
+    parser.add_argument("--platform", choices=[*CLASSIFIERS, "all"], default="all")
+    parser.add_argument("--status", choices=["qualified", "blacklisted", "all"], default="all",
+                        help="Only re-score accounts currently in this status")
+    parser.add_argument("--threshold", type=int, help="Override PASS_THRESHOLD for this run")
+    parser.add_argument("--dry-run", action="store_true", help="Report the would-be moves without writing")
+    parser.add_argument("--diff", help="Write status moves to this CSV")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: RECLASSIFY_WORKERS / CPU count)")
+    args = parser.parse_args()
+    
+    platforms = list(CLASSIFIERS) if args.platform == "all" else [args.platform]
+    statuses = ["qualified", "blacklisted"] if args.status == "all" else [args.status]
+    print_report(reclassify(platforms, statuses, args.threshold, args.dry_run, args.diff, workers=args.workers))
@@ -1,6 +1,6 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from app.models import BlacklistedAccount
+from app.models import Account
 from app.config import settings
 
 def unban_user(username):
@@ -8,7 +8,7 @@ def unban_user(username):
     Session = sessionmaker(bind=engine)
     session = Session()
     
-    user = session.query(BlacklistedAccount).filter_by(username=username).first()
+    user = session.query(Account).filter_by(platform="instagram", username=username, status="blacklisted").first()
     
     if user:
         session.delete(user)
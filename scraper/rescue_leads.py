@@ -2,8 +2,11 @@ import asyncio
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine
 from app.config import settings
-from app.models import BlacklistedAccount, Influencer
-from app.pipeline import task_classify_user
+from app.models import Account
+from app.pipeline import task_classify_batch
+from app.reclassify import reclassify
+from app.utils.profile_cache import profile_cache
+from app.utils.decision_cache import decision_cache
 from loguru import logger
 
 # Setup DB
@@ -11,15 +14,19 @@ engine = create_engine(settings.DATABASE_URL)
 Session = sessionmaker(bind=engine)
 
 def rescue_leads():
-    session = Session()
-    
-    # 1. Fetch all blacklisted usernames
-    # We load them all into memory to avoid cursor issues when deleting
-    blacklisted = session.query(BlacklistedAccount).all()
-    count = len(blacklisted)
-    logger.info(f"Found {count} blacklisted accounts to re-evaluate.")
+    # 1. Re-score blacklisted accounts with a stored profile offline (no API calls)
+    offline = reclassify(platforms=["instagram"], statuses=["blacklisted"], session_factory=Session)
+    offline = offline["platforms"]["instagram"]
+    print(f"Offline re-score: {offline['scanned']} stored profiles, {offline['promoted']} rescued")
     
-    usernames = [b.username for b in blacklisted]
+    # 2. The rest predate stored payloads: re-fetch them
+    # Loaded up front: re-classification rewrites these rows while we iterate
+    session = Session()
+    usernames = [u for (u,) in session.query(Account.username).filter(
+        Account.platform == "instagram", Account.status == "blacklisted", Account.raw_payload.is_(None)
+    )]
+    count = len(usernames)
+    logger.info(f"Found {count} blacklisted accounts without a stored profile to re-fetch.")
     session.close() # Close read session
     
     re_processed = 0
@@ -29,68 +36,44 @@ def rescue_leads():
     print(f"{'USERNAME':<25} | {'STATUS':<15}")
     print("-" * 50)
 
-    for username in usernames:
-        session = Session()
+    for i in range(0, count, settings.CLASSIFY_BATCH_SIZE):
+        chunk = usernames[i:i + settings.CLASSIFY_BATCH_SIZE]
         
-        # 2. DELETE from Blacklist (to allow re-insertion or fresh failure)
-        # We must do this, otherwise pipeline will crash on IntegrityError if it tries to blacklist again
+        # 3. Classify the chunk synchronously (task function called directly, not queued);
+        # dummy run_id=999 for "Rescue Mission". Profiles are fetched concurrently and the
+        # new verdicts upserted over the blacklisted rows; we check the DB after to see who made it.
         try:
-            record = session.query(BlacklistedAccount).filter_by(username=username).first()
-            if record:
-                session.delete(record)
-                session.commit()
+            task_classify_batch(chunk, run_id=999)
         except Exception as e:
-            logger.error(f"Error removing {username} from blacklist: {e}")
-            session.close()
+            logger.error(f"Failed to process {len(chunk)} users: {e}")
             continue
-            
-        session.close()
         
-        # 3. Trigger Classification (Synchronously for immediate feedback)
-        # We use the Celery task function directly but run it immediately? 
-        # Actually task_classify_user is decorated. Calling .delay() queues it.
-        # Calling it directly `task_classify_user(username, run_id=999)` runs it locally if eager?
-        # No, Celery tasks are callable. But we need to handle the async loop inside it.
-        # The task_classify_user function ALREADY creates its own async loop.
-        # So we can just call it as a python function!
+        # Check Result
+        session = Session()
+        winners = {u for (u,) in session.query(Account.username).filter(
+            Account.platform == "instagram", Account.status == "qualified", Account.username.in_(chunk)
+        )}
+        session.close()
         
-        try:
-            # We use a dummy run_id=999 for "Rescue Mission"
-            # Note: task_classify_user creates its own session sessions.
-            # We need to capture the result. The task doesn't return IsQualified directly, 
-            # it returns None or new_usernames? No, classify_user returns None.
-            # So we check the DB after to see if they made it to Influencers.
-            
-            task_classify_user(username, run_id=999)
-            
-            # Check Result
-            session = Session()
-            is_winner = session.query(Influencer).filter_by(username=username).first()
-            
-            if is_winner:
+        for username in chunk:
+            if username in winners:
                 print(f"{username:<25} | ✅ RESCUED")
                 rescued += 1
             else:
-                # Did it go back to blacklist?
-                is_loser = session.query(BlacklistedAccount).filter_by(username=username).first()
-                reason = "Unknown"
-                if is_loser:
-                    # Parse reason for display?
-                    reason = "Failed Filters"
                 print(f"{username:<25} | ❌ STILL FAILED")
                 still_failed += 1
-                
-            session.close()
-            re_processed += 1
-            
-        except Exception as e:
-            logger.error(f"Failed to process {username}: {e}")
+        re_processed += len(chunk)
             
     print("-" * 50)
     print(f"Rescue Mission Complete.")
-    print(f"Processed: {re_processed}/{count}")
-    print(f"Rescued:   {rescued}")
+    print(f"Processed: {re_processed}/{count} re-fetched (+{offline['scanned']} offline)")
+    print(f"Rescued:   {rescued + offline['promoted']}")
     print(f"Still Bad: {still_failed}")
+    
+    cache = profile_cache.stats().get("instagram:profile", {})
+    print(f"Profile cache: {cache.get('hits', 0)} hits, {cache.get('misses', 0)} misses (hit rate {cache.get('hit_rate', 0.0):.0%})")
+    decisions = decision_cache.stats()["local"].get("Classifier", {})
+    print(f"Decision cache: {decisions.get('lru_hits', 0) + decisions.get('redis_hits', 0)} hits, {decisions.get('misses', 0)} misses (hit rate {decisions.get('hit_rate', 0.0):.0%})")
 
 if __name__ == "__main__":
     rescue_leads()
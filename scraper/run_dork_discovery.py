@@ -1,14 +1,14 @@
+import argparse
 import asyncio
 from loguru import logger
-from app.dork_discovery import GoogleDorker
-from app.pipeline import task_classify_user, Session
+from app.dork_discovery import GoogleDorker, DorkExecutor
+from app.dork_history import DorkQueryStore, cutoff_from_args
+from app.pipeline import task_classify_batch, Session, run_stats
+from app.config import settings
+from app.utils.task_batcher import TaskBatcher
 from app.models import ScrapingRun
 
-# Stagger settings to avoid rate limits
-BATCH_SIZE = 10  # Queries per batch
-BATCH_DELAY = 0.5  # Seconds between batches
-
-async def main():
+async def main(since=None, stale_after=None):
     logger.info("Starting Google Dork Discovery (Firecrawl Edition)...")
     
     # 1. Create Scraping Run Record
@@ -23,48 +23,44 @@ async def main():
     
     dorker = GoogleDorker()
     total_found = 0  # Initialize here to fix finally block error
+    # Usernames are queued in chunks (size or age based) instead of one message each
+    batcher = TaskBatcher(
+        task_classify_batch, run_id,
+        batch_size=settings.CLASSIFY_BATCH_SIZE, max_wait=settings.CLASSIFY_BATCH_MAX_WAIT,
+        on_send=lambda chunk: run_stats.add_pending(run_id),
+    )
     
     try:
         # 2. Collect all queries first
         logger.info("Loading queries...")
-        queries = dorker._load_queries()
-        logger.info(f"Loaded {len(queries)} queries. Starting staggered execution...")
+        history = DorkQueryStore(Session, platform="instagram")
+        # Incremental mode skips recently run queries that found nothing new; best yield first
+        queries = history.select(dorker._load_queries(), cutoff=cutoff_from_args(since, stale_after))
+        logger.info(f"Running {len(queries)} queries. Starting adaptive execution...")
+        
+        # 3. One continuous queue; concurrency adapts to Firecrawl's 429s
+        def on_result(query, usernames):
+            nonlocal total_found
+            batcher.extend(usernames)
+            total_found += len(usernames)
         
-        # 3. Execute in staggered batches
-        for i in range(0, len(queries), BATCH_SIZE):
-            batch_queries = queries[i:i + BATCH_SIZE]
-            batch_num = (i // BATCH_SIZE) + 1
-            total_batches = (len(queries) + BATCH_SIZE - 1) // BATCH_SIZE
-            
-            logger.info(f"📦 Batch {batch_num}/{total_batches} ({len(batch_queries)} queries)")
-            
-            # Create tasks for this batch
-            tasks = [dorker.run_search(q) for q in batch_queries]
-            
-            # Run batch concurrently
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Process results
-            for result in results:
-                if isinstance(result, list):
-                    for username in result:
-                        task_classify_user.delay(username, run_id)
-                    total_found += len(result)
-                elif isinstance(result, Exception):
-                    logger.error(f"Batch error: {result}")
-            
-            # Stagger delay between batches
-            if i + BATCH_SIZE < len(queries):
-                await asyncio.sleep(BATCH_DELAY)
+        await DorkExecutor(dorker, history=history).run(queries, on_result=on_result)
 
     except KeyboardInterrupt:
         logger.warning("Dorking interrupted by user.")
     except Exception as e:
         logger.error(f"Fatal Error during Dorking: {e}")
     finally:
+        batcher.flush()
+        run_stats.incr(run_id, users_discovered=total_found)
+        run_stats.seal(run_id) # Finalized when the last classify batch finishes
         await dorker.close()
-        logger.success(f"Dork Discovery Finished. Total Queued: {total_found}")
+        logger.success(f"Dork Discovery Finished. Total Queued: {total_found} in {batcher.messages_sent} batch tasks")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Instagram dork discovery via Firecrawl")
+    parser.add_argument("--since", help="Skip queries run since this date (YYYY-MM-DD) unless their last run found new users")
+    parser.add_argument("--stale-after", type=float, help="Re-run only queries older than N days (or that found new users last time)")
+    args = parser.parse_args()
+    asyncio.run(main(since=args.since, stale_after=args.stale_after))
 
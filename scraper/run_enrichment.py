@@ -5,9 +5,11 @@ import time
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from loguru import logger
-from app.models import Influencer
+from app.models import Account
 from app.config import settings
 from app.enrichment import EnrichmentEngine
+from app.enrichment_scheduler import EnrichmentScheduler
+from app.utils.browser_pool import browser_pool
 from datetime import datetime
 
 # Database Setup
@@ -19,10 +21,12 @@ async def enrich_from_db():
     session = Session()
     enricher = EnrichmentEngine()
     
-    candidates = session.query(Influencer).filter(
-        Influencer.email == None,
-        Influencer.email_enriched == False
-    ).order_by(Influencer.score.desc()).limit(50).all()
+    candidates = session.query(Account).filter(
+        Account.platform == "instagram",
+        Account.status == "qualified",
+        Account.email == None,
+        Account.email_enriched == False
+    ).order_by(Account.score.desc()).limit(50).all()
     
     if not candidates:
         logger.warning("No candidates found in DB needing enrichment.")
@@ -69,57 +73,56 @@ async def enrich_from_csv(file_path: str):
 
         logger.info(f"Found {len(rows)} rows. Processing entries with missing emails...")
 
-        for i, row in enumerate(rows):
-            username = row.get('username')
-            email = row.get('email')
-            
-            # Skip if already has email
-            if email and "@" in email:
-                continue
-                
-            logger.info(f"[{i+1}/{len(rows)}] Checking @{username}...")
-            
-            # Prepare data for enricher
-            user_data = {
-                "username": username,
-                "biography": row.get('biography', ''),
-                "external_url": row.get('external_url', '')
-            }
-            
-            # 1. Try to Enrich
-            new_email = await enricher.enrich_user(user_data)
-            
+        # Skip rows that already have an email
+        missing = [row for row in rows if not (row.get('email') and "@" in row.get('email'))]
+        # Combined exports carry a platform column; older Instagram-only exports don't
+        key = lambda row: (row.get('platform') or "instagram", row.get('username'))
+        db_users = {
+            (u.platform, u.username): u for u in session.query(Account).filter(
+                Account.username.in_([row.get('username') for row in missing])
+            )
+        }
+        
+        # Rows the DB already has an email for are answered without enriching
+        todo = []
+        from_db = 0
+        for row in missing:
+            db_user = db_users.get(key(row))
+            if db_user and db_user.email:
+                row['email'] = db_user.email
+                from_db += 1
+            else:
+                todo.append(row)
+        if from_db:
+            logger.info(f"{from_db} emails filled from the database, enriching {len(todo)} rows")
+        
+        def on_result(row, new_email):
+            nonlocal enriched_count
+            db_user = db_users.get(key(row))
             if new_email:
                 # Update Row
                 row['email'] = new_email
                 enriched_count += 1
-                logger.success(f"🎉 FOUND: {new_email}")
+                logger.success(f"🎉 FOUND: @{row.get('username')} -> {new_email}")
                 
-                # Update DB in background if possible
-                db_user = session.query(Influencer).filter_by(username=username).first()
                 if db_user:
                     db_user.email = new_email
-                    db_user.email_enriched = True
                     db_user.enriched_at = datetime.utcnow()
-                    session.commit()
-            else:
+            if db_user:
                 # Mark as attempted in DB to avoid loop
-                db_user = session.query(Influencer).filter_by(username=username).first()
-                if db_user:
-                    db_user.email_enriched = True
-                    session.commit()
-            
-            # Save progress every 5 rows
-            if i % 5 == 0:
-                 write_csv(out_file, fieldnames, rows)
-            
-            # Rate limit
-            await asyncio.sleep(1)
+                db_user.email_enriched = True
+        
+        def on_batch():
+            # Save progress (CSV + DB) once per batch of results
+            session.commit()
+            write_csv(out_file, fieldnames, rows)
+        
+        await EnrichmentScheduler(enricher).run(todo, on_result=on_result, on_batch=on_batch)
 
         # Final Save
         write_csv(out_file, fieldnames, rows)
         logger.success(f"Done! Enriched file saved to: {out_file}")
-        logger.info(f"Total New Emails: {enriched_count}")
+        logger.info(f"Total New Emails: {enriched_count} (+{from_db} from DB)")
 
     except Exception as e:
         logger.error(f"CSV Error: {e}")
@@ -135,26 +138,25 @@ def write_csv(filename, fieldnames, rows):
 async def process_batch(candidates, enricher, session):
     """Helper for DB batch processing"""
     total_found = 0
-    for user in candidates:
+    
+    def on_result(user, email):
+        nonlocal total_found
+        if email:
+            user.email = email
+            total_found += 1
+            logger.success(f"📧 SAVED: {user.username} -> {email}")
+        user.email_enriched = True
+        user.enriched_at = datetime.utcnow()
+    
+    def on_batch():
         try:
-            user_data = {
-                "username": user.username,
-                "biography": user.biography,
-                "external_url": user.external_url
-            }
-            email = await enricher.enrich_user(user_data)
-            if email:
-                user.email = email
-                total_found += 1
-                logger.success(f"📧 SAVED: {user.username} -> {email}")
-            
-            user.email_enriched = True
-            user.enriched_at = datetime.utcnow()
             session.commit()
-            await asyncio.sleep(1)
         except Exception as e:
-            logger.error(f"Failed {user.username}: {e}")
+            logger.error(f"Commit failed: {e}")
             session.rollback()
+    
+    await EnrichmentScheduler(enricher).run(candidates, on_result=on_result, on_batch=on_batch)
+    return total_found
 
 async def main():
     print("\n" + "="*50)
@@ -165,10 +167,13 @@ async def main():
     
     choice = input("\nFile path > ")
     
-    if choice.strip():
-        await enrich_from_csv(choice)
-    else:
-        await enrich_from_db()
+    try:
+        if choice.strip():
+            await enrich_from_csv(choice)
+        else:
+            await enrich_from_db()
+    finally:
+        await browser_pool.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -1,78 +1,69 @@
+import argparse
 import asyncio
-from typing import List
+from datetime import datetime
+from typing import Dict, List, Optional
 from pathlib import Path
 from loguru import logger
-from app.dork_discovery import GoogleDorker
-from app.models import ScrapingRun, TikTokInfluencer, TikTokBlacklistedAccount
-from app.pipeline import Session
+from app.dork_discovery import GoogleDorker, DorkExecutor
+from app.dork_history import DorkQueryStore, cutoff_from_args
+from app.models import ScrapingRun, Account
+from app.pipeline import Session, account_writer
+from app.config import settings
 from app.scrapers.tiktok import TikTokScraper
 from app.tiktok_classifier import TikTokClassifier
+from app.tiktok_pipeline import tiktok_account_row
+from app.utils.decision_cache import decision_cache
+from app.utils.http_pool import http_pool
 
-# Stagger settings
-BATCH_SIZE = 10
-BATCH_DELAY = 1.0
-CLASSIFY_DELAY = 0.5  # Delay between API calls for classification
-
-async def classify_and_save(username: str, run_id: int, scraper: TikTokScraper):
-    """Classify a TikTok user and save to DB synchronously (no Celery)."""
+async def classify(username: str, scraper: TikTokScraper) -> Optional[Dict]:
+    """Fetch + classify one TikTok user (no DB access); None if the profile is unavailable."""
     try:
-        # 1. Fetch Profile
+        # 1. Fetch Profile (shared pooled client, rate limited per host inside the scraper)
         profile = await scraper.get_user_profile(username)
         if not profile:
             logger.warning(f"Could not fetch profile for @{username}")
-            return False
+            return None
 
         # 2. Run Classifier
-        is_qualified, score, signals = TikTokClassifier.classify(profile)
-
-        session = Session()
-
-        if is_qualified:
-            # SAVE QUALIFIED
-            exists = session.query(TikTokInfluencer).filter_by(username=username).first()
-            if not exists:
-                stats = profile.get("stats", {})
-                lead = TikTokInfluencer(
-                    username=username,
-                    nickname=profile.get("nickname"),
-                    biography=profile.get("signature"),
-                    follower_count=stats.get("followerCount"),
-                    following_count=stats.get("followingCount"),
-                    heart_count=stats.get("heartCount"),
-                    video_count=stats.get("videoCount"),
-                    is_verified=profile.get("verified", False),
-                    score=score,
-                    matched_signals=signals,
-                    is_business=False
-                )
-                session.add(lead)
-                session.commit()
-                logger.success(f"✅ SAVED TIKTOK LEAD: @{username} (Score: {score})")
-                session.close()
-                return True
-            else:
-                logger.info(f"Already exists: @{username}")
-        else:
-            # BLACKLIST
-            exists = session.query(TikTokBlacklistedAccount).filter_by(username=username).first()
-            if not exists:
-                bl = TikTokBlacklistedAccount(
-                    username=username,
-                    reason=f"Score {score} < Threshold | Signals: {signals}",
-                    failed_filters=signals
-                )
-                session.add(bl)
-                session.commit()
-            logger.info(f"⛔ Blacklisted @{username} (Score: {score})")
-
-        session.close()
-        return False
+        is_qualified, score, signals = decision_cache.classify(TikTokClassifier, profile)
+        return {"username": username, "profile": profile, "qualified": is_qualified, "score": score, "signals": signals}
 
     except Exception as e:
         logger.error(f"Classification failed for @{username}: {e}")
-        return False
+        return None
+
+def save_batch(results: List[Dict]) -> Optional[int]:
+    """
+    Upserts a batch of classifications into accounts in one statement; returns
+    new leads saved, or None if the write failed (safe to retry: it's an upsert).
+    Blocking: call it off the event loop.
+    """
+    if not results:
+        return 0
+    rows = {}
+    try:
+        with account_writer(batch_size=len(results) + 1) as writer:
+            for r in results:
+                rows[r["username"]] = r
+                writer.add(Account, tiktok_account_row(r["username"], r["profile"], r["qualified"], r["score"], r["signals"]))
+    except Exception as e:
+        logger.error(f"Batch save failed ({len(results)} users): {e}")
+        return None
+
+    saved = {w["username"] for w in writer.written.get(Account, [])}
+    leads = 0
+    for username, r in rows.items():
+        if not r["qualified"]:
+            logger.info(f"⛔ Blacklisted @{username} (Score: {r['score']})")
+            continue
+        if username in saved:
+            leads += 1
+            logger.success(f"✅ SAVED TIKTOK LEAD: @{username} (Score: {r['score']})")
+        else:
+            logger.info(f"Already exists: @{username}")
+    return leads
 
-async def main():
+async def main(since=None, stale_after=None):
     logger.info("Starting TikTok Dork Discovery...")
 
     # 1. Create Run
@@ -97,44 +88,78 @@ async def main():
 
     total_discovered = 0
     total_saved = 0
+    total_unsaved = 0
 
     try:
-        queries = dorker._load_queries()
-        logger.info(f"Loaded {len(queries)} TikTok queries.")
-
-        for i in range(0, len(queries), BATCH_SIZE):
-            batch_queries = queries[i:i + BATCH_SIZE]
-            logger.info(f"📦 Batch {(i // BATCH_SIZE) + 1}/{(len(queries) // BATCH_SIZE) + 1} ({len(batch_queries)} queries)")
-
-            # Create tasks specifying platform='tiktok'
-            tasks = [dorker.run_search(q, platform="tiktok") for q in batch_queries]
-
-            # Run batch
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            # Process results - SYNCHRONOUSLY classify and save each username
-            batch_usernames = []
-            for result in results:
-                if isinstance(result, list):
-                    batch_usernames.extend(result)
-                    total_discovered += len(result)
-                elif isinstance(result, Exception):
-                    logger.error(f"Batch error: {result}")
-
-            # Classify each discovered username immediately
-            if batch_usernames:
-                logger.info(f"🔍 Classifying {len(batch_usernames)} discovered users...")
-                for username in batch_usernames:
-                    saved = await classify_and_save(username, run_id, scraper)
-                    if saved:
-                        total_saved += 1
-                    await asyncio.sleep(CLASSIFY_DELAY)  # Rate limiting for API
-
-            if i + BATCH_SIZE < len(queries):
-                await asyncio.sleep(BATCH_DELAY)
-
-            # Progress update
-            logger.info(f"📊 Progress: {total_discovered} discovered, {total_saved} qualified leads saved")
+        history = DorkQueryStore(Session, platform="tiktok")
+        # Incremental mode skips recently run queries that found nothing new; best yield first
+        queries = history.select(dorker._load_queries(), cutoff=cutoff_from_args(since, stale_after))
+        logger.info(f"Running {len(queries)} TikTok queries.")
+
+        # Producer/consumer: searches feed a bounded queue while a pool of
+        # workers classifies; a single writer task upserts the results in
+        # batches on a thread, so DB writes never stall the event loop
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.TIKTOK_CLASSIFY_QUEUE)
+        batches: asyncio.Queue = asyncio.Queue(maxsize=2) # Workers wait when the DB falls behind
+        pending: List[Dict] = []
+        classified = 0
+
+        async def flush():
+            batch = pending[:]
+            pending.clear()
+            if batch:
+                await batches.put(batch)
+
+        async def writer():
+            nonlocal total_saved, total_unsaved
+            while True:
+                batch = await batches.get()
+                if batch is None:
+                    return
+                for attempt in range(settings.TIKTOK_WRITE_RETRIES + 1):
+                    if attempt:
+                        await asyncio.sleep(2 ** attempt)
+                    leads = await asyncio.to_thread(save_batch, batch)
+                    if leads is not None:
+                        total_saved += leads
+                        break
+                else:
+                    total_unsaved += len(batch)
+                    logger.error(f"Dropped batch of {len(batch)} users after {settings.TIKTOK_WRITE_RETRIES + 1} failed writes: {[r['username'] for r in batch]}")
+
+        async def on_result(query, usernames):
+            nonlocal total_discovered
+            total_discovered += len(usernames)
+            for username in usernames:
+                await queue.put(username) # Waits when classification falls behind (holding the search slot)
+
+        async def worker():
+            nonlocal classified
+            while True:
+                username = await queue.get()
+                if username is None:
+                    return
+                result = await classify(username, scraper)
+                classified += 1
+                if result:
+                    pending.append(result)
+                    if len(pending) >= settings.TIKTOK_WRITE_BATCH:
+                        await flush()
+                if classified % 50 == 0:
+                    # Progress update
+                    logger.info(f"📊 Progress: {classified}/{total_discovered} classified, {total_saved} qualified leads saved")
+
+        writer_task = asyncio.create_task(writer())
+        workers = [asyncio.create_task(worker()) for _ in range(settings.TIKTOK_CLASSIFY_WORKERS)]
+        try:
+            await DorkExecutor(dorker, platform="tiktok", history=history).run(queries, on_result=on_result)
+        finally:
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers, return_exceptions=True)
+            await flush()
+            await batches.put(None)
+            await writer_task
 
     except KeyboardInterrupt:
         logger.warning("Interrupted.")
@@ -142,6 +167,7 @@ async def main():
         logger.error(f"Fatal Error: {e}")
     finally:
         await dorker.close()
+        await http_pool.aclose() # This script owns the loop: close the TikTok client too
 
         # Update run stats
         session = Session()
@@ -150,11 +176,20 @@ async def main():
             run.users_discovered = total_discovered
             run.users_qualified = total_saved
             run.status = "completed_tiktok_dork"
+            run.completed_at = datetime.utcnow()
             session.commit()
         session.close()
 
         logger.success(f"🎉 TikTok Dorking Finished!")
         logger.success(f"📈 Results: {total_discovered} discovered → {total_saved} qualified leads SAVED to database")
+        if total_unsaved:
+            logger.error(f"{total_unsaved} classified users could not be written (see 'Dropped batch' errors)")
+        cache = decision_cache.stats()["local"].get("TikTokClassifier", {})
+        logger.info(f"Decision cache: {cache.get('lru_hits', 0) + cache.get('redis_hits', 0)} hits, {cache.get('misses', 0)} misses (hit rate {cache.get('hit_rate', 0.0):.0%})")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="TikTok dork discovery via Firecrawl")
+    parser.add_argument("--since", help="Skip queries run since this date (YYYY-MM-DD) unless their last run found new users")
+    parser.add_argument("--stale-after", type=float, help="Re-run only queries older than N days (or that found new users last time)")
+    args = parser.parse_args()
+    asyncio.run(main(since=args.since, stale_after=args.stale_after))
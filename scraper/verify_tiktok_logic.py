@@ -8,7 +8,8 @@ from app.tiktok_discovery import TikTokDiscoveryEngine
 from app.tiktok_classifier import TikTokClassifier
 from app.scrapers.tiktok import TikTokScraper
 from app.pipeline import Session
-from app.models import TikTokInfluencer
+from app.models import Account
+from app.tiktok_pipeline import tiktok_account_row
 from loguru import logger
 
 async def verify_logic():
@@ -50,24 +51,11 @@ async def verify_logic():
         session = Session()
         try:
              # Check if exists
-             exists = session.query(TikTokInfluencer).filter_by(username=test_user).first()
+             exists = session.query(Account).filter_by(platform="tiktok", username=test_user).first()
              if exists:
                  logger.info("User already exists in DB.")
              else:
-                 stats = profile.get("stats", {})
-                 lead = TikTokInfluencer(
-                    username=test_user,
-                    nickname=profile.get("nickname"),
-                    biography=profile.get("signature"),
-                    follower_count=stats.get("followerCount"),
-                    following_count=stats.get("followingCount"),
-                    heart_count=stats.get("heartCount"),
-                    video_count=stats.get("videoCount"),
-                    is_verified=profile.get("verified", False),
-                    score=score,
-                    matched_signals=signals,
-                    is_business=False
-                )
+                 lead = Account(**tiktok_account_row(test_user, profile, True, score, signals))
                  session.add(lead)
                  session.commit()
                  logger.success("Phase 3 Success: Saved to DB.")